@@ -31,7 +31,9 @@ from .sub_agents import bqml_agent
 from .sub_agents.bigquery.tools import (
     get_database_settings as get_bq_database_settings,
 )
+from .sub_agents.bigquery.tools import get_relevant_schema
 from .tools import call_db_agent, call_ds_agent
+from .utils.utils import content_text
 
 date_today = date.today()
 
@@ -48,7 +50,11 @@ def setup_before_agent_call(callback_context: CallbackContext):
     # setting up schema in instruction
     if callback_context.state["all_db_settings"]["use_database"] == "BigQuery":
         callback_context.state["database_settings"] = get_bq_database_settings()
-        schema = callback_context.state["database_settings"]["bq_ddl_schema"]
+        # Only the tables relevant to the user's message go in the instruction.
+        schema = get_relevant_schema(
+            content_text(callback_context.user_content),
+            callback_context.state["database_settings"],
+        )
 
         callback_context._invocation_context.agent.instruction = (
             return_instructions_root()
@@ -0,0 +1,290 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Execution-guided selection among the SQL candidates generated by ChaseSQL.
+
+1. Candidates are deduplicated by their canonical sqlglot form; each distinct
+   query carries the number of candidates that produced it as its weight.
+2. Candidates that fail the local checks of `local_validation` (unknown
+   tables or columns, mismatched JOIN types, ungrouped columns) are dropped
+   without calling BigQuery.
+3. The remaining candidates are dry-run and then executed in parallel (capped
+   by `maximum_bytes_billed`, with a LIMIT of `MAX_NUM_ROWS` + 1 rows), and
+   their results are hashed. A result cut off at the limit is only comparable
+   if the query orders it; otherwise the rows returned are an arbitrary subset
+   and the candidate doesn't vote.
+4. Candidates vote with their weight for their result hash. As soon as one
+   result has a quorum (a majority of the valid candidates) it is returned
+   without waiting for the other queries; otherwise the best-supported result
+   wins when all finish or the time budget runs out. Queries still running
+   then are cancelled, so BigQuery stops billing for them.
+
+Each candidate is validated and executed as the SQL text that is returned,
+not its canonical form, so the vote is on the query actually shipped.
+"""
+
+import dataclasses
+import hashlib
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable
+
+import sqlglot
+from google.cloud import bigquery
+from sqlglot.schema import MappingSchema, Schema
+
+from .. import local_validation
+from ..tools import with_row_limit
+
+SELECTION_TIMEOUT_SECONDS = float(os.getenv("CHASE_SELECTION_TIMEOUT", "30"))
+
+
+@dataclasses.dataclass
+class Candidate:
+    sql: str
+    canonical: str
+    # Number of generated candidates with this canonical form.
+    weight: int = 1
+    # Position of the first candidate with this canonical form.
+    index: int = 0
+
+
+def canonicalize(sql: str) -> str | None:
+    """Returns the canonical BigQuery form of `sql`, or None if it isn't a query."""
+    try:
+        expression = sqlglot.parse_one(sql, read="bigquery")
+    except sqlglot.errors.SqlglotError:
+        return None
+    # Error strings from the model call (e.g. "Timeout") may parse as a column.
+    if not isinstance(expression, sqlglot.exp.Query):
+        return None
+    return expression.sql(dialect="bigquery", comments=False)
+
+
+def dedupe_candidates(candidates: list[str | None]) -> list[Candidate]:
+    """Groups candidates by canonical form, in order of first appearance."""
+    unique: dict[str, Candidate] = {}
+    for index, sql in enumerate(candidates):
+        if not sql:
+            continue
+        canonical = canonicalize(sql)
+        if canonical is None:
+            logging.info("Dropping unparsable SQL candidate %d", index)
+            continue
+        if canonical in unique:
+            unique[canonical].weight += 1
+        else:
+            unique[canonical] = Candidate(sql=sql, canonical=canonical, index=index)
+    return list(unique.values())
+
+
+def validate_locally(candidate: Candidate, schema_dict: dict | Schema | None) -> str | None:
+    """Returns why the candidate can't run against the schema, or None if it may."""
+    if not schema_dict:
+        return None
+    if isinstance(schema_dict, dict):
+        schema_dict = MappingSchema(schema_dict, dialect="bigquery")
+    errors = local_validation.validate_sql(candidate.sql, schema_dict)
+    return local_validation.format_errors(errors) if errors else None
+
+
+def result_hash(rows: list[tuple], ordered: bool, truncated: bool = False) -> str:
+    """Hashes query results; row order only counts if the query orders them.
+
+    A truncated result never hashes like a complete one with the same rows.
+    """
+    rows = [repr(row) for row in rows]
+    if not ordered:
+        rows.sort()
+    if truncated:
+        rows.append("<truncated>")
+    return hashlib.sha256("\n".join(rows).encode("utf-8")).hexdigest()
+
+
+def _is_ordered(sql: str) -> bool:
+    expression = sqlglot.parse_one(sql, read="bigquery")
+    return expression.args.get("order") is not None
+
+
+class RunningJobs:
+    """Thread-safe set of the query jobs started for a selection.
+
+    Once `cancel_all` has been called, jobs added later are cancelled right away.
+    """
+
+    def __init__(self):
+        self._jobs = set()
+        self._cancelled = False
+        self._lock = threading.Lock()
+
+    def add(self, job: bigquery.QueryJob) -> None:
+        with self._lock:
+            if not self._cancelled:
+                self._jobs.add(job)
+                return
+        _cancel(job)
+
+    def discard(self, job: bigquery.QueryJob) -> None:
+        with self._lock:
+            self._jobs.discard(job)
+
+    def cancel_all(self) -> None:
+        with self._lock:
+            self._cancelled = True
+            jobs, self._jobs = self._jobs, set()
+        for job in jobs:
+            _cancel(job)
+
+
+def _cancel(job: bigquery.QueryJob) -> None:
+    try:
+        job.cancel()
+        logging.info("Cancelled query job %s", job.job_id)
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logging.warning("Could not cancel query job %s: %s", job.job_id, e)
+
+
+def execute_candidate(
+    client: bigquery.Client,
+    candidate: Candidate,
+    max_rows: int,
+    max_bytes_billed: int,
+    jobs: RunningJobs,
+) -> str | None:
+    """Dry-runs, then runs the candidate and returns its result hash.
+
+    The query runs with a LIMIT of `max_rows` + 1, so BigQuery doesn't compute
+    and store the whole result. Returns None if the result has more than
+    `max_rows` rows and no ORDER BY: those rows aren't comparable across
+    candidates. The query job is in `jobs` while it runs, so it can be
+    cancelled.
+
+    Raises:
+        ValueError: If the dry run estimate is above `max_bytes_billed`.
+        Exception: Any BigQuery error from the dry run or the query.
+    """
+    dry_run_job = client.query(
+        candidate.sql,
+        job_config=bigquery.QueryJobConfig(dry_run=True, use_query_cache=False),
+    )
+    if max_bytes_billed and (dry_run_job.total_bytes_processed or 0) > max_bytes_billed:
+        raise ValueError(f"estimated {dry_run_job.total_bytes_processed} bytes")
+    query_job = client.query(
+        with_row_limit(candidate.sql, max_rows + 1),
+        job_config=bigquery.QueryJobConfig(maximum_bytes_billed=max_bytes_billed or None),
+    )
+    jobs.add(query_job)
+    try:
+        rows = [
+            row.values()
+            for row in query_job.result(max_results=max_rows + 1, page_size=max_rows + 1)
+        ]
+    finally:
+        jobs.discard(query_job)
+    truncated = len(rows) > max_rows
+    ordered = _is_ordered(candidate.sql)
+    if truncated and not ordered:
+        return None
+    return result_hash(rows[:max_rows], ordered, truncated)
+
+
+def select_candidate(
+    candidates: list[str | None],
+    client: bigquery.Client,
+    schema_dict: dict | Schema | None = None,
+    max_rows: int = 80,
+    max_bytes_billed: int = 0,
+    timeout: float = SELECTION_TIMEOUT_SECONDS,
+    execute: Callable[..., str | None] = execute_candidate,
+) -> str | None:
+    """Returns the candidate SQL whose results most candidates agree on.
+
+    Falls back to the first locally valid candidate if none could be executed,
+    and to the first non-empty candidate if none is valid.
+    """
+    fallback = next((sql for sql in candidates if sql), None)
+    unique = dedupe_candidates(candidates)
+    valid = []
+    for candidate in unique:
+        error = validate_locally(candidate, schema_dict)
+        if error:
+            logging.info("Dropping SQL candidate %d: %s", candidate.index, error)
+        else:
+            valid.append(candidate)
+    if not valid:
+        return fallback
+    if len(valid) == 1:
+        return valid[0].sql
+
+    total_weight = sum(candidate.weight for candidate in valid)
+    quorum = total_weight // 2 + 1
+    votes: dict[str, list[Candidate]] = {}
+
+    def best() -> Candidate | None:
+        if not votes:
+            return None
+        supporters = max(
+            votes.values(),
+            key=lambda group: (sum(c.weight for c in group), -min(c.index for c in group)),
+        )
+        return min(supporters, key=lambda c: (-c.weight, c.index))
+
+    deadline = time.monotonic() + timeout
+    jobs = RunningJobs()
+    executor = ThreadPoolExecutor(max_workers=len(valid))
+    try:
+        pending = {
+            executor.submit(execute, client, candidate, max_rows, max_bytes_billed, jobs): candidate
+            for candidate in valid
+        }
+        while pending:
+            done, _ = wait(
+                pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED
+            )
+            if not done:
+                logging.info("Candidate selection timed out with %d queries running", len(pending))
+                break
+            for future in done:
+                candidate = pending.pop(future)
+                try:
+                    digest = future.result()
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    logging.info("SQL candidate %d failed: %s", candidate.index, e)
+                    continue
+                if digest is None:
+                    logging.info("SQL candidate %d has an unordered, truncated result", candidate.index)
+                    continue
+                votes.setdefault(digest, []).append(candidate)
+                if sum(c.weight for c in votes[digest]) >= quorum:
+                    logging.info("SQL candidates reached quorum (%d of %d)", quorum, total_weight)
+                    return best().sql
+    finally:
+        # Don't wait for (or pay for) queries still running once the result is decided.
+        executor.shutdown(wait=False, cancel_futures=True)
+        jobs.cancel_all()
+
+    winner = best()
+    return winner.sql if winner else valid[0].sql
+
+
+def schema_for_validation(ddl_schema: str) -> Schema | None:
+    """Returns the sqlglot schema used by `validate_locally`, cached per DDL."""
+    try:
+        return local_validation.schema_for_ddl(ddl_schema)
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logging.warning("Skipping local SQL validation, schema not usable: %s", e)
+        return None
@@ -29,8 +29,9 @@ chase_sql_constants_dict: immutabledict.immutabledict[str, Any] = (
             "process_input_errors": True,
             # Whether to process SQLGlot tool output errors.
             "process_tool_output_errors": True,
-            # Number of candidates to generate.
-            "number_of_candidates": 1,
+            # Number of candidates to generate. With more than one, the
+            # candidate whose results most others agree on is used.
+            "number_of_candidates": int(os.getenv("CHASE_NUMBER_OF_CANDIDATES", "1")),
             # Model to use for generation.
             "model": os.getenv("CHASE_NL2SQL_MODEL"),
             # Temperature for generation.
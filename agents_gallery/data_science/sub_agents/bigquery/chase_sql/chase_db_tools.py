@@ -19,7 +19,16 @@ import os
 
 from google.adk.tools import ToolContext
 
+from ..tools import (
+    MAX_BYTES_BILLED,
+    MAX_NUM_ROWS,
+    get_bq_client,
+    get_cached_sql,
+    get_relevant_schema,
+)
+
 # pylint: disable=g-importing-member
+from . import candidate_selection, context_cache
 from .dc_prompt_template import DC_PROMPT_TEMPLATE
 from .llm_utils import GeminiModel
 from .qp_prompt_template import QP_PROMPT_TEMPLATE
@@ -93,7 +102,15 @@ def initial_bq_nl2sql(
       str: An SQL statement to answer this question.
     """
     print("****** Running agent with ChaseSQL algorithm.")
-    ddl_schema = tool_context.state["database_settings"]["bq_ddl_schema"]
+    cached_sql = get_cached_sql(question, tool_context)
+    if cached_sql:
+        return cached_sql
+
+    if context_cache.CONTEXT_CACHE_ENABLED:
+        # The full schema keeps the cached prompt prefix the same across questions.
+        ddl_schema = tool_context.state["database_settings"]["bq_ddl_schema"]
+    else:
+        ddl_schema = get_relevant_schema(question, tool_context.state["database_settings"])
     project = tool_context.state["database_settings"]["bq_project_id"]
     db = tool_context.state["database_settings"]["bq_dataset_id"]
     transpile_to_bigquery = tool_context.state["database_settings"][
@@ -108,32 +125,57 @@ def initial_bq_nl2sql(
     number_of_candidates = tool_context.state["database_settings"][
         "number_of_candidates"
     ]
-    model = tool_context.state["database_settings"]["model"]
+    model_name = tool_context.state["database_settings"]["model"]
     temperature = tool_context.state["database_settings"]["temperature"]
     generate_sql_type = tool_context.state["database_settings"]["generate_sql_type"]
 
     if generate_sql_type == GenerateSQLType.DC.value:
-        prompt = DC_PROMPT_TEMPLATE.format(
-            SCHEMA=ddl_schema, QUESTION=question, BQ_PROJECT_ID=BQ_PROJECT_ID
-        )
+        template = DC_PROMPT_TEMPLATE
     elif generate_sql_type == GenerateSQLType.QP.value:
-        prompt = QP_PROMPT_TEMPLATE.format(
-            SCHEMA=ddl_schema, QUESTION=question, BQ_PROJECT_ID=BQ_PROJECT_ID
-        )
+        template = QP_PROMPT_TEMPLATE
     else:
         raise ValueError(f"Unsupported generate_sql_type: {generate_sql_type}")
-
-    model = GeminiModel(model_name=model, temperature=temperature)
-    requests = [prompt for _ in range(number_of_candidates)]
-    responses = model.call_parallel(requests, parser_func=parse_response)
-    # Take just the first response.
-    responses = responses[0]
+    prompt = template.format(
+        SCHEMA=ddl_schema, QUESTION=question, BQ_PROJECT_ID=BQ_PROJECT_ID
+    )
+
+    cache_name = None
+    if context_cache.CONTEXT_CACHE_ENABLED:
+        prompt_parts = context_cache.split_prompt(
+            template, ddl_schema, question, BQ_PROJECT_ID
+        )
+        if prompt_parts:
+            prefix, question_prompt = prompt_parts
+            cache_name = context_cache.CONTEXT_CACHES.get_cache_name(model_name, prefix)
+            if cache_name:
+                prompt = question_prompt
+        if not cache_name:
+            # Sent uncached, the full schema only makes the prompt longer.
+            ddl_schema = get_relevant_schema(question, tool_context.state["database_settings"])
+            prompt = template.format(
+                SCHEMA=ddl_schema, QUESTION=question, BQ_PROJECT_ID=BQ_PROJECT_ID
+            )
+
+    model = GeminiModel(model_name=model_name, temperature=temperature, cache_name=cache_name)
+    responses = model.generate_n(prompt, number_of_candidates, parser_func=parse_response)
+    if number_of_candidates > 1:
+        # Pick the candidate whose results most candidates agree on.
+        responses = candidate_selection.select_candidate(
+            responses,
+            get_bq_client(),
+            schema_dict=candidate_selection.schema_for_validation(ddl_schema),
+            max_rows=MAX_NUM_ROWS,
+            max_bytes_billed=MAX_BYTES_BILLED,
+        )
+    else:
+        responses = responses[0]
 
     # If postprocessing of the SQL to transpile it to BigQuery is required,
     # then do it here.
     if transpile_to_bigquery:
         translator = sql_translator.SqlTranslator(
-            model=model,
+            # The cached prompt prefix is only meant for SQL generation.
+            model=model_name if cache_name else model,
             temperature=temperature,
             process_input_errors=process_input_errors,
             process_tool_output_errors=process_tool_output_errors,
@@ -0,0 +1,137 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Vertex AI context caching for the static part of the ChaseSQL prompts.
+
+The DC and QP prompts are several hundred lines of instructions and examples
+followed by the schema, and only the question at the end changes per call.
+`split_prompt` cuts a prompt before the question. `ContextCaches` keeps one
+`CachedContent` per (model, prefix hash): it reuses a cache created earlier,
+by this process or another one (matched by display name), renews its TTL
+when less than half is left, and creates it otherwise. Calls then send only
+the question part with `GeminiModel(cache_name=...)`.
+
+Lookups for the same prefix are serialized so concurrent calls don't create
+duplicates; lookups for different prefixes don't wait for each other.
+
+If a cache can't be created (e.g. the prefix is below the model's minimum
+cacheable size), the prefix is remembered and sent uncached until the TTL
+has passed.
+"""
+
+import datetime
+import hashlib
+import logging
+import os
+import threading
+import time
+
+from vertexai.generative_models import Content, Part
+from vertexai.preview import caching
+
+CONTEXT_CACHE_ENABLED = bool(int(os.getenv("CHASE_CONTEXT_CACHE", "1")))
+CONTEXT_CACHE_TTL_SECONDS = int(os.getenv("CHASE_CONTEXT_CACHE_TTL", "3600"))
+# Start of the part of the DC and QP templates that changes per question.
+QUESTION_MARKER = "**************************\n【Question】"
+DISPLAY_NAME_PREFIX = "chase-sql-"
+
+
+def split_prompt(template: str, schema: str, question: str, project_id: str) -> tuple[str, str] | None:
+    """Returns (static prefix, question part) of the formatted prompt.
+
+    Returns None if the template has no question marker.
+    """
+    if QUESTION_MARKER not in template:
+        return None
+    # The examples have questions too; the real one comes last.
+    head, tail = template.rsplit(QUESTION_MARKER, 1)
+    prefix = head.format(SCHEMA=schema, BQ_PROJECT_ID=project_id)
+    question_part = (QUESTION_MARKER + tail).format(
+        SCHEMA=schema, QUESTION=question, BQ_PROJECT_ID=project_id
+    )
+    return prefix, question_part
+
+
+def prefix_hash(model_name: str, prefix: str) -> str:
+    return hashlib.sha256(f"{model_name}\n{prefix}".encode("utf-8")).hexdigest()
+
+
+class ContextCaches:
+    """Thread-safe registry of Vertex cached contents keyed by prefix hash."""
+
+    def __init__(self, ttl_seconds: int = CONTEXT_CACHE_TTL_SECONDS):
+        self.ttl = datetime.timedelta(seconds=ttl_seconds)
+        # prefix hash -> (cache resource name, expire time)
+        self._caches: dict[str, tuple[str, datetime.datetime]] = {}
+        # prefix hash -> time.monotonic() of the failed creation
+        self._failed: dict[str, float] = {}
+        # prefix hash -> lock held while that prefix's cache is looked up or created
+        self._key_locks: dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _find_existing(self, display_name: str) -> caching.CachedContent | None:
+        now = datetime.datetime.now(datetime.timezone.utc)
+        for cached_content in caching.CachedContent.list():
+            if cached_content.display_name == display_name and cached_content.expire_time > now:
+                return cached_content
+        return None
+
+    def get_cache_name(self, model_name: str, prefix: str) -> str | None:
+        """Returns the name of a live cache holding `prefix`, or None to send it uncached."""
+        key = prefix_hash(model_name, prefix)
+        now = datetime.datetime.now(datetime.timezone.utc)
+        # Serializes creation per prefix so concurrent calls don't create
+        # duplicates, without holding up calls for other prefixes.
+        with self._key_lock(key):
+            failed_at = self._failed.get(key)
+            if failed_at is not None and time.monotonic() - failed_at < self.ttl.total_seconds():
+                return None
+            try:
+                if key in self._caches:
+                    name, expire_time = self._caches[key]
+                    if expire_time - now > self.ttl / 2:
+                        return name
+                    cached_content = caching.CachedContent(cached_content_name=name)
+                    cached_content.update(ttl=self.ttl)
+                    cached_content.refresh()
+                else:
+                    display_name = DISPLAY_NAME_PREFIX + key[:32]
+                    cached_content = self._find_existing(display_name)
+                    if cached_content is None:
+                        cached_content = caching.CachedContent.create(
+                            model_name=model_name,
+                            contents=[Content(role="user", parts=[Part.from_text(prefix)])],
+                            ttl=self.ttl,
+                            display_name=display_name,
+                        )
+                        logging.info("Created context cache %s", cached_content.resource_name)
+                    elif cached_content.expire_time - now <= self.ttl / 2:
+                        cached_content.update(ttl=self.ttl)
+                        cached_content.refresh()
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logging.warning("Sending prompt prefix uncached, context cache failed: %s", e)
+                self._caches.pop(key, None)
+                self._failed[key] = time.monotonic()
+                return None
+            self._failed.pop(key, None)
+            self._caches[key] = (cached_content.resource_name, cached_content.expire_time)
+            return cached_content.resource_name
+
+
+# Shared by all sessions served by this process.
+CONTEXT_CACHES = ContextCaches()
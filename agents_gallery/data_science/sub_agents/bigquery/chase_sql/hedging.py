@@ -0,0 +1,68 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Settings and bookkeeping for hedged Gemini requests.
+
+A hedged request sends a duplicate once the original has taken longer than
+`HEDGE_PERCENTILE` of recent successful requests to the same model, and uses
+whichever response arrives first. Hedges are paid for from `HEDGE_BUDGET`,
+which earns `HEDGE_BUDGET_RATIO` of a token per original request, so hedging
+adds at most that fraction of load (capped at 1.0, i.e. at most double).
+"""
+
+import collections
+import math
+import os
+import threading
+from typing import Hashable
+
+from .rate_limiting import RetryBudget
+
+HEDGE_REQUESTS = bool(int(os.getenv("CHASE_HEDGE_REQUESTS", "0")))
+HEDGE_PERCENTILE = float(os.getenv("CHASE_HEDGE_PERCENTILE", "95"))
+HEDGE_BUDGET_RATIO = min(1.0, float(os.getenv("CHASE_HEDGE_BUDGET_RATIO", "0.1")))
+# Requests remembered per model, and needed before hedging starts.
+LATENCY_WINDOW_SIZE = 200
+MIN_LATENCY_SAMPLES = 20
+
+
+class LatencyWindow:
+    """Thread-safe sliding window of recent request latencies per key."""
+
+    def __init__(self, size: int = LATENCY_WINDOW_SIZE, min_samples: int = MIN_LATENCY_SAMPLES):
+        self.size = size
+        self.min_samples = min_samples
+        self._latencies: dict[Hashable, collections.deque] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: Hashable, latency: float) -> None:
+        with self._lock:
+            if key not in self._latencies:
+                self._latencies[key] = collections.deque(maxlen=self.size)
+            self._latencies[key].append(latency)
+
+    def percentile(self, key: Hashable, percentile: float) -> float | None:
+        """Returns the latency at `percentile` (0-100), or None with too few samples."""
+        with self._lock:
+            latencies = sorted(self._latencies.get(key, ()))
+        if len(latencies) < self.min_samples:
+            return None
+        rank = math.ceil(percentile / 100 * len(latencies)) - 1
+        return latencies[min(len(latencies) - 1, max(0, rank))]
+
+
+LATENCIES = LatencyWindow()
+# Same mechanics as the retry budget: each original request earns
+# HEDGE_BUDGET_RATIO of a token (`record_success`), each hedge spends one.
+HEDGE_BUDGET = RetryBudget(max_tokens=10, ratio=HEDGE_BUDGET_RATIO)
@@ -14,15 +14,17 @@
 
 """This code contains the LLM utils for the CHASE-SQL Agent."""
 
+import asyncio
 import functools
 import os
-import random
+import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from typing import Callable, List, Optional
 
 import dotenv
 import vertexai
+from google.api_core import exceptions as api_exceptions
 from google.cloud import aiplatform
 from vertexai.generative_models import (
     GenerationConfig,
@@ -32,6 +34,11 @@ from vertexai.generative_models import (
 from vertexai.preview import caching
 from vertexai.preview.generative_models import GenerativeModel
 
+from .hedging import HEDGE_BUDGET, HEDGE_PERCENTILE, HEDGE_REQUESTS, LATENCIES
+from .rate_limiting import RATE_LIMITERS, RETRY_BUDGET
+from .region_balancer import RegionBalancer
+from .resilience import CIRCUIT_BREAKERS, CircuitOpenError, retry
+
 dotenv.load_dotenv(override=True)
 
 SAFETY_FILTER_CONFIG = {
@@ -72,6 +79,24 @@ GEMINI_AVAILABLE_REGIONS = [
     "asia-southeast1",
     "southamerica-east1",
 ]
+# Routes calls of GeminiModel(distribute_requests=True) across the regions.
+REGION_BALANCER = RegionBalancer(GEMINI_AVAILABLE_REGIONS)
+# Model calls running at once across all GeminiModel instances in the process.
+LLM_MAX_CONCURRENCY = int(os.getenv("CHASE_LLM_MAX_CONCURRENCY", "16"))
+# Attempts per model call, including the first; retries also need RETRY_BUDGET.
+LLM_MAX_ATTEMPTS = int(os.getenv("CHASE_LLM_MAX_ATTEMPTS", "4"))
+
+_executor: ThreadPoolExecutor | None = None
+# Runs both copies of hedged requests; separate from `_executor` because
+# the calls waiting on them may already be running there.
+_hedge_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+# Most responses requested from the model in one call with `candidate_count`.
+MAX_CANDIDATE_COUNT = 8
+# Models that rejected `candidate_count`; `generate_n` fans out for these.
+_CANDIDATE_COUNT_UNSUPPORTED: set[str] = set()
+
 GEMINI_URL = (
     "projects/{GCP_PROJECT}/locations/{region}/publishers/google/models/{model_name}"
 )
@@ -83,38 +108,26 @@ aiplatform.init(
 vertexai.init(project=GCP_PROJECT, location=GCP_REGION)
 
 
-def retry(max_attempts=8, base_delay=1, backoff_factor=2):
-    """Decorator to add retry logic to a function.
-
-    Args:
-        max_attempts (int): The maximum number of attempts.
-        base_delay (int): The base delay in seconds for the exponential backoff.
-        backoff_factor (int): The factor by which to multiply the delay for each
-          subsequent attempt.
-
-    Returns:
-        Callable: The decorator function.
-    """
-
-    def decorator(func):
-        @functools.wraps(func)
-        def wrapper(*args, **kwargs):
-            attempts = 0
-            while attempts < max_attempts:
-                try:
-                    return func(*args, **kwargs)
-                except Exception as e:  # pylint: disable=broad-exception-caught
-                    print(f"Attempt {attempts + 1} failed with error: {e}")
-                    attempts += 1
-                    if attempts >= max_attempts:
-                        raise e
-                    delay = base_delay * (backoff_factor**attempts)
-                    delay = delay + random.uniform(0, 0.1 * delay)
-                    time.sleep(delay)
+def get_executor() -> ThreadPoolExecutor:
+    """Returns the thread pool shared by all model calls in the process."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=LLM_MAX_CONCURRENCY, thread_name_prefix="gemini"
+            )
+        return _executor
 
-        return wrapper
 
-    return decorator
+def get_hedge_executor() -> ThreadPoolExecutor:
+    """Returns the thread pool that sends hedged requests."""
+    global _hedge_executor
+    with _executor_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(
+                max_workers=2 * LLM_MAX_CONCURRENCY, thread_name_prefix="gemini-hedge"
+            )
+        return _hedge_executor
 
 
 class GeminiModel:
@@ -127,30 +140,128 @@ class GeminiModel:
         distribute_requests: bool = False,
         cache_name: str | None = None,
         temperature: float = 0.01,
+        hedge_requests: bool = HEDGE_REQUESTS,
         **kwargs,
     ):
         self.model_name = model_name
         self.finetuned_model = finetuned_model
         self.arguments = kwargs
-        self.distribute_requests = distribute_requests
+        # Cached content lives in one region, so its requests can't be spread.
+        self.distribute_requests = (
+            distribute_requests and not finetuned_model and cache_name is None
+        )
         self.temperature = temperature
-        model_name = self.model_name
-        if not self.finetuned_model and self.distribute_requests:
-            random_region = random.choice(GEMINI_AVAILABLE_REGIONS)
-            model_name = GEMINI_URL.format(
-                GCP_PROJECT=GCP_PROJECT,
-                region=random_region,
-                model_name=self.model_name,
-            )
+        self.hedge_requests = hedge_requests
+        self.region = GCP_REGION
+        # Region -> GenerativeModel, filled as the balancer routes calls there.
+        self._regional_models: dict[str, GenerativeModel] = {}
         if cache_name is not None:
             cached_content = caching.CachedContent(cached_content_name=cache_name)
             self.model = GenerativeModel.from_cached_content(
                 cached_content=cached_content
             )
         else:
-            self.model = GenerativeModel(model_name=model_name)
+            self.model = GenerativeModel(model_name=self.model_name)
 
-    @retry(max_attempts=12, base_delay=2, backoff_factor=2)
+    def _model_for(self, region: str) -> GenerativeModel:
+        if region not in self._regional_models:
+            self._regional_models[region] = GenerativeModel(
+                model_name=GEMINI_URL.format(
+                    GCP_PROJECT=GCP_PROJECT,
+                    region=region,
+                    model_name=self.model_name,
+                )
+            )
+        return self._regional_models[region]
+
+    def _choose_region(self, exclude=()) -> str | None:
+        """Region for the next request, or None to use `self.model`.
+
+        Regions whose circuit breaker is open are skipped.
+        """
+        if not self.distribute_requests:
+            return None
+        return REGION_BALANCER.choose(exclude, is_available=self._breaker_closed)
+
+    def _breaker_closed(self, region: str) -> bool:
+        return not CIRCUIT_BREAKERS.get((self.model_name, region)).is_open()
+
+    def _send_rerouted(self, prompt: str, generation_config: GenerationConfig, region: str | None):
+        """Like `_send`, but moves to another region if the breaker of `region` opened.
+
+        The breaker may open between choosing the region and sending the request.
+        """
+        try:
+            return self._send(prompt, generation_config, region)
+        except CircuitOpenError:
+            if region is None:
+                raise
+            return self._send(prompt, generation_config, self._choose_region(exclude=(region,)))
+
+    def _send(self, prompt: str, generation_config: GenerationConfig, region: str | None):
+        """Sends one request through the endpoint's circuit breaker and rate limiter.
+
+        `region` must come from `_choose_region`; REGION_BALANCER is told how
+        long the request took and whether it failed.
+        """
+        endpoint = (self.model_name, region or self.region)
+        breaker = CIRCUIT_BREAKERS.get(endpoint)
+        error = None
+        start = time.monotonic()
+        try:
+            breaker.before_call()
+            RATE_LIMITERS.get(endpoint).acquire()
+            start = time.monotonic()
+            response = (self._model_for(region) if region else self.model).generate_content(
+                prompt,
+                generation_config=generation_config,
+                safety_settings=SAFETY_FILTER_CONFIG,
+            )
+            LATENCIES.record(self.model_name, time.monotonic() - start)
+            breaker.record_success()
+            return response
+        except Exception as e:
+            error = e
+            if not isinstance(e, CircuitOpenError):
+                breaker.record_failure(e)
+            raise
+        finally:
+            if region:
+                REGION_BALANCER.record(region, time.monotonic() - start, error)
+
+    def _generate_content(self, prompt: str, generation_config: GenerationConfig):
+        """Sends a request, hedged if enabled.
+
+        A hedged request sends a duplicate (to another region when requests are
+        distributed) once it has run longer than HEDGE_PERCENTILE of recent
+        requests, if HEDGE_BUDGET allows, and returns the first response.
+        """
+        region = self._choose_region()
+        if not self.hedge_requests:
+            return self._send_rerouted(prompt, generation_config, region)
+
+        HEDGE_BUDGET.record_success()
+        executor = get_hedge_executor()
+        primary = executor.submit(self._send_rerouted, prompt, generation_config, region)
+        hedge_delay = LATENCIES.percentile(self.model_name, HEDGE_PERCENTILE)
+        if hedge_delay is None:
+            return primary.result()
+        done, _ = wait([primary], timeout=hedge_delay)
+        if done or not HEDGE_BUDGET.try_spend():
+            return primary.result()
+
+        hedge_region = self._choose_region(exclude=(region,) if region else ())
+        hedge = executor.submit(self._send_rerouted, prompt, generation_config, hedge_region)
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    # The slower copy keeps running; its response is dropped.
+                    return future.result()
+        return primary.result()
+
+    @retry(max_attempts=LLM_MAX_ATTEMPTS, retry_budget=RETRY_BUDGET)
     def call(self, prompt: str, parser_func=None) -> str:
         """Calls the Gemini model with the given prompt.
 
@@ -163,61 +274,125 @@ class GeminiModel:
         Returns:
             str: The processed response from the model.
         """
-        response = self.model.generate_content(
+        response = self._generate_content(
             prompt,
-            generation_config=GenerationConfig(
+            GenerationConfig(
                 temperature=self.temperature,
                 **self.arguments,
             ),
-            safety_settings=SAFETY_FILTER_CONFIG,
         ).text
         if parser_func:
             return parser_func(response)
         return response
 
+    def _call_candidates(self, prompt: str, candidate_count: int) -> List[Optional[str]]:
+        """Requests `candidate_count` responses to `prompt` in a single call."""
+        response = self._generate_content(
+            prompt,
+            GenerationConfig(
+                temperature=self.temperature,
+                candidate_count=candidate_count,
+                **self.arguments,
+            ),
+        )
+        texts = []
+        for candidate in response.candidates:
+            try:
+                texts.append(candidate.text)
+            except ValueError:  # Blocked or empty candidate.
+                texts.append(None)
+        return texts
+
+    def generate_n(
+        self,
+        prompt: str,
+        n: int,
+        parser_func: Optional[Callable[[str], str]] = None,
+    ) -> List[Optional[str]]:
+        """Generates `n` responses to the same prompt.
+
+        The responses are requested with the model's `candidate_count` (at most
+        MAX_CANDIDATE_COUNT per call), so the prompt is sent once instead of `n`
+        times. If the model rejects `candidate_count`, a call fails, or returns
+        fewer candidates, the missing responses are fanned out with
+        `call_parallel`.
+
+        Args:
+            prompt (str): The prompt to call the model with.
+            n (int): The number of responses to generate.
+            parser_func (callable, optional): A function to process each response.
+
+        Returns:
+            List[Optional[str]]: `n` responses; see `call_parallel` for failures.
+        """
+        responses: List[Optional[str]] = []
+        if n > 1 and self.model_name not in _CANDIDATE_COUNT_UNSUPPORTED:
+            try:
+                while len(responses) < n:
+                    texts = self._call_candidates(
+                        prompt, min(MAX_CANDIDATE_COUNT, n - len(responses))
+                    )
+                    if not texts:
+                        break
+                    responses.extend(
+                        parser_func(text) if parser_func and text is not None else text
+                        for text in texts
+                    )
+            except api_exceptions.InvalidArgument as e:
+                # Other invalid arguments (e.g. a prompt that is too long) say
+                # nothing about the model; only this call falls back. The API
+                # names the field candidate_count or candidateCount.
+                if "candidatecount" in str(e).lower().replace("_", ""):
+                    print(f"candidate_count not supported by {self.model_name}: {e}")
+                    _CANDIDATE_COUNT_UNSUPPORTED.add(self.model_name)
+                else:
+                    print(f"Multi-candidate call rejected, falling back to parallel calls: {e}")
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                print(f"Multi-candidate call failed, falling back to parallel calls: {e}")
+        responses = responses[:n]
+        if len(responses) < n:
+            responses.extend(
+                self.call_parallel([prompt] * (n - len(responses)), parser_func=parser_func)
+            )
+        return responses
+
     def call_parallel(
         self,
         prompts: List[str],
         parser_func: Optional[Callable[[str], str]] = None,
         timeout: int = 60,
-        max_retries: int = 5,
+        max_retries: int = 5,  # pylint: disable=unused-argument
     ) -> List[Optional[str]]:
-        """Calls the Gemini model for multiple prompts in parallel using threads with retry logic.
+        """Calls the Gemini model for multiple prompts in parallel.
+
+        The calls run on the process-wide pool (at most LLM_MAX_CONCURRENCY at
+        once) and are retried only by `call`, within the shared retry budget.
 
         Args:
             prompts (List[str]): A list of prompts to call the model with.
             parser_func (callable, optional): A function to process each response.
-            timeout (int): The maximum time (in seconds) to wait for each thread.
-            max_retries (int): The maximum number of retries for timed-out threads.
+            timeout (int): The maximum time (in seconds) to wait for all calls.
+            max_retries (int): Unused; retries are handled by `call`.
 
         Returns:
             List[Optional[str]]:
-            A list of responses, or None for threads that failed.
+            A list of responses, or error strings for calls that failed.
         """
         results = [None] * len(prompts)
 
         def worker(index: int, prompt: str):
-            """Thread worker function to call the model and store the result with retries."""
-            retries = 0
-            while retries <= max_retries:
-                try:
-                    return self.call(prompt, parser_func)
-                except Exception as e:  # pylint: disable=broad-exception-caught
-                    print(f"Error for prompt {index}: {str(e)}")
-                    retries += 1
-                    if retries <= max_retries:
-                        print(f"Retrying ({retries}/{max_retries}) for prompt {index}")
-                        time.sleep(1)  # Small delay before retrying
-                    else:
-                        return f"Error after retries: {str(e)}"
-
-        # Create and start one thread for each prompt
-        with ThreadPoolExecutor(max_workers=len(prompts)) as executor:
-            future_to_index = {
-                executor.submit(worker, i, prompt): i
-                for i, prompt in enumerate(prompts)
-            }
+            """Calls the model, returning an error string if all attempts fail."""
+            try:
+                return self.call(prompt, parser_func)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                print(f"Error for prompt {index}: {str(e)}")
+                return f"Error after retries: {str(e)}"
 
+        executor = get_executor()
+        future_to_index = {
+            executor.submit(worker, i, prompt): i for i, prompt in enumerate(prompts)
+        }
+        try:
             for future in as_completed(future_to_index, timeout=timeout):
                 index = future_to_index[future]
                 try:
@@ -225,12 +400,47 @@ class GeminiModel:
                 except Exception as e:  # pylint: disable=broad-exception-caught
                     print(f"Unhandled error for prompt {index}: {e}")
                     results[index] = "Unhandled Error"
+        except TimeoutError:
+            pass
 
         # Handle remaining unfinished tasks after the timeout
         for future in future_to_index:
             index = future_to_index[future]
             if not future.done():
                 print(f"Timeout occurred for prompt {index}")
+                future.cancel()
                 results[index] = "Timeout"
 
         return results
+
+    async def call_async(self, prompt: str, parser_func=None) -> str:
+        """Async version of `call`, for ADK tools; runs on the shared pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            get_executor(), functools.partial(self.call, prompt, parser_func)
+        )
+
+    async def call_parallel_async(
+        self,
+        prompts: List[str],
+        parser_func: Optional[Callable[[str], str]] = None,
+    ) -> List[Optional[str]]:
+        """Async version of `call_parallel`; failed calls return error strings."""
+        responses = await asyncio.gather(
+            *(self.call_async(prompt, parser_func) for prompt in prompts),
+            return_exceptions=True,
+        )
+        return [
+            f"Error after retries: {response}" if isinstance(response, Exception) else response
+            for response in responses
+        ]
+
+    async def generate_n_async(
+        self,
+        prompt: str,
+        n: int,
+        parser_func: Optional[Callable[[str], str]] = None,
+    ) -> List[Optional[str]]:
+        """Async version of `generate_n`."""
+        # Not on the shared pool: generate_n itself waits for calls on that pool.
+        return await asyncio.to_thread(self.generate_n, prompt, n, parser_func)
@@ -0,0 +1,117 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Process-wide limits on Gemini traffic from the ChaseSQL model client.
+
+- `TokenBucket`: requests per second (with a burst) per model and region, so
+  concurrent users and fan-out can't exceed the quota and trigger 429s.
+- `RetryBudget`: retries are only allowed while the process has retry tokens;
+  each success earns back a fraction of one. When a dependency is failing,
+  retries stop instead of multiplying the load.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from typing import Callable, Hashable
+
+LLM_REQUESTS_PER_SECOND = float(os.getenv("CHASE_LLM_REQUESTS_PER_SECOND", "10"))
+LLM_REQUEST_BURST = float(os.getenv("CHASE_LLM_REQUEST_BURST", "20"))
+RETRY_BUDGET_TOKENS = float(os.getenv("CHASE_LLM_RETRY_BUDGET", "10"))
+# Retry tokens earned back per successful request.
+RETRY_BUDGET_RATIO = 0.1
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, holding at most `capacity`."""
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Takes a token, possibly going into debt; returns how long to wait for it."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0 or self.rate <= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self) -> float:
+        """Blocks until a token is available; returns the time waited."""
+        delay = self._reserve()
+        if delay:
+            time.sleep(delay)
+        return delay
+
+    async def acquire_async(self) -> float:
+        """Like `acquire`, without blocking the event loop."""
+        delay = self._reserve()
+        if delay:
+            await asyncio.sleep(delay)
+        return delay
+
+
+class RateLimiters:
+    """One `TokenBucket` per key (e.g. model and region), created on first use."""
+
+    def __init__(self, rate: float = LLM_REQUESTS_PER_SECOND, capacity: float = LLM_REQUEST_BURST):
+        self.rate = rate
+        self.capacity = capacity
+        self._buckets: dict[Hashable, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> TokenBucket:
+        with self._lock:
+            if key not in self._buckets:
+                self._buckets[key] = TokenBucket(self.rate, self.capacity)
+            return self._buckets[key]
+
+
+class RetryBudget:
+    """Thread-safe budget of retries shared by all calls in the process."""
+
+    def __init__(self, max_tokens: float = RETRY_BUDGET_TOKENS, ratio: float = RETRY_BUDGET_RATIO):
+        self.max_tokens = max_tokens
+        self.ratio = ratio
+        self._tokens = max_tokens
+        self._lock = threading.Lock()
+
+    def try_spend(self) -> bool:
+        """Takes one retry token; False if the budget is exhausted."""
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    @property
+    def tokens(self) -> float:
+        return self._tokens
+
+
+RATE_LIMITERS = RateLimiters()
+RETRY_BUDGET = RetryBudget()
@@ -0,0 +1,132 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Per-call region selection for `GeminiModel(distribute_requests=True)`.
+
+Every call reports its latency and outcome for the region it went to. The
+balancer keeps an exponentially weighted moving average (EWMA) of both per
+region and routes each call with power-of-two-choices: of two random healthy
+regions, the one with the lower expected cost (latency, inflated by the error
+rate and by calls already in flight there) wins. This spreads load while
+steering it away from slow regions, without every caller piling onto the
+single "best" one. A region answering 429 (quota exhausted) is quarantined
+for a cooldown and only used again once it ends. Callers can also pass
+`is_available` to skip regions for other reasons, e.g. an open circuit breaker.
+"""
+
+import dataclasses
+import os
+import random
+import threading
+import time
+from typing import Callable, Sequence
+
+REGION_QUARANTINE_SECONDS = float(os.getenv("CHASE_REGION_QUARANTINE_SECONDS", "60"))
+# Weight of the newest observation in the moving averages.
+EWMA_ALPHA = 0.2
+# Latency assumed for regions with no observations yet, in seconds.
+INITIAL_LATENCY_SECONDS = 2.0
+
+
+@dataclasses.dataclass
+class RegionStats:
+    latency: float = INITIAL_LATENCY_SECONDS
+    error_rate: float = 0.0
+    in_flight: int = 0
+    calls: int = 0
+    quarantined_until: float = 0.0
+
+
+def is_rate_limited(error: BaseException | None) -> bool:
+    """True for quota errors (HTTP 429 / RESOURCE_EXHAUSTED)."""
+    if error is None:
+        return False
+    return getattr(error, "code", None) == 429 or "429" in str(error)[:8]
+
+
+class RegionBalancer:
+    """Thread-safe latency and error tracking with power-of-two-choices routing."""
+
+    def __init__(
+        self,
+        regions: Sequence[str],
+        quarantine_seconds: float = REGION_QUARANTINE_SECONDS,
+        alpha: float = EWMA_ALPHA,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not regions:
+            raise ValueError("RegionBalancer needs at least one region.")
+        self.regions = list(regions)
+        self.quarantine_seconds = quarantine_seconds
+        self.alpha = alpha
+        self._clock = clock
+        self._stats = {region: RegionStats() for region in self.regions}
+        self._lock = threading.Lock()
+
+    def _cost(self, stats: RegionStats) -> float:
+        return stats.latency * (1 + stats.in_flight) / max(0.05, 1 - stats.error_rate)
+
+    def choose(
+        self,
+        exclude: Sequence[str] = (),
+        is_available: Callable[[str], bool] | None = None,
+    ) -> str:
+        """Picks the region for the next call and counts it as in flight.
+
+        Regions for which `is_available` returns False are treated like
+        quarantined ones. Every call to `choose` must be followed by `record`
+        for that region.
+        """
+        with self._lock:
+            now = self._clock()
+            healthy = [
+                region
+                for region in self.regions
+                if region not in exclude
+                and self._stats[region].quarantined_until <= now
+                and (is_available is None or is_available(region))
+            ]
+            if not healthy:
+                # Everything is excluded or quarantined: use whichever recovers first.
+                candidates = [r for r in self.regions if r not in exclude] or self.regions
+                region = min(candidates, key=lambda r: self._stats[r].quarantined_until)
+            elif len(healthy) == 1:
+                region = healthy[0]
+            else:
+                first, second = random.sample(healthy, 2)
+                region = min(first, second, key=lambda r: self._cost(self._stats[r]))
+            self._stats[region].in_flight += 1
+            return region
+
+    def record(self, region: str, latency: float, error: BaseException | None = None) -> None:
+        """Records the outcome of a call routed to `region` by `choose`."""
+        with self._lock:
+            stats = self._stats[region]
+            stats.in_flight = max(0, stats.in_flight - 1)
+            stats.calls += 1
+            if error is None:
+                # Failed calls often return early; their latency would look good.
+                if stats.calls == 1:
+                    stats.latency = latency
+                else:
+                    stats.latency += self.alpha * (latency - stats.latency)
+            stats.error_rate += self.alpha * ((error is not None) - stats.error_rate)
+            if is_rate_limited(error):
+                stats.quarantined_until = self._clock() + self.quarantine_seconds
+                print(f"Region {region} rate limited, quarantined for {self.quarantine_seconds}s.")
+
+    def snapshot(self) -> dict[str, RegionStats]:
+        """Returns a copy of the per-region statistics."""
+        with self._lock:
+            return {region: dataclasses.replace(stats) for region, stats in self._stats.items()}
@@ -0,0 +1,242 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Retries and circuit breaking for the ChaseSQL model client.
+
+- `retry` only retries transient errors (`RETRYABLE_EXCEPTIONS`). Delays use
+  full jitter (uniform between 0 and the capped exponential delay) so threads
+  failing together don't retry together. No retry starts once the total time
+  budget would be exceeded.
+- `CircuitBreaker` opens after `failure_threshold` consecutive transient
+  failures of one endpoint. While open, calls fail immediately with
+  `CircuitOpenError`. After `reset_seconds` a single trial call is let
+  through, and its outcome closes or reopens the breaker.
+
+Retries, give-ups and breaker state changes are logged and counted in
+`METRICS`, and exported as OpenTelemetry counters when `opentelemetry` is
+installed.
+"""
+
+import collections
+import functools
+import logging
+import os
+import random
+import threading
+import time
+from typing import Callable, Hashable
+
+from google.api_core import exceptions as api_exceptions
+
+try:
+    from opentelemetry import metrics as otel_metrics
+except ImportError:  # pragma: no cover - optional dependency
+    otel_metrics = None
+
+LLM_RETRY_TIMEOUT_SECONDS = float(os.getenv("CHASE_LLM_RETRY_TIMEOUT", "30"))
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CHASE_LLM_CIRCUIT_FAILURES", "5"))
+CIRCUIT_RESET_SECONDS = float(os.getenv("CHASE_LLM_CIRCUIT_RESET_SECONDS", "30"))
+
+# Errors worth retrying: quota, overload, server-side failures and timeouts.
+RETRYABLE_EXCEPTIONS = (
+    api_exceptions.TooManyRequests,
+    api_exceptions.ServiceUnavailable,
+    api_exceptions.InternalServerError,
+    api_exceptions.BadGateway,
+    api_exceptions.GatewayTimeout,
+    api_exceptions.DeadlineExceeded,
+    api_exceptions.Aborted,
+    ConnectionError,
+    TimeoutError,
+)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose circuit breaker is open."""
+
+
+class Metrics:
+    """Counts resilience events, in process and as OpenTelemetry counters."""
+
+    def __init__(self):
+        self.counts: collections.Counter = collections.Counter()
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._meter = otel_metrics.get_meter(__name__) if otel_metrics else None
+
+    def increment(self, name: str, **attributes) -> None:
+        with self._lock:
+            self.counts[name] += 1
+            if self._meter is not None and name not in self._counters:
+                self._counters[name] = self._meter.create_counter(f"chase_sql.llm.{name}")
+        if self._meter is not None:
+            self._counters[name].add(1, {k: str(v) for k, v in attributes.items()})
+
+
+METRICS = Metrics()
+
+
+class CircuitBreaker:
+    """Thread-safe closed / open / half-open circuit breaker for one endpoint."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str = "",
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        reset_seconds: float = CIRCUIT_RESET_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def _transition(self, state: str) -> None:
+        if state != self.state:
+            logging.warning("Circuit breaker %s: %s -> %s", self.name, self.state, state)
+            METRICS.increment(f"circuit_{state}", endpoint=self.name)
+            self.state = state
+
+    def before_call(self) -> None:
+        """Raises CircuitOpenError if the endpoint shouldn't be called now."""
+        with self._lock:
+            if self.state == self.OPEN:
+                if self._clock() - self._opened_at < self.reset_seconds:
+                    METRICS.increment("circuit_rejected", endpoint=self.name)
+                    raise CircuitOpenError(f"Circuit open for {self.name}")
+                self._transition(self.HALF_OPEN)
+            if self.state == self.HALF_OPEN:
+                if self._trial_running:
+                    METRICS.increment("circuit_rejected", endpoint=self.name)
+                    raise CircuitOpenError(f"Circuit half-open for {self.name}")
+                self._trial_running = True
+
+    def is_open(self) -> bool:
+        """True while `before_call` would reject a call, without counting it."""
+        with self._lock:
+            if self.state == self.OPEN:
+                return self._clock() - self._opened_at < self.reset_seconds
+            return self.state == self.HALF_OPEN and self._trial_running
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._trial_running = False
+            self._transition(self.CLOSED)
+
+    def record_failure(self, error: BaseException) -> None:
+        """Counts transient failures; other errors say nothing about the endpoint."""
+        with self._lock:
+            self._trial_running = False
+            if not isinstance(error, RETRYABLE_EXCEPTIONS):
+                return
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+                self._transition(self.OPEN)
+
+
+class CircuitBreakers:
+    """One `CircuitBreaker` per endpoint key, created on first use."""
+
+    def __init__(self, **breaker_kwargs):
+        self._breaker_kwargs = breaker_kwargs
+        self._breakers: dict[Hashable, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> CircuitBreaker:
+        with self._lock:
+            if key not in self._breakers:
+                self._breakers[key] = CircuitBreaker(name=str(key), **self._breaker_kwargs)
+            return self._breakers[key]
+
+
+CIRCUIT_BREAKERS = CircuitBreakers()
+
+
+def full_jitter_delay(attempt: int, base_delay: float, max_delay: float, backoff_factor: float = 2) -> float:
+    """Delay before retry number `attempt` (1-based): uniform in [0, capped backoff]."""
+    return random.uniform(0, min(max_delay, base_delay * backoff_factor ** (attempt - 1)))
+
+
+def retry(
+    max_attempts=4,
+    base_delay=0.5,
+    backoff_factor=2,
+    max_delay=8,
+    total_timeout=LLM_RETRY_TIMEOUT_SECONDS,
+    retryable=RETRYABLE_EXCEPTIONS,
+    retry_budget=None,
+):
+    """Decorator to retry a function on transient errors.
+
+    Args:
+        max_attempts (int): The maximum number of attempts, including the first.
+        base_delay (float): The cap of the first retry delay, in seconds.
+        backoff_factor (float): The factor by which the cap grows per retry.
+        max_delay (float): The largest delay cap, in seconds.
+        total_timeout (float): No retry starts if it would begin later than this
+          many seconds after the first attempt.
+        retryable (tuple): The exception classes that are retried; any other
+          exception (including CircuitOpenError) is raised immediately.
+        retry_budget (RetryBudget, optional): Shared budget every retry must
+          take a token from; successes earn tokens back.
+
+    Returns:
+        Callable: The decorator function.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.monotonic()
+            attempt = 1
+            while True:
+                try:
+                    result = func(*args, **kwargs)
+                    if retry_budget is not None:
+                        retry_budget.record_success()
+                    return result
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    if not isinstance(e, retryable) or isinstance(e, CircuitOpenError):
+                        raise
+                    logging.warning("Attempt %d of %s failed: %s", attempt, func.__name__, e)
+                    delay = full_jitter_delay(attempt, base_delay, max_delay, backoff_factor)
+                    if attempt >= max_attempts:
+                        reason = "attempts"
+                    elif time.monotonic() - start + delay > total_timeout:
+                        reason = "timeout"
+                    elif retry_budget is not None and not retry_budget.try_spend():
+                        reason = "budget"
+                    else:
+                        METRICS.increment("retries", function=func.__name__)
+                        time.sleep(delay)
+                        attempt += 1
+                        continue
+                    METRICS.increment("retry_gave_up", function=func.__name__, reason=reason)
+                    logging.warning("Not retrying %s (%s exhausted).", func.__name__, reason)
+                    raise
+
+        return wrapper
+
+    return decorator
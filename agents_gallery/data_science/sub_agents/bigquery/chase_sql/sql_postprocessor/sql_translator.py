@@ -14,12 +14,16 @@
 
 """Translator from SQLite to BigQuery."""
 
+import collections
+import hashlib
 import re
+import threading
 from typing import Any, Final
 
 import regex
 import sqlglot
 import sqlglot.optimizer
+from sqlglot.schema import MappingSchema
 
 from ..llm_utils import GeminiModel  # pylint: disable=g-importing-member
 from .correction_prompt_template import (
@@ -36,6 +40,12 @@ SQLGlotSchemaType = dict[str, Any]
 
 BirdSampleType = dict[str, Any]
 
+# Parsed DDL schemas kept by `SqlTranslator`, shared by all instances.
+SCHEMA_CACHE_SIZE = 16
+# sha256 of the DDL text -> (SQLGlot schema dict, MappingSchema)
+_schema_cache: collections.OrderedDict = collections.OrderedDict()
+_schema_cache_lock = threading.Lock()
+
 
 def _isinstance_list_of_str_tuples_lists(obj: Any) -> bool:
     """Checks if the object is a list of tuples or listsof strings."""
@@ -275,6 +285,25 @@ class SqlTranslator:
             schema_dict = {catalog: schema_dict}
         return schema_dict
 
+    @classmethod
+    def _parse_ddl_schema(cls, ddls: str) -> tuple[SQLGlotSchemaType, MappingSchema]:
+        """Parses DDL statements once per distinct text, in a bounded LRU cache.
+
+        The returned objects are shared and must not be modified.
+        """
+        key = hashlib.sha256(ddls.encode("utf-8")).hexdigest()
+        with _schema_cache_lock:
+            if key in _schema_cache:
+                _schema_cache.move_to_end(key)
+                return _schema_cache[key]
+        schema_dict = cls.format_schema(cls.extract_schema_from_ddls(ddls))
+        parsed = (schema_dict, MappingSchema(schema_dict, dialect=cls.OUTPUT_DIALECT))
+        with _schema_cache_lock:
+            _schema_cache[key] = parsed
+            while len(_schema_cache) > SCHEMA_CACHE_SIZE:
+                _schema_cache.popitem(last=False)
+        return parsed
+
     @classmethod
     def rewrite_schema_for_sqlglot(
         cls, schema: str | SQLGlotSchemaType | BirdSampleType
@@ -283,8 +312,7 @@ class SqlTranslator:
         schema_dict = None
         if schema:
             if isinstance(schema, str):
-                schema = cls.extract_schema_from_ddls(schema)
-                schema_dict = cls.format_schema(schema)
+                schema_dict, _ = cls._parse_ddl_schema(schema)
             elif _isinstance_sqlglot_schema_type(schema):
                 schema_dict = schema
             elif _isinstance_bird_sample_type(schema):
@@ -295,6 +323,18 @@ class SqlTranslator:
                 raise TypeError(f"Unsupported schema type: {type(schema)}")
         return schema_dict
 
+    @classmethod
+    def mapping_schema_for_sqlglot(
+        cls, schema: str | SQLGlotSchemaType | BirdSampleType | None
+    ) -> MappingSchema | None:
+        """Returns the schema as a SQLGlot MappingSchema, cached for DDL text."""
+        if not schema:
+            return None
+        if isinstance(schema, str):
+            _, mapping_schema = cls._parse_ddl_schema(schema)
+            return mapping_schema
+        return MappingSchema(cls.rewrite_schema_for_sqlglot(schema), dialect=cls.OUTPUT_DIALECT)
+
     @classmethod
     def _check_for_errors(
         cls,
@@ -302,7 +342,7 @@ class SqlTranslator:
         sql_dialect: str,
         db: str | None = None,
         catalog: str | None = None,
-        schema_dict: SQLGlotSchemaType | None = None,
+        schema_dict: SQLGlotSchemaType | MappingSchema | None = None,
     ) -> tuple[str | None, str]:
         """Checks for errors in the SQL query.
 
@@ -313,7 +353,7 @@ class SqlTranslator:
           catalog: The catalog to use for the translation. `catalog` is the SQLGlot
             term for the project ID. This field is optional.
           schema_dict: The DDL schema to use for the translation. The DDL format is
-            in the SQLGlot format. This field is optional.
+            the SQLGlot format or a SQLGlot MappingSchema. This field is optional.
 
         Returns:
           tuple of the errors in the SQL query, or None if there are no errors, and
@@ -381,7 +421,7 @@ class SqlTranslator:
             sql_dialect=self.OUTPUT_DIALECT,
             db=db,
             catalog=catalog,
-            schema_dict=schema_dict,
+            schema_dict=self.mapping_schema_for_sqlglot(ddl_schema),
         )
         errors, sql_query = errors_and_sql
         responses = sql_query  # Default to the input SQL query after error check.
@@ -398,9 +438,8 @@ class SqlTranslator:
                 sql_query=sql_query,
                 schema_insert=schema_insert,
             )
-            requests: list[str] = [prompt for _ in range(number_of_candidates)]
-            responses: list[str] = self._model.call_parallel(
-                requests, parser_func=self._parse_response
+            responses: list[str] = self._model.generate_n(
+                prompt, number_of_candidates, parser_func=self._parse_response
             )
             if responses:
                 # We only use the first response. Therefore the `number_of_candidates`
@@ -0,0 +1,300 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Local checks of generated SQL against the schema, before calling BigQuery.
+
+`validate_sql` parses the query with sqlglot and qualifies it against the
+schema parsed from the DDL (cached by `SqlTranslator`), then reports:
+
+- syntax errors;
+- tables missing from the agent's dataset, and columns that can't be resolved
+  (with close matches as suggestions);
+- JOIN conditions comparing columns of incompatible types (e.g. STRING with
+  INT64);
+- selected columns that are neither aggregated nor in the GROUP BY (columns
+  inside functions sqlglot doesn't know count as aggregated).
+
+Each problem is a dict with a `type`, a `message` for the model, and
+sometimes `suggestions`. The checks are conservative: queries reading other
+datasets aren't judged, and column checks are skipped for tables with RECORD
+columns, whose nested fields the DDL doesn't describe. Anything else is left
+to BigQuery.
+"""
+
+import difflib
+import logging
+import os
+import re
+
+import sqlglot
+from sqlglot import exp
+from sqlglot.optimizer.annotate_types import annotate_types
+from sqlglot.optimizer.qualify import qualify
+from sqlglot.schema import MappingSchema, Schema
+
+from .chase_sql.sql_postprocessor.sql_translator import SqlTranslator
+
+LOCAL_VALIDATION_ENABLED = bool(int(os.getenv("BQ_LOCAL_VALIDATION", "1")))
+
+# Type families BigQuery can compare with `=` without an explicit CAST.
+_TYPE_FAMILIES = (
+    ("numeric", exp.DataType.NUMERIC_TYPES),
+    ("string", exp.DataType.TEXT_TYPES),
+    ("temporal", exp.DataType.TEMPORAL_TYPES),
+    ("boolean", {exp.DataType.Type.BOOLEAN}),
+    ("bytes", {exp.DataType.Type.VARBINARY, exp.DataType.Type.BINARY}),
+)
+_UNRESOLVED_COLUMN = re.compile(r"Column '([^']+)' could not be resolved")
+
+
+def schema_for_ddl(ddl_schema: str | None) -> MappingSchema | None:
+    """Returns the cached sqlglot schema for the DDL, or None if it has no tables."""
+    if not ddl_schema:
+        return None
+    schema = SqlTranslator.mapping_schema_for_sqlglot(ddl_schema)
+    return None if schema is None or schema.empty else schema
+
+
+def _error(error_type: str, message: str, suggestions: list[str] | None = None) -> dict:
+    error = {"type": error_type, "message": message}
+    if suggestions:
+        error["suggestions"] = suggestions
+    return error
+
+
+def _type_family(data_type: exp.DataType | None) -> str | None:
+    if data_type is None:
+        return None
+    for family, types in _TYPE_FAMILIES:
+        if data_type.this in types:
+            return family
+    return None
+
+
+def _datasets(schema: MappingSchema) -> set[str]:
+    """Lowercased dataset names in the schema; empty if tables aren't qualified."""
+    if schema.depth() == 3:
+        return {db.lower() for datasets in schema.mapping.values() for db in datasets}
+    if schema.depth() == 2:
+        return {db.lower() for db in schema.mapping}
+    return set()
+
+
+def _table_names(schema: MappingSchema) -> list[str]:
+    names = []
+
+    def collect(mapping, depth):
+        for key, value in mapping.items():
+            if depth == 1:
+                names.append(key)
+            else:
+                collect(value, depth - 1)
+
+    collect(schema.mapping, schema.depth())
+    return names
+
+
+def _check_tables(ast: exp.Expression, schema: MappingSchema) -> tuple[list[dict], list[exp.Table], bool]:
+    """Returns (errors, known tables, whether every table was checked)."""
+    cte_names = {cte.alias_or_name for cte in ast.find_all(exp.CTE)}
+    datasets = _datasets(schema)
+    errors, known, complete = [], [], True
+    for table in ast.find_all(exp.Table):
+        if not table.db and table.name in cte_names:
+            continue
+        if not table.name or (table.db and datasets and table.db.lower() not in datasets):
+            # UNNEST, table functions or another dataset: BigQuery decides.
+            complete = False
+            continue
+        if schema.find(table, raise_on_missing=False) is None:
+            errors.append(
+                _error(
+                    "unknown_table",
+                    f"Table '{table.name}' does not exist in the dataset.",
+                    difflib.get_close_matches(table.name, _table_names(schema), n=3),
+                )
+            )
+        else:
+            known.append(table)
+    return errors, known, complete
+
+
+def _check_join_types(ast: exp.Expression) -> list[dict]:
+    errors = []
+    for join in ast.find_all(exp.Join):
+        condition = join.args.get("on")
+        if condition is None:
+            continue
+        for eq in condition.find_all(exp.EQ):
+            left, right = eq.left, eq.right
+            if not isinstance(left, exp.Column) or not isinstance(right, exp.Column):
+                continue
+            left_family, right_family = _type_family(left.type), _type_family(right.type)
+            if left_family and right_family and left_family != right_family:
+                errors.append(
+                    _error(
+                        "join_type_mismatch",
+                        f"JOIN condition compares {left.sql('bigquery')} ({left.type.sql('bigquery')})"
+                        f" with {right.sql('bigquery')} ({right.type.sql('bigquery')});"
+                        " CAST one side to the other's type.",
+                    )
+                )
+    return errors
+
+
+def _is_bare(column: exp.Column, select: exp.Select) -> bool:
+    """True if `column` belongs to `select` itself, outside aggregates and windows.
+
+    Functions sqlglot doesn't know (`exp.Anonymous`) may be aggregates, e.g.
+    APPROX_QUANTILES, BIT_OR or HLL_COUNT.MERGE, so columns under them count
+    as aggregated.
+    """
+    node = column.parent
+    while node is not None and node is not select:
+        if isinstance(node, (exp.AggFunc, exp.Window, exp.Select, exp.Anonymous)):
+            return False
+        node = node.parent
+    return node is select
+
+
+def _check_group_by(ast: exp.Expression) -> list[dict]:
+    errors = []
+    for select in ast.find_all(exp.Select):
+        group = select.args.get("group")
+        projections = [projection.unalias() for projection in select.expressions]
+        aggregates = [
+            aggregate
+            for projection in projections
+            for aggregate in projection.find_all(exp.AggFunc)
+            if not aggregate.find_ancestor(exp.Window)
+            and aggregate.find_ancestor(exp.Select) is select
+        ]
+        if not group and not aggregates:
+            continue
+        if group and group.args.get("all"):
+            continue
+        grouped, grouped_columns = [], set()
+        if group:
+            grouped = list(group.expressions) + [
+                expression
+                for node in group.find_all(exp.Rollup, exp.Cube, exp.GroupingSets, exp.Tuple)
+                for expression in node.expressions
+            ]
+            grouped_columns = set(group.find_all(exp.Column))
+        reported = set()
+        for projection in projections:
+            if projection in grouped:
+                continue
+            for column in projection.find_all(exp.Column):
+                if column in grouped_columns or column in reported or not _is_bare(column, select):
+                    continue
+                reported.add(column)
+                errors.append(
+                    _error(
+                        "not_grouped",
+                        f"SELECT list expression references {column.sql('bigquery')},"
+                        " which is neither grouped nor aggregated; add it to"
+                        " GROUP BY or wrap it in an aggregate such as ANY_VALUE.",
+                    )
+                )
+    return errors
+
+
+def validate_sql(
+    sql: str,
+    schema: Schema | None,
+    db: str | None = None,
+    catalog: str | None = None,
+) -> list[dict]:
+    """Returns the problems found in `sql` without contacting BigQuery.
+
+    Args:
+        sql: The query, in GoogleSQL.
+        schema: The sqlglot schema of the dataset (see `schema_for_ddl`). Only
+            the syntax is checked without one.
+        db: The default dataset for unqualified tables.
+        catalog: The default project for unqualified tables.
+
+    Returns:
+        A list of errors, each a dict with `type`, `message` and optionally
+        `suggestions`; empty if no problem was found.
+    """
+    try:
+        ast = sqlglot.parse_one(sql, read="bigquery", error_level=sqlglot.ErrorLevel.IMMEDIATE)
+    except sqlglot.errors.SqlglotError as e:
+        return [_error("syntax", f"Syntax error: {e}")]
+    if not isinstance(ast, exp.Query) or not isinstance(schema, MappingSchema):
+        return []
+
+    cte_names = {cte.alias_or_name for cte in ast.find_all(exp.CTE)}
+    for table in ast.find_all(exp.Table):
+        if table.name and not table.db and db and table.name not in cte_names:
+            table.set("db", exp.to_identifier(db))
+            if catalog and not table.catalog:
+                table.set("catalog", exp.to_identifier(catalog))
+    errors, known_tables, complete = _check_tables(ast, schema)
+    if errors or not complete:
+        return errors
+    for table in known_tables:
+        column_types = schema.find(table, raise_on_missing=False) or {}
+        if any(
+            schema.get_column_type(table, column).is_type(exp.DataType.Type.STRUCT)
+            for column in column_types
+        ):
+            return []
+
+    try:
+        qualified = qualify(
+            ast.copy(),
+            schema=schema,
+            dialect="bigquery",
+            validate_qualify_columns=True,
+            # Keep the query's own identifiers; BigQuery's case rules apply there.
+            identify=False,
+        )
+    except sqlglot.errors.SqlglotError as e:
+        match = _UNRESOLVED_COLUMN.search(str(e))
+        # Other qualification errors and pseudo-columns (_PARTITIONTIME,
+        # _TABLE_SUFFIX) may be fine for BigQuery.
+        if not match or match.group(1).startswith("_"):
+            return []
+        column_names = {
+            column
+            for table in known_tables
+            for column in (schema.find(table, raise_on_missing=False) or {})
+        }
+        return [
+            _error(
+                "unknown_column",
+                f"Column '{match.group(1)}' does not exist in the tables of the query.",
+                difflib.get_close_matches(match.group(1), sorted(column_names), n=3),
+            )
+        ]
+    try:
+        annotated = annotate_types(qualified, schema=schema, dialect="bigquery")
+        return _check_join_types(annotated) + _check_group_by(annotated)
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logging.warning("Skipping local JOIN and GROUP BY checks: %s", e)
+        return []
+
+
+def format_errors(errors: list[dict]) -> str:
+    """Formats validation errors as a single message for the model."""
+    messages = []
+    for error in errors:
+        message = error["message"]
+        if error.get("suggestions"):
+            message += f" Did you mean: {', '.join(error['suggestions'])}?"
+        messages.append(message)
+    return " ".join(messages)
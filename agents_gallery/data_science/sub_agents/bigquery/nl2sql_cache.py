@@ -0,0 +1,121 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Cache of natural language questions to SQL that ran successfully.
+
+Questions are normalized (case, punctuation, whitespace) and looked up per
+schema version, first exactly and then by character-trigram Jaccard
+similarity, so small rewordings ("How many orders were placed in 2024?" /
+"how many orders placed in 2024") reuse the SQL. A similar question must also
+have exactly the same content words (everything but a short list of function
+words), so questions differing in a filter or measure ("in 2023", "by week",
+"profit") never share SQL. Comparison and sign characters (`<`, `>`, `=`,
+`!`, `%`, `$`, `-`) are kept as words, so "revenue > 100" and "revenue < 100"
+don't either.
+"""
+
+import collections
+import os
+import re
+import threading
+
+NL2SQL_CACHE_SIZE = int(os.getenv("BQ_NL2SQL_CACHE_SIZE", "256"))
+NL2SQL_CACHE_SIMILARITY = float(os.getenv("BQ_NL2SQL_CACHE_SIMILARITY", "0.75"))
+
+_FUNCTION_WORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "been", "do", "does",
+    "did", "s", "of", "please", "me", "us", "can", "could", "you", "i", "we",
+    "what", "which", "show", "list", "give", "tell", "get", "find", "there",
+}
+# Words, and runs of the punctuation that changes what a question filters on.
+_TOKEN_PATTERN = re.compile(r"\w+|[<>=!%$-]+")
+
+
+def normalize_question(question: str) -> str:
+    return " ".join(_TOKEN_PATTERN.findall(question.lower()))
+
+
+def trigrams(normalized: str) -> frozenset[str]:
+    padded = f"  {normalized} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def content_words(normalized: str) -> frozenset[str]:
+    return frozenset(normalized.split()) - _FUNCTION_WORDS
+
+
+def jaccard(a: frozenset[str], b: frozenset[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class NL2SQLCache:
+    """Thread-safe LRU map of (schema version, question) to validated SQL."""
+
+    def __init__(
+        self,
+        max_entries: int = NL2SQL_CACHE_SIZE,
+        min_similarity: float = NL2SQL_CACHE_SIMILARITY,
+    ):
+        self.max_entries = max_entries
+        self.min_similarity = min_similarity
+        # (schema version, normalized question) -> (trigrams, content words, sql)
+        self._entries: collections.OrderedDict = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, question: str, schema_version: str | None) -> str | None:
+        """Returns SQL for `question` or a similar enough cached one, else None."""
+        normalized = normalize_question(question)
+        if self.max_entries <= 0 or not normalized:
+            return None
+        key = (schema_version, normalized)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key][2]
+
+            question_trigrams = trigrams(normalized)
+            question_words = content_words(normalized)
+            best_key, best_similarity = None, self.min_similarity
+            for (version, cached_question), (cached_trigrams, words, _) in self._entries.items():
+                if version != schema_version or words != question_words:
+                    continue
+                similarity = jaccard(question_trigrams, cached_trigrams)
+                if similarity >= best_similarity:
+                    best_key, best_similarity = (version, cached_question), similarity
+            if best_key is None:
+                return None
+            self._entries.move_to_end(best_key)
+            return self._entries[best_key][2]
+
+    def put(self, question: str, schema_version: str | None, sql: str) -> None:
+        normalized = normalize_question(question)
+        if self.max_entries <= 0 or not normalized:
+            return
+        with self._lock:
+            self._entries[(schema_version, normalized)] = (
+                trigrams(normalized), content_words(normalized), sql
+            )
+            self._entries.move_to_end((schema_version, normalized))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# Shared by all sessions served by this process.
+NL2SQL_CACHE = NL2SQLCache()
@@ -0,0 +1,125 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""In-process cache of `run_bigquery_validation` results.
+
+Entries are keyed by the schema version and the query in a canonical form
+(parsed and re-generated by sqlglot, so whitespace, keyword case and comments
+don't matter), expire after `BQ_RESULT_CACHE_TTL` seconds and are evicted least
+recently used beyond `BQ_RESULT_CACHE_SIZE` entries. Like BigQuery's own
+results cache, queries using non-deterministic functions are never cached, and
+neither is anything sqlglot can't parse as exactly one statement.
+"""
+
+import collections
+import copy
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Hashable
+
+import sqlglot
+
+RESULT_CACHE_TTL_SECONDS = float(os.getenv("BQ_RESULT_CACHE_TTL", "300"))
+RESULT_CACHE_SIZE = int(os.getenv("BQ_RESULT_CACHE_SIZE", "128"))
+
+# Functions whose result changes between runs; BigQuery doesn't cache them either.
+_NON_DETERMINISTIC = re.compile(
+    r"\b(CURRENT_(DATE|TIME|DATETIME|TIMESTAMP)|RAND|GENERATE_UUID|SESSION_USER)\b",
+    re.IGNORECASE,
+)
+
+
+def canonical_sql(sql: str) -> str | None:
+    """Returns `sql` in a canonical BigQuery form, or None unless it is one parsable statement."""
+    try:
+        statements = [
+            statement
+            for statement in sqlglot.parse(sql, read="bigquery")
+            if statement is not None
+        ]
+    except sqlglot.errors.SqlglotError:
+        return None
+    if len(statements) != 1:
+        return None
+    return statements[0].sql(dialect="bigquery", comments=False)
+
+
+def is_cacheable(sql: str) -> bool:
+    """Whether the results of `sql` only depend on the data it reads."""
+    return not _NON_DETERMINISTIC.search(sql)
+
+
+class QueryResultCache:
+    """Thread-safe LRU cache with a per-entry TTL."""
+
+    def __init__(
+        self,
+        max_entries: int = RESULT_CACHE_SIZE,
+        ttl_seconds: float = RESULT_CACHE_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: collections.OrderedDict[Hashable, tuple[float, Any]] = (
+            collections.OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def get(self, key: Hashable) -> Any | None:
+        """Returns a copy of the cached value, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if self._clock() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return copy.deepcopy(value)
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock(), copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def cache_key(sql: str, schema_version: str | None) -> tuple[str | None, str] | None:
+    """Returns the cache key of `sql`, or None if its results must not be cached."""
+    canonical = canonical_sql(sql)
+    if canonical is None or not is_cacheable(sql):
+        return None
+    return (schema_version, canonical)
+
+
+# Shared by all sessions served by this process.
+RESULT_CACHE = QueryResultCache()
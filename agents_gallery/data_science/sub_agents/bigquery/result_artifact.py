@@ -0,0 +1,125 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Columnar handoff of query results from the database agent to the analytics agent.
+
+`run_bigquery_validation` saves its result rows as a Parquet artifact and keeps
+only a small summary (row count, column types, a few rows) in session state.
+`call_ds_agent` loads the artifact, gives it to the code executor as an input
+file and puts the summary, not the data, in the analytics agent's prompt.
+"""
+
+import base64
+import io
+from typing import Any
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from google.adk.code_executors.code_execution_utils import File
+from google.adk.code_executors.code_executor_context import CodeExecutorContext
+from google.genai import types
+
+QUERY_RESULT_ARTIFACT = "query_result.parquet"
+PARQUET_MIME_TYPE = "application/vnd.apache.parquet"
+# State key of the summary written next to the artifact.
+QUERY_RESULT_SUMMARY_KEY = "query_result_artifact"
+SUMMARY_HEAD_ROWS = 5
+
+
+def rows_to_table(rows: list[dict[str, Any]]) -> pa.Table:
+    return pa.Table.from_pylist(rows)
+
+
+def table_to_parquet(table: pa.Table) -> bytes:
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer)
+    return buffer.getvalue()
+
+
+def _json_value(value: Any) -> Any:
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def summarize_table(table: pa.Table, head_rows: int = SUMMARY_HEAD_ROWS) -> dict[str, Any]:
+    """Returns the row count, column types and first rows of a result table.
+
+    The summary is kept in session state, so values are JSON-serializable.
+    """
+    return {
+        "filename": QUERY_RESULT_ARTIFACT,
+        "num_rows": table.num_rows,
+        "columns": {field.name: str(field.type) for field in table.schema},
+        "head": [
+            {name: _json_value(value) for name, value in row.items()}
+            for row in table.slice(0, head_rows).to_pylist()
+        ],
+    }
+
+
+def save_query_result(tool_context: Any, rows: list[dict[str, Any]]) -> dict[str, Any]:
+    """Saves `rows` as the Parquet query result artifact and returns its summary.
+
+    Raises:
+        ValueError: If no artifact service is configured.
+    """
+    table = rows_to_table(rows)
+    tool_context.save_artifact(
+        QUERY_RESULT_ARTIFACT,
+        types.Part.from_bytes(data=table_to_parquet(table), mime_type=PARQUET_MIME_TYPE),
+    )
+    return summarize_table(table)
+
+
+def format_summary(summary: dict[str, Any]) -> str:
+    """Formats a result summary for a prompt: file name, schema and head."""
+    columns = "\n".join(f"  - {name}: {dtype}" for name, dtype in summary["columns"].items())
+    head = "\n".join(f"  {row}" for row in summary["head"])
+    return (
+        f"File `{summary['filename']}` ({summary['num_rows']} rows), load it with"
+        f" `pd.read_parquet('{summary['filename']}')`.\n"
+        f"Columns:\n{columns}\n"
+        f"First {len(summary['head'])} rows:\n{head}"
+    )
+
+
+def attach_query_result(tool_context: Any) -> dict[str, Any] | None:
+    """Adds the latest query result artifact as a code executor input file.
+
+    Returns:
+        The result summary, or None if there is no artifact to attach.
+    """
+    summary = tool_context.state.get(QUERY_RESULT_SUMMARY_KEY)
+    if not summary:
+        return None
+    artifact = tool_context.load_artifact(summary["filename"])
+    if artifact is None or artifact.inline_data is None:
+        return None
+    code_executor_context = CodeExecutorContext(tool_context.state)
+    # Reset first so the list is (re)created through the state, and recorded.
+    code_executor_context.clear_input_files()
+    code_executor_context.add_input_files([
+        File(
+            name=summary["filename"],
+            content=base64.b64encode(artifact.inline_data.data).decode("ascii"),
+            mime_type=PARQUET_MIME_TYPE,
+        )
+    ])
+    return summary
+
+
+def detach_query_result(tool_context: Any) -> None:
+    """Removes the input files added by `attach_query_result` from session state."""
+    CodeExecutorContext(tool_context.state).clear_input_files()
@@ -0,0 +1,215 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Persistent, change-aware cache of the dataset DDL schema.
+
+The DDL of each table is stored together with the table's `last_modified_time`
+in a JSON document per project/dataset, either on local disk or in GCS
+(`BQ_SCHEMA_CACHE_URI`, e.g. `gs://my-bucket/schema-cache`). A refresh lists
+the tables' modification times with one `__TABLES__` query and re-introspects
+only new or modified tables, so a cold start with an unchanged dataset costs
+one metadata query instead of a full schema build. Within
+`BQ_SCHEMA_CACHE_TRUST_SECONDS` of the last check even that query is skipped.
+"""
+
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Any
+
+from google.cloud import bigquery
+
+from . import schema_introspection
+
+SCHEMA_CACHE_URI = os.getenv(
+    "BQ_SCHEMA_CACHE_URI", os.path.join(tempfile.gettempdir(), "bq_schema_cache")
+)
+SCHEMA_CACHE_TRUST_SECONDS = float(os.getenv("BQ_SCHEMA_CACHE_TRUST_SECONDS", "300"))
+CACHE_FORMAT_VERSION = 1
+
+_TABLES_QUERY = """
+SELECT table_id, last_modified_time
+FROM `{project_id}.{dataset_id}.__TABLES__`
+WHERE type = 1
+"""
+
+
+@dataclasses.dataclass
+class SchemaSnapshot:
+    """The dataset schema as DDL, per table, plus a version that changes with it."""
+
+    project_id: str
+    dataset_id: str
+    # Table name -> {"last_modified": int ms, "columns": [...], "ddl": str}
+    tables: dict[str, dict[str, Any]]
+    checked_at: float = 0.0
+
+    @property
+    def table_ddls(self) -> dict[str, str]:
+        """Table name -> DDL, for base tables only, in table name order."""
+        return {
+            name: self.tables[name]["ddl"]
+            for name in sorted(self.tables)
+            if self.tables[name]["ddl"]
+        }
+
+    @property
+    def ddl(self) -> str:
+        """The full DDL schema: the DDL of every base table, in table name order."""
+        return "".join(self.table_ddls.values())
+
+    @property
+    def version(self) -> str:
+        """Short content hash of the DDL; changes whenever any table's DDL changes."""
+        return hashlib.sha256(self.ddl.encode("utf-8")).hexdigest()[:16]
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {"format": CACHE_FORMAT_VERSION, **dataclasses.asdict(self)}, indent=1
+        )
+
+    @classmethod
+    def from_json(cls, text: str) -> "SchemaSnapshot | None":
+        data = json.loads(text)
+        if data.pop("format", None) != CACHE_FORMAT_VERSION:
+            return None
+        return cls(**data)
+
+
+def _cache_path(cache_uri: str, project_id: str, dataset_id: str) -> str:
+    return f"{cache_uri.rstrip('/')}/{project_id}.{dataset_id}.json"
+
+
+def _read_text(path: str) -> str | None:
+    if path.startswith("gs://"):
+        from google.cloud import storage  # pylint: disable=import-outside-toplevel
+
+        blob = storage.Blob.from_string(path, client=storage.Client())
+        return blob.download_as_text() if blob.exists() else None
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def _write_text(path: str, text: str) -> None:
+    if path.startswith("gs://"):
+        from google.cloud import storage  # pylint: disable=import-outside-toplevel
+
+        storage.Blob.from_string(path, client=storage.Client()).upload_from_string(
+            text, content_type="application/json"
+        )
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write then rename, so concurrent readers never see a partial file.
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(cache_uri: str, project_id: str, dataset_id: str) -> SchemaSnapshot | None:
+    """Reads the cached snapshot, or None if missing, unreadable or outdated."""
+    path = _cache_path(cache_uri, project_id, dataset_id)
+    try:
+        text = _read_text(path)
+        return SchemaSnapshot.from_json(text) if text else None
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logging.warning("Ignoring unreadable schema cache %s: %s", path, e)
+        return None
+
+
+def save_snapshot(cache_uri: str, snapshot: SchemaSnapshot) -> None:
+    """Writes the snapshot; failures are logged, the cache is only an optimization."""
+    path = _cache_path(cache_uri, snapshot.project_id, snapshot.dataset_id)
+    try:
+        _write_text(path, snapshot.to_json())
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logging.warning("Could not write schema cache %s: %s", path, e)
+
+
+def fetch_table_modification_times(
+    client: bigquery.Client, project_id: str, dataset_id: str
+) -> dict[str, int]:
+    """Returns table name -> last modification time (ms since epoch) for all tables."""
+    query = _TABLES_QUERY.format(project_id=project_id, dataset_id=dataset_id)
+    return {
+        row["table_id"]: int(row["last_modified_time"])
+        for row in client.query(query).result()
+    }
+
+
+def refresh_snapshot(
+    client: bigquery.Client,
+    project_id: str,
+    dataset_id: str,
+    cached: SchemaSnapshot | None = None,
+) -> SchemaSnapshot:
+    """Brings `cached` up to date, re-introspecting only new or modified tables."""
+    modified = fetch_table_modification_times(client, project_id, dataset_id)
+    previous = cached.tables if cached else {}
+    stale = sorted(
+        name
+        for name, last_modified in modified.items()
+        if previous.get(name, {}).get("last_modified") != last_modified
+    )
+    tables = {name: previous[name] for name in modified if name not in stale}
+
+    if stale:
+        logging.info(
+            "Schema cache: introspecting %d of %d tables in %s.%s",
+            len(stale), len(modified), project_id, dataset_id,
+        )
+        columns = schema_introspection.fetch_dataset_columns(
+            client, project_id, dataset_id, table_names=stale
+        )
+        ddls = schema_introspection.build_table_ddls(
+            client, project_id, dataset_id, columns
+        )
+        for name in stale:
+            # Tables without columns here are not base tables (e.g. snapshots);
+            # they are remembered with an empty DDL so they aren't re-checked.
+            tables[name] = {
+                "last_modified": modified[name],
+                "columns": columns.get(name, []),
+                "ddl": ddls.get(name, ""),
+            }
+
+    return SchemaSnapshot(
+        project_id=project_id,
+        dataset_id=dataset_id,
+        tables=tables,
+        checked_at=time.time(),
+    )
+
+
+def get_schema_snapshot(
+    client: bigquery.Client,
+    project_id: str,
+    dataset_id: str,
+    cache_uri: str = SCHEMA_CACHE_URI,
+    trust_seconds: float = SCHEMA_CACHE_TRUST_SECONDS,
+) -> SchemaSnapshot:
+    """Returns the dataset schema, using and updating the persistent cache."""
+    cached = load_snapshot(cache_uri, project_id, dataset_id)
+    if cached and time.time() - cached.checked_at < trust_seconds:
+        return cached
+
+    snapshot = refresh_snapshot(client, project_id, dataset_id, cached)
+    save_snapshot(cache_uri, snapshot)
+    return snapshot
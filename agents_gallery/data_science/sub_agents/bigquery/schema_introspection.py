@@ -0,0 +1,215 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""BigQuery schema introspection used to build the DDL given to the agents.
+
+Column metadata for a whole dataset comes from one INFORMATION_SCHEMA query and
+example rows for every table are fetched concurrently with `list_rows`
+(tabledata.list, which is not billed). The DDL text is built directly from the
+returned rows, in the same format the agents and the ChaseSQL translator expect.
+"""
+
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from google.cloud import bigquery
+
+SAMPLE_ROWS_PER_TABLE = 5
+# Concurrent `list_rows` calls used to fetch example rows.
+SCHEMA_MAX_WORKERS = int(os.getenv("BQ_SCHEMA_MAX_WORKERS", "8"))
+
+# INFORMATION_SCHEMA reports GoogleSQL type names; the DDL keeps the legacy
+# names returned by `SchemaField.field_type` so prompts stay unchanged.
+_LEGACY_TYPE_NAMES = {
+    "INT64": "INTEGER",
+    "FLOAT64": "FLOAT",
+    "BOOL": "BOOLEAN",
+    "STRUCT": "RECORD",
+}
+# Types whose values `list_rows` can decode from a flat SchemaField.
+_SCALAR_TYPES = {
+    "STRING", "BYTES", "INTEGER", "FLOAT", "NUMERIC", "BIGNUMERIC", "BOOLEAN",
+    "TIMESTAMP", "DATE", "TIME", "DATETIME", "GEOGRAPHY", "JSON", "INTERVAL",
+}
+
+_COLUMNS_QUERY = """
+SELECT
+  c.table_name,
+  c.column_name,
+  c.data_type,
+  f.description
+FROM `{project_id}.{dataset_id}`.INFORMATION_SCHEMA.COLUMNS AS c
+JOIN `{project_id}.{dataset_id}`.INFORMATION_SCHEMA.TABLES AS t
+  ON t.table_name = c.table_name
+LEFT JOIN `{project_id}.{dataset_id}`.INFORMATION_SCHEMA.COLUMN_FIELD_PATHS AS f
+  ON f.table_name = c.table_name
+  AND f.column_name = c.column_name
+  AND f.field_path = c.column_name
+WHERE t.table_type = 'BASE TABLE' AND c.is_hidden = 'NO'{table_filter}
+ORDER BY c.table_name, c.ordinal_position
+"""
+
+
+def legacy_field_type(data_type: str) -> tuple[str, bool]:
+    """Maps an INFORMATION_SCHEMA data type to (legacy type name, is repeated).
+
+    For example `ARRAY<INT64>` -> ("INTEGER", True) and `STRING(10)` ->
+    ("STRING", False).
+    """
+    data_type = data_type.strip()
+    repeated = data_type.upper().startswith("ARRAY<")
+    if repeated:
+        data_type = data_type[len("ARRAY<"):-1].strip()
+    base_type = re.match(r"\w+", data_type).group(0).upper()
+    return _LEGACY_TYPE_NAMES.get(base_type, base_type), repeated
+
+
+def fetch_dataset_columns(
+    client: bigquery.Client,
+    project_id: str,
+    dataset_id: str,
+    table_names: list[str] | None = None,
+) -> dict[str, list[dict[str, Any]]]:
+    """Returns the visible columns of every base table in the dataset.
+
+    Args:
+        client (bigquery.Client): A BigQuery client.
+        project_id (str): The project that owns the dataset.
+        dataset_id (str): The dataset to describe.
+        table_names (list[str] | None): Only describe these tables (all if None).
+
+    Returns:
+        dict: Table name -> ordered list of columns, each a dict with `name`,
+            `field_type` (legacy type name), `repeated` and `description`.
+    """
+    job_config = None
+    table_filter = ""
+    if table_names is not None:
+        table_filter = "\n  AND c.table_name IN UNNEST(@table_names)"
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[
+                bigquery.ArrayQueryParameter("table_names", "STRING", list(table_names))
+            ]
+        )
+    query = _COLUMNS_QUERY.format(
+        project_id=project_id, dataset_id=dataset_id, table_filter=table_filter
+    )
+    tables: dict[str, list[dict[str, Any]]] = {}
+    for row in client.query(query, job_config=job_config).result():
+        field_type, repeated = legacy_field_type(row["data_type"])
+        tables.setdefault(row["table_name"], []).append(
+            {
+                "name": row["column_name"],
+                "field_type": field_type,
+                "repeated": repeated,
+                "description": row["description"],
+            }
+        )
+    return tables
+
+
+def _table_for_list_rows(table_ref: bigquery.TableReference, columns: list[dict[str, Any]]) -> bigquery.Table:
+    """Builds a Table carrying its schema, so `list_rows` doesn't call `get_table` first.
+
+    Nested types (RECORD, RANGE) need their full sub-schema to be decoded; for
+    those tables the schema is left empty and `list_rows` fetches it itself.
+    """
+    if any(column["field_type"] not in _SCALAR_TYPES for column in columns):
+        return bigquery.Table(table_ref)
+    schema = [
+        bigquery.SchemaField(
+            column["name"],
+            column["field_type"],
+            mode="REPEATED" if column["repeated"] else "NULLABLE",
+        )
+        for column in columns
+    ]
+    return bigquery.Table(table_ref, schema=schema)
+
+
+def fetch_sample_rows(
+    client: bigquery.Client,
+    table_ref: bigquery.TableReference,
+    columns: list[dict[str, Any]],
+    max_results: int = SAMPLE_ROWS_PER_TABLE,
+) -> list[tuple]:
+    """Returns up to `max_results` example rows of a table as value tuples."""
+    table = _table_for_list_rows(table_ref, columns)
+    return [row.values() for row in client.list_rows(table, max_results=max_results)]
+
+
+def _format_example_value(value: Any) -> str:
+    if isinstance(value, str):
+        return f"'{value}'"
+    if value is None:
+        return "NULL"
+    return f"{value}"
+
+
+def build_table_ddl(
+    table_ref: bigquery.TableReference | str,
+    columns: list[dict[str, Any]],
+    sample_rows: list[tuple],
+) -> str:
+    """Builds the CREATE TABLE statement plus example INSERTs for one table."""
+    ddl_statement = f"CREATE OR REPLACE TABLE `{table_ref}` (\n"
+    for column in columns:
+        ddl_statement += f"  `{column['name']}` {column['field_type']}"
+        if column["repeated"]:
+            ddl_statement += " ARRAY"
+        if column["description"]:
+            ddl_statement += f" COMMENT '{column['description']}'"
+        ddl_statement += ",\n"
+    ddl_statement = ddl_statement[:-2] + "\n);\n\n"
+
+    if sample_rows:
+        ddl_statement += f"-- Example values for table `{table_ref}`:\n"
+        for row in sample_rows:
+            ddl_statement += f"INSERT INTO `{table_ref}` VALUES\n"
+            ddl_statement += (
+                "(" + ",".join(_format_example_value(value) for value in row) + ");\n\n"
+            )
+    return ddl_statement
+
+
+def build_table_ddls(
+    client: bigquery.Client,
+    project_id: str,
+    dataset_id: str,
+    tables: dict[str, list[dict[str, Any]]],
+    max_workers: int = SCHEMA_MAX_WORKERS,
+) -> dict[str, str]:
+    """Fetches example rows for `tables` concurrently and returns table name -> DDL.
+
+    A table whose example rows can't be read still gets its CREATE statement.
+    """
+    dataset_ref = bigquery.DatasetReference(project_id, dataset_id)
+
+    def table_ddl(table_name: str) -> str:
+        table_ref = dataset_ref.table(table_name)
+        try:
+            sample_rows = fetch_sample_rows(client, table_ref, tables[table_name])
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logging.warning("Could not read example rows for %s: %s", table_ref, e)
+            sample_rows = []
+        return build_table_ddl(table_ref, tables[table_name], sample_rows)
+
+    table_names = sorted(tables)
+    if not table_names:
+        return {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(table_names)))) as executor:
+        return dict(zip(table_names, executor.map(table_ddl, table_names)))
@@ -0,0 +1,206 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Question-aware schema pruning for the NL2SQL prompts.
+
+Every table of the dataset is indexed as one BM25 document made of its name,
+column names, column descriptions and example values. For a question, tables
+are ranked by BM25 score, boosted when they can be joined with a higher-ranked
+table, and only the DDL of the top `BQ_SCHEMA_TOP_K` tables is put in the
+prompt, followed by join hints for the selected tables. Two tables can be
+joined when a `<table>_id` column of one refers to the `id` column of the other
+(`orders.customer_id` -> `customers.id`), or when both have the same `*_id` or
+`*_key` column. A bare `id` is each table's own key and joins nothing by
+itself. Datasets with at most `top_k` tables, and questions that match nothing,
+get the full schema.
+"""
+
+import collections
+import math
+import os
+import re
+from typing import Any
+
+# Tables kept in NL2SQL prompts; 0 disables pruning.
+SCHEMA_TOP_K = int(os.getenv("BQ_SCHEMA_TOP_K", "8"))
+
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+# Share of a related table's score given to a table it can be joined with.
+_JOIN_BOOST = 0.3
+# Table and column names are repeated so they outweigh example values.
+_TABLE_NAME_WEIGHT = 3
+_COLUMN_NAME_WEIGHT = 2
+
+_STOP_WORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "do", "does", "for", "from",
+    "have", "how", "i", "in", "is", "it", "me", "many", "much", "of", "on", "or",
+    "show", "that", "the", "their", "there", "this", "to", "was", "were", "what",
+    "which", "who", "with", "give", "list", "get", "find", "all", "each", "per",
+}
+
+
+def tokenize(text: str) -> list[str]:
+    """Splits text and identifiers (snake_case, camelCase) into lowercase terms."""
+    text = re.sub(r"([a-z0-9])([A-Z])", r"\1 \2", text or "")
+    terms = []
+    for term in re.findall(r"[a-z0-9]+", text.lower()):
+        if term in _STOP_WORDS:
+            continue
+        terms.append(_singular(term))
+    return terms
+
+
+def _singular(term: str) -> str:
+    """Crude plural folding, enough to match "orders" with `order_id`."""
+    if len(term) > 3 and term.endswith("s") and not term.endswith("ss"):
+        return term[:-1]
+    return term
+
+
+def _is_key_column(name: str) -> bool:
+    """True for `*_id` and `*_key` columns, which tables share to be joined."""
+    name = name.lower()
+    return name.endswith("_id") or name.endswith("_key")
+
+
+def _example_values(ddl: str) -> str:
+    """Returns the example-row part of a table's DDL."""
+    _, _, examples = ddl.partition("-- Example values")
+    return examples
+
+
+class SchemaRetriever:
+    """BM25 index over the tables of one schema snapshot."""
+
+    def __init__(self, tables: dict[str, dict[str, Any]]):
+        # Only tables with a DDL are part of the prompt schema.
+        self.tables = {name: table for name, table in tables.items() if table["ddl"]}
+        self._term_counts: dict[str, collections.Counter] = {}
+        self._lengths: dict[str, int] = {}
+        document_frequency: collections.Counter = collections.Counter()
+        for name, table in self.tables.items():
+            terms = tokenize(name) * _TABLE_NAME_WEIGHT
+            for column in table["columns"]:
+                terms += tokenize(column["name"]) * _COLUMN_NAME_WEIGHT
+                terms += tokenize(column["description"] or "")
+            terms += tokenize(_example_values(table["ddl"]))
+            counts = collections.Counter(terms)
+            self._term_counts[name] = counts
+            self._lengths[name] = len(terms)
+            document_frequency.update(counts.keys())
+
+        count = len(self.tables)
+        self._average_length = (sum(self._lengths.values()) / count) if count else 0.0
+        self._idf = {
+            term: math.log(1 + (count - frequency + 0.5) / (frequency + 0.5))
+            for term, frequency in document_frequency.items()
+        }
+        # Key column name -> tables that have it.
+        self._key_tables: dict[str, set[str]] = collections.defaultdict(set)
+        # Singular table name -> (table, its `id` column), for tables with one.
+        id_columns: dict[str, tuple[str, str]] = {}
+        for name, table in self.tables.items():
+            for column in table["columns"]:
+                if _is_key_column(column["name"]):
+                    self._key_tables[column["name"].lower()].add(name)
+                elif column["name"].lower() == "id":
+                    id_columns[_singular(name.lower())] = (name, column["name"])
+        # (table, `<table>_id` column, referenced table, its `id` column)
+        self._references: list[tuple[str, str, str, str]] = []
+        for name, table in self.tables.items():
+            for column in table["columns"]:
+                column_name = column["name"].lower()
+                if not column_name.endswith("_id"):
+                    continue
+                referenced = id_columns.get(_singular(column_name[: -len("_id")]))
+                if referenced and referenced[0] != name:
+                    self._references.append((name, column["name"], *referenced))
+
+    def score(self, question: str) -> dict[str, float]:
+        """Returns the BM25 score of every table for `question`."""
+        query_terms = set(tokenize(question))
+        scores = {}
+        for name, counts in self._term_counts.items():
+            length_norm = 1 - _BM25_B + _BM25_B * self._lengths[name] / (self._average_length or 1.0)
+            score = 0.0
+            for term in query_terms:
+                frequency = counts.get(term, 0)
+                if frequency:
+                    score += self._idf[term] * frequency * (_BM25_K1 + 1) / (
+                        frequency + _BM25_K1 * length_norm
+                    )
+            scores[name] = score
+        return scores
+
+    def join_keys(self, table_names: list[str]) -> dict[str, list[str]]:
+        """Returns key column -> the given tables that share it (two or more)."""
+        selected = set(table_names)
+        return {
+            key: sorted(tables & selected)
+            for key, tables in sorted(self._key_tables.items())
+            if len(tables & selected) > 1
+        }
+
+    def references(self, table_names: list[str]) -> list[tuple[str, str, str, str]]:
+        """Returns (table, `<table>_id` column, referenced table, its `id` column) within the given tables."""
+        selected = set(table_names)
+        return [
+            reference
+            for reference in self._references
+            if reference[0] in selected and reference[2] in selected
+        ]
+
+    def select_tables(self, question: str, top_k: int) -> list[str]:
+        """Returns the names of the `top_k` tables most relevant to `question`.
+
+        All tables are returned when pruning is disabled, the dataset is small
+        enough, or the question matches no table at all.
+        """
+        if top_k <= 0 or len(self.tables) <= top_k:
+            return sorted(self.tables)
+        scores = self.score(question)
+        if not any(scores.values()):
+            return sorted(self.tables)
+
+        boosted = dict(scores)
+        for tables in self._key_tables.values():
+            best = max(scores[name] for name in tables)
+            for name in tables:
+                boosted[name] = max(boosted[name], scores[name] + _JOIN_BOOST * best)
+        for name, _, referenced, _ in self._references:
+            boosted[name] = max(boosted[name], scores[name] + _JOIN_BOOST * scores[referenced])
+            boosted[referenced] = max(boosted[referenced], scores[referenced] + _JOIN_BOOST * scores[name])
+        ranked = sorted(self.tables, key=lambda name: (-boosted[name], name))
+        return sorted(name for name in ranked[:top_k] if boosted[name] > 0)
+
+    def build_schema(self, question: str, top_k: int = SCHEMA_TOP_K) -> str:
+        """Returns the DDL schema to put in the prompt for `question`."""
+        selected = self.select_tables(question, top_k)
+        ddl = "".join(self.tables[name]["ddl"] for name in selected)
+        if len(selected) == len(self.tables):
+            return ddl
+
+        header = (
+            f"-- Showing the {len(selected)} of {len(self.tables)} tables in the"
+            " dataset most relevant to the question.\n"
+        )
+        hints = [
+            f"-- Tables `{name}` and `{referenced}` can be joined on `{name}`.`{column}` = `{referenced}`.`{id_column}`.\n"
+            for name, column, referenced, id_column in self.references(selected)
+        ] + [
+            f"-- Tables {', '.join(f'`{name}`' for name in tables)} can be joined on `{key}`.\n"
+            for key, tables in self.join_keys(selected).items()
+        ]
+        return header + ddl + "".join(hints)
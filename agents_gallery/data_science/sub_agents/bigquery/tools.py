@@ -14,16 +14,26 @@
 
 """This file contains the tools used by the database agent."""
 
-import datetime
 import logging
 import os
 import re
 
+import sqlglot
 from google.adk.tools import ToolContext
 from google.cloud import bigquery
 from google.genai import Client
+from sqlglot import exp
 
+from ...utils import state_offload
 from ...utils.utils import get_env_var
+from . import (
+    local_validation,
+    nl2sql_cache,
+    query_cache,
+    result_artifact,
+    schema_cache,
+    schema_retriever,
+)
 from .chase_sql import chase_constants
 
 # Assume that `BQ_PROJECT_ID` is set in the environment. See the
@@ -33,10 +43,22 @@ region = os.getenv("GOOGLE_CLOUD_REGION", "us-central1")
 llm_client = Client(vertexai=True, project=project, location=region)
 
 MAX_NUM_ROWS = 80
+# Result columns whose values are returned as "YYYY-MM-DD" strings.
+_DATE_FIELD_TYPES = {"DATE", "DATETIME", "TIMESTAMP"}
+# Most bytes a generated query may process; larger queries are rejected after a
+# dry run, and execution is capped with `maximum_bytes_billed`. 0 disables.
+MAX_BYTES_BILLED = int(os.getenv("BQ_MAX_BYTES_BILLED", str(10 * 1024**3)))
+# Results cut off by the appended LIMIT are counted with a separate COUNT(*)
+# query only if the dry run estimated at most this many bytes. 0 disables.
+ROW_COUNT_MAX_BYTES = int(os.getenv("BQ_ROW_COUNT_MAX_BYTES", str(1024**3)))
 
 
 database_settings = None
 bq_client = None
+# Per-table DDL behind `database_settings["bq_ddl_schema"]`.
+schema_snapshot = None
+# (schema version, retriever) for the current `schema_snapshot`.
+_schema_retriever = None
 
 
 def get_bq_client():
@@ -56,85 +78,188 @@ def get_database_settings():
 
 
 def update_database_settings():
-    """Update database settings."""
-    global database_settings
-    ddl_schema = get_bigquery_schema(
+    """Update database settings.
+
+    The schema comes from the persistent schema cache (see `schema_cache`), so
+    only tables modified since it was written are introspected again.
+    """
+    global database_settings, schema_snapshot
+    schema_snapshot = schema_cache.get_schema_snapshot(
+        get_bq_client(),
+        get_env_var("BQ_PROJECT_ID"),
         get_env_var("BQ_DATASET_ID"),
-        client=get_bq_client(),
-        project_id=get_env_var("BQ_PROJECT_ID"),
     )
     database_settings = {
         "bq_project_id": get_env_var("BQ_PROJECT_ID"),
         "bq_dataset_id": get_env_var("BQ_DATASET_ID"),
-        "bq_ddl_schema": ddl_schema,
+        "bq_ddl_schema": schema_snapshot.ddl,
+        "bq_schema_version": schema_snapshot.version,
         # Include ChaseSQL-specific constants.
         **chase_constants.chase_sql_constants_dict,
     }
     return database_settings
 
 
-def get_bigquery_schema(dataset_id, client=None, project_id=None):
-    """Retrieves schema and generates DDL with example values for a BigQuery dataset.
+def get_schema_retriever():
+    """Get the schema retriever for the current schema snapshot, if there is one."""
+    global _schema_retriever
+    if schema_snapshot is None:
+        return None
+    if _schema_retriever is None or _schema_retriever[0] != schema_snapshot.version:
+        _schema_retriever = (
+            schema_snapshot.version,
+            schema_retriever.SchemaRetriever(schema_snapshot.tables),
+        )
+    return _schema_retriever[1]
+
+
+def get_relevant_schema(question, settings):
+    """Get the part of the DDL schema relevant to a question.
+
+    Falls back to the full `bq_ddl_schema` of `settings` when the schema
+    snapshot of this process is not the one those settings were built from.
+
+    Args:
+        question (str): Natural language question (or user message).
+        settings (dict): The database settings stored in the session state.
+
+    Returns:
+        str: DDL statements of the tables most relevant to the question.
+    """
+    retriever = get_schema_retriever()
+    if retriever is None or settings.get("bq_schema_version") != schema_snapshot.version:
+        return settings["bq_ddl_schema"]
+    return retriever.build_schema(question)
+
+
+def _format_bytes(num_bytes):
+    return f"{num_bytes / 1024**3:.2f} GiB"
+
+
+def estimate_query(sql_string, client=None):
+    """Dry-runs a query to estimate its cost without running it.
 
     Args:
-        dataset_id (str): The ID of the BigQuery dataset (e.g., 'my_dataset').
+        sql_string (str): The SQL query.
         client (bigquery.Client): A BigQuery client.
-        project_id (str): The ID of your Google Cloud Project.
 
     Returns:
-        str: A string containing the generated DDL statements.
+        tuple: (bytes the query would process, list of referenced table IDs).
     """
+    client = client or get_bq_client()
+    dry_run_job = client.query(
+        sql_string,
+        job_config=bigquery.QueryJobConfig(dry_run=True, use_query_cache=False),
+    )
+    referenced_tables = [
+        f"{table.project}.{table.dataset_id}.{table.table_id}"
+        for table in dry_run_job.referenced_tables
+    ]
+    return dry_run_job.total_bytes_processed or 0, referenced_tables
+
 
-    if client is None:
-        client = bigquery.Client(project=project_id)
+def with_row_limit(sql_string, max_rows):
+    """Appends `LIMIT max_rows` to a query that has no top-level LIMIT.
 
-    # dataset_ref = client.dataset(dataset_id)
-    dataset_ref = bigquery.DatasetReference(project_id, dataset_id)
+    SQL that sqlglot can't parse as exactly one query is returned unchanged;
+    fetching its result is still bounded by `max_results`.
 
-    ddl_statements = ""
+    Args:
+        sql_string (str): The SQL query.
+        max_rows (int): The LIMIT to append.
 
-    for table in client.list_tables(dataset_ref):
-        table_ref = dataset_ref.table(table.table_id)
-        table_obj = client.get_table(table_ref)
+    Returns:
+        str: The SQL query to run.
+    """
+    try:
+        statements = [
+            statement
+            for statement in sqlglot.parse(sql_string, read="bigquery")
+            if statement is not None
+        ]
+    except sqlglot.errors.SqlglotError:
+        return sql_string
+    if (
+        len(statements) != 1
+        or not isinstance(statements[0], exp.Query)
+        or statements[0].args.get("limit")
+    ):
+        return sql_string
+    # On a new line, so a trailing `--` comment doesn't swallow it.
+    return f"{sql_string.rstrip().rstrip(';').rstrip()}\nLIMIT {max_rows}"
 
-        # Check if table is a view
-        if table_obj.table_type != "TABLE":
-            continue
 
-        ddl_statement = f"CREATE OR REPLACE TABLE `{table_ref}` (\n"
+def count_rows(sql_string, client=None):
+    """Returns the number of rows of a query's result, with a COUNT(*) query.
 
-        for field in table_obj.schema:
-            ddl_statement += f"  `{field.name}` {field.field_type}"
-            if field.mode == "REPEATED":
-                ddl_statement += " ARRAY"
-            if field.description:
-                ddl_statement += f" COMMENT '{field.description}'"
-            ddl_statement += ",\n"
+    Args:
+        sql_string (str): The SQL query.
+        client (bigquery.Client): A BigQuery client.
 
-        ddl_statement = ddl_statement[:-2] + "\n);\n\n"
+    Returns:
+        int: The number of result rows.
+    """
+    client = client or get_bq_client()
+    count_job = client.query(
+        f"SELECT COUNT(*) FROM (\n{sql_string.rstrip().rstrip(';')}\n)",
+        job_config=bigquery.QueryJobConfig(
+            use_query_cache=True,
+            maximum_bytes_billed=MAX_BYTES_BILLED or None,
+        ),
+    )
+    return list(count_job.result())[0][0]
 
-        # Add example values if available (limited to first row)
-        rows = client.list_rows(table_ref, max_results=5).to_dataframe()
-        if not rows.empty:
-            ddl_statement += f"-- Example values for table `{table_ref}`:\n"
-            for _, row in rows.iterrows():  # Iterate over DataFrame rows
-                ddl_statement += f"INSERT INTO `{table_ref}` VALUES\n"
-                example_row_str = "("
-                for value in row.values:  # Now row is a pandas Series and has values
-                    if isinstance(value, str):
-                        example_row_str += f"'{value}',"
-                    elif value is None:
-                        example_row_str += "NULL,"
-                    else:
-                        example_row_str += f"{value},"
-                example_row_str = (
-                    example_row_str[:-1] + ");\n\n"
-                )  # remove trailing comma
-                ddl_statement += example_row_str
 
-        ddl_statements += ddl_statement
+def store_query_result(rows, tool_context):
+    """Hands query result rows to the analytics agent.
 
-    return ddl_statements
+    The rows are saved as a Parquet artifact with only a summary in session
+    state; without an artifact service they are kept in state as before.
+    """
+    try:
+        summary = result_artifact.save_query_result(tool_context, rows)
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logging.warning("Query result kept in session state, not saved as artifact: %s", e)
+        state_offload.set_state(tool_context.state, "query_result", rows)
+        tool_context.state[result_artifact.QUERY_RESULT_SUMMARY_KEY] = None
+        return
+    tool_context.state["query_result"] = None
+    tool_context.state[result_artifact.QUERY_RESULT_SUMMARY_KEY] = summary
+
+
+def get_cached_sql(question, tool_context):
+    """Get validated SQL for the same (or a reworded) question, if any.
+
+    Either way the question is remembered in the session state, so that
+    `run_bigquery_validation` can cache the SQL once it runs successfully.
+
+    Args:
+        question (str): Natural language question.
+        tool_context (ToolContext): The tool context.
+
+    Returns:
+        str: The cached SQL, or None.
+    """
+    tool_context.state["nl2sql_question"] = question
+    sql = nl2sql_cache.NL2SQL_CACHE.get(
+        question, tool_context.state["database_settings"].get("bq_schema_version")
+    )
+    if sql:
+        logging.info("Reusing validated SQL for question: %s", question)
+        state_offload.set_state(tool_context.state, "sql_query", sql)
+    return sql
+
+
+def remember_validated_sql(sql_string, tool_context):
+    """Caches SQL that ran successfully for the question it was generated for."""
+    question = tool_context.state.get("nl2sql_question")
+    if question:
+        nl2sql_cache.NL2SQL_CACHE.put(
+            question,
+            tool_context.state["database_settings"].get("bq_schema_version"),
+            sql_string,
+        )
+        tool_context.state["nl2sql_question"] = None
 
 
 def initial_bq_nl2sql(
@@ -183,7 +308,11 @@ The database structure is defined by the following table schemas (possibly with
 
    """
 
-    ddl_schema = tool_context.state["database_settings"]["bq_ddl_schema"]
+    cached_sql = get_cached_sql(question, tool_context)
+    if cached_sql:
+        return cached_sql
+
+    ddl_schema = get_relevant_schema(question, tool_context.state["database_settings"])
 
     prompt = prompt_template.format(
         MAX_NUM_ROWS=MAX_NUM_ROWS, SCHEMA=ddl_schema, QUESTION=question
@@ -201,7 +330,7 @@ The database structure is defined by the following table schemas (possibly with
 
     print("\n sql:", sql)
 
-    tool_context.state["sql_query"] = sql
+    state_offload.set_state(tool_context.state, "sql_query", sql)
 
     return sql
 
@@ -220,11 +349,24 @@ def run_bigquery_validation(
     2. **DML/DDL Restriction:**  Rejects any SQL queries containing DML or DDL
        statements (e.g., UPDATE, DELETE, INSERT, CREATE, ALTER) to ensure
        read-only operations.
-    3. **Syntax and Execution:** Sends the cleaned SQL to BigQuery for validation.
+    3. **Local Checks:** Checks the SQL against the cached schema with sqlglot
+       (see `local_validation`): syntax, unknown tables and columns, JOINs on
+       incompatible types and columns neither grouped nor aggregated. Problems
+       are returned without contacting BigQuery.
+    4. **Syntax and Execution:** Sends the cleaned SQL to BigQuery for validation.
        If the query is syntactically correct and executable, it retrieves the
-       results.
-    4. **Result Analysis:**  Checks if the query produced any results. If so, it
-       formats the first few rows of the result set for inspection.
+       results. A dry run first estimates the bytes processed; queries above
+       `BQ_MAX_BYTES_BILLED` are not run, and others run with that cap as
+       `maximum_bytes_billed`. Results of deterministic queries are cached per
+       schema version (see `query_cache`), so re-validating the same query
+       doesn't run it again.
+    5. **Result Analysis:**  Checks if the query produced any results. If so, it
+       fetches at most `MAX_NUM_ROWS` rows for inspection. Queries without a
+       top-level LIMIT are run with `LIMIT MAX_NUM_ROWS + 1`, so BigQuery
+       stops early. The full row count of the result is reported as
+       `total_rows`; when the LIMIT cut the result off, it comes from a
+       separate COUNT(*) query if the dry run estimated at most
+       `BQ_ROW_COUNT_MAX_BYTES`, and is None otherwise.
 
     Args:
         sql_string (str): The SQL query string to validate.
@@ -236,7 +378,10 @@ def run_bigquery_validation(
              - "Valid SQL. Query executed successfully (no results)." if the query
                 is valid but returns no data.
              - "Invalid SQL: ..." if the query is invalid, along with the error
-                message from BigQuery.
+                message from BigQuery or the local checks. Local problems are
+                also listed as structured errors under `validation_errors`.
+             - "Query not run: ..." if the query would process more bytes than
+                allowed.
     """
 
     def cleanup_sql(sql_string):
@@ -254,17 +399,18 @@ def run_bigquery_validation(
         # 4. Replace escaped newlines (those not preceded by a backslash)
         sql_string = sql_string.replace("\\n", "\n")
 
-        # 5. Add limit clause if not present
-        if "limit" not in sql_string.lower():
-            sql_string = sql_string + " limit " + str(MAX_NUM_ROWS)
-
         return sql_string
 
     logging.info("Validating SQL: %s", sql_string)
     sql_string = cleanup_sql(sql_string)
     logging.info("Validating SQL (after cleanup): %s", sql_string)
 
-    final_result = {"query_result": None, "error_message": None}
+    final_result = {
+        "query_result": None,
+        "total_rows": None,
+        "error_message": None,
+        "validation_errors": None,
+    }
 
     # More restrictive check for BigQuery - disallow DML and DDL
     if re.search(
@@ -275,32 +421,114 @@ def run_bigquery_validation(
         )
         return final_result
 
+    # Re-validating the same (or a reformatted) query reuses the earlier result.
+    result_key = query_cache.cache_key(
+        sql_string, tool_context.state["database_settings"].get("bq_schema_version")
+    )
+    cached_result = query_cache.RESULT_CACHE.get(result_key) if result_key else None
+    if cached_result is not None:
+        logging.info("Reusing cached result for SQL: %s", sql_string)
+        if cached_result["query_result"] is not None:
+            store_query_result(cached_result["query_result"], tool_context)
+        remember_validated_sql(sql_string, tool_context)
+        return cached_result
+
+    # Problems visible in the schema are reported without a BigQuery round trip.
+    if local_validation.LOCAL_VALIDATION_ENABLED:
+        settings = tool_context.state["database_settings"]
+        validation_errors = local_validation.validate_sql(
+            sql_string,
+            local_validation.schema_for_ddl(settings.get("bq_ddl_schema")),
+            db=settings.get("bq_dataset_id"),
+            catalog=settings.get("bq_project_id"),
+        )
+        if validation_errors:
+            final_result["error_message"] = (
+                "Invalid SQL: " + local_validation.format_errors(validation_errors)
+            )
+            final_result["validation_errors"] = validation_errors
+            print("\n run_bigquery_validation final_result: \n", final_result)
+            return final_result
+
     try:
-        query_job = get_bq_client().query(sql_string)
-        results = query_job.result()  # Get the query results
+        # One row more than is fetched tells whether the LIMIT cut the result off.
+        limited_sql = with_row_limit(sql_string, MAX_NUM_ROWS + 1)
+        estimated_bytes, referenced_tables = estimate_query(limited_sql)
+        logging.info(
+            "Dry run: %s estimated, tables: %s",
+            _format_bytes(estimated_bytes),
+            referenced_tables,
+        )
+        if MAX_BYTES_BILLED and estimated_bytes > MAX_BYTES_BILLED:
+            final_result["error_message"] = (
+                f"Query not run: it would process {_format_bytes(estimated_bytes)},"
+                f" above the {_format_bytes(MAX_BYTES_BILLED)} limit. Tell the user"
+                " the estimate and ask how to narrow the question (e.g. a date range,"
+                " fewer columns or tables), then generate a cheaper query."
+            )
+            print("\n run_bigquery_validation final_result: \n", final_result)
+            return final_result
+
+        query_job = get_bq_client().query(
+            limited_sql,
+            job_config=bigquery.QueryJobConfig(
+                use_query_cache=True,
+                maximum_bytes_billed=MAX_BYTES_BILLED or None,
+            ),
+        )
+        # Only the first page of at most MAX_NUM_ROWS rows is downloaded.
+        results = query_job.result(max_results=MAX_NUM_ROWS, page_size=MAX_NUM_ROWS)
+        logging.info(
+            "Executed: %s estimated, %s processed, %s billed, BigQuery cache hit: %s",
+            _format_bytes(estimated_bytes),
+            _format_bytes(query_job.total_bytes_processed or 0),
+            _format_bytes(query_job.total_bytes_billed or 0),
+            query_job.cache_hit,
+        )
 
         if results.schema:  # Check if query returned data
+            # Dates and timestamps are formatted as dates; decided per column.
+            converters = [
+                (
+                    (lambda value: value and value.strftime("%Y-%m-%d"))
+                    if field.field_type in _DATE_FIELD_TYPES and field.mode != "REPEATED"
+                    else None
+                )
+                for field in results.schema
+            ]
+            names = [field.name for field in results.schema]
             rows = [
                 {
-                    key: (
-                        value
-                        if not isinstance(value, datetime.date)
-                        else value.strftime("%Y-%m-%d")
-                    )
-                    for (key, value) in row.items()
+                    name: convert(value) if convert else value
+                    for name, convert, value in zip(names, converters, row.values())
                 }
                 for row in results
-            ][:MAX_NUM_ROWS]  # Convert BigQuery RowIterator to list of dicts
+            ]  # Convert BigQuery RowIterator to list of dicts
             # return f"Valid SQL. Results: {rows}"
             final_result["query_result"] = rows
-
-            tool_context.state["query_result"] = rows
+            total_rows = results.total_rows
+            if limited_sql != sql_string and total_rows > MAX_NUM_ROWS:
+                total_rows = None
+                if ROW_COUNT_MAX_BYTES and estimated_bytes <= ROW_COUNT_MAX_BYTES:
+                    try:
+                        total_rows = count_rows(sql_string)
+                    except Exception as e:  # pylint: disable=broad-exception-caught
+                        logging.warning("Could not count the result rows: %s", e)
+            final_result["total_rows"] = total_rows
+            logging.info("Fetched %d of %s result rows", len(rows), total_rows)
+
+            store_query_result(rows, tool_context)
 
         else:
             final_result["error_message"] = (
                 "Valid SQL. Query executed successfully (no results)."
             )
 
+        if result_key is not None:
+            query_cache.RESULT_CACHE.put(result_key, final_result)
+
+        remember_validated_sql(sql_string, tool_context)
+
     except Exception as e:  # Catch generic exceptions from BigQuery  # pylint: disable=broad-exception-caught
         final_result["error_message"] = f"Invalid SQL: {e}"
 
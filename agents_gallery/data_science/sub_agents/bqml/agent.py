@@ -21,10 +21,13 @@ from google.adk.agents.callback_context import CallbackContext
 from google.adk.tools import ToolContext
 from google.adk.tools.agent_tool import AgentTool
 
+from ...utils import state_offload
+from ...utils.utils import content_text
 from ..bigquery.agent import database_agent as bq_db_agent
 from ..bigquery.tools import (
     get_database_settings as get_bq_database_settings,
 )
+from ..bigquery.tools import get_relevant_schema
 from .prompts import return_instructions_bqml
 from .tools import (
     check_bq_models,
@@ -45,7 +48,11 @@ def setup_before_agent_call(callback_context: CallbackContext):
     # setting up schema in instruction
     if callback_context.state["all_db_settings"]["use_database"] == "BigQuery":
         callback_context.state["database_settings"] = get_bq_database_settings()
-        schema = callback_context.state["database_settings"]["bq_ddl_schema"]
+        # Only the tables relevant to the user's message go in the instruction.
+        schema = get_relevant_schema(
+            content_text(callback_context.user_content),
+            callback_context.state["database_settings"],
+        )
 
         callback_context._invocation_context.agent.instruction = (
             return_instructions_bqml()
@@ -79,7 +86,7 @@ async def call_db_agent(
     db_agent_output = await agent_tool.run_async(
         args={"request": question}, tool_context=tool_context
     )
-    tool_context.state["db_agent_output"] = db_agent_output
+    state_offload.set_state(tool_context.state, "db_agent_output", db_agent_output)
     return db_agent_output
 
 
@@ -22,6 +22,8 @@ from google.adk.tools import ToolContext
 from google.adk.tools.agent_tool import AgentTool
 
 from .sub_agents import db_agent, ds_agent
+from .sub_agents.bigquery import result_artifact
+from .utils import state_offload
 
 
 async def call_db_agent(
@@ -39,7 +41,7 @@ async def call_db_agent(
     db_agent_output = await agent_tool.run_async(
         args={"request": question}, tool_context=tool_context
     )
-    tool_context.state["db_agent_output"] = db_agent_output
+    state_offload.set_state(tool_context.state, "db_agent_output", db_agent_output)
     return db_agent_output
 
 
@@ -50,11 +52,23 @@ async def call_ds_agent(
     """Tool to call data science (nl2py) agent."""
 
     if question == "N/A":
-        return tool_context.state["db_agent_output"]
+        return state_offload.get_state(tool_context.state, "db_agent_output")
 
-    input_data = tool_context.state["query_result"]
+    # The query result goes to the code executor as a Parquet file; the prompt
+    # only describes it.
+    result_summary = result_artifact.attach_query_result(tool_context)
+    if result_summary:
+        question_with_data = f"""
+  Question to answer: {question}
+
+  Actual data to analyze prevoius quesiton is already in the following data file:
+  {result_artifact.format_summary(result_summary)}
 
-    question_with_data = f"""
+  """
+    else:
+        input_data = state_offload.get_state(tool_context.state, "query_result")
+
+        question_with_data = f"""
   Question to answer: {question}
 
   Actual data to analyze prevoius quesiton is already in the following:
@@ -64,8 +78,12 @@ async def call_ds_agent(
 
     agent_tool = AgentTool(agent=ds_agent)
 
-    ds_agent_output = await agent_tool.run_async(
-        args={"request": question_with_data}, tool_context=tool_context
-    )
-    tool_context.state["ds_agent_output"] = ds_agent_output
+    try:
+        ds_agent_output = await agent_tool.run_async(
+            args={"request": question_with_data}, tool_context=tool_context
+        )
+    finally:
+        if result_summary:
+            result_artifact.detach_query_result(tool_context)
+    state_offload.set_state(tool_context.state, "ds_agent_output", ds_agent_output)
     return ds_agent_output
@@ -0,0 +1,166 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Keeps large values out of the ADK session state.
+
+Session state is serialized with every event and, once deployed, persisted by
+the session service. `set_state` stores values whose JSON form is larger than
+`STATE_OFFLOAD_THRESHOLD_BYTES` in an object store, a local directory during
+development or a `gs://` prefix in production (`STATE_OFFLOAD_URI`), and puts
+a small reference in the state instead. `get_state` (or `resolve`) returns the
+original value, loading it only when it is actually read.
+
+Objects are content-addressed, so writing the same value twice stores it once.
+A local directory is private to one machine, so a deployed agent (running on
+several Agent Engine replicas) only offloads when `STATE_OFFLOAD_URI` is set to
+a `gs://` prefix and keeps values in state otherwise. A reference whose object
+is gone reads as the default, with a warning.
+
+Nothing here depends on a particular agent; it only needs JSON-serializable
+values and a dict-like state.
+"""
+
+import functools
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import Any, MutableMapping
+
+from google.api_core import exceptions as api_exceptions
+
+# Set by Agent Engine in deployed agents.
+DEPLOYED = bool(os.getenv("GOOGLE_CLOUD_AGENT_ENGINE_ID"))
+STATE_OFFLOAD_URI = os.getenv(
+    "STATE_OFFLOAD_URI",
+    "" if DEPLOYED else os.path.join(tempfile.gettempdir(), "adk_state_offload"),
+)
+STATE_OFFLOAD_THRESHOLD_BYTES = int(os.getenv("STATE_OFFLOAD_THRESHOLD_BYTES", "16384"))
+REFERENCE_KEY = "$offloaded"
+PREVIEW_CHARS = 200
+
+
+def is_reference(value: Any) -> bool:
+    return isinstance(value, dict) and REFERENCE_KEY in value
+
+
+def _is_shared_store(store_uri: str) -> bool:
+    """True if every process serving the agent can read objects in `store_uri`."""
+    return store_uri.startswith("gs://") or not DEPLOYED
+
+
+def _read_text(uri: str) -> str:
+    if uri.startswith("gs://"):
+        from google.cloud import storage  # pylint: disable=import-outside-toplevel
+
+        return storage.Blob.from_string(uri, client=storage.Client()).download_as_text()
+    with open(uri, encoding="utf-8") as f:
+        return f.read()
+
+
+def _write_text(uri: str, text: str) -> None:
+    if uri.startswith("gs://"):
+        from google.cloud import storage  # pylint: disable=import-outside-toplevel
+
+        blob = storage.Blob.from_string(uri, client=storage.Client())
+        if not blob.exists():
+            blob.upload_from_string(text, content_type="application/json")
+        return
+    if os.path.exists(uri):
+        return
+    os.makedirs(os.path.dirname(uri), exist_ok=True)
+    tmp_uri = f"{uri}.{os.getpid()}.tmp"
+    with open(tmp_uri, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_uri, uri)
+
+
+@functools.lru_cache(maxsize=1)
+def _warn_unshared_store(store_uri: str) -> None:
+    # Logged once per store: other replicas couldn't read a local copy.
+    logging.warning(
+        "Keeping large values in session state: STATE_OFFLOAD_URI (%r) is not a gs:// "
+        "prefix, and a deployed agent's replicas don't share local files.",
+        store_uri,
+    )
+
+
+@functools.lru_cache(maxsize=32)
+def _load_text(uri: str) -> str:
+    # Objects never change once written, so caching by URI is safe.
+    return _read_text(uri)
+
+
+def offload(
+    key: str,
+    value: Any,
+    threshold_bytes: int = STATE_OFFLOAD_THRESHOLD_BYTES,
+    store_uri: str = STATE_OFFLOAD_URI,
+) -> Any:
+    """Returns `value`, or a reference to a stored copy if it is too large for state.
+
+    If the value can't be stored, it is returned unchanged (and a warning logged).
+    """
+    if value is None or is_reference(value):
+        return value
+    text = json.dumps(value, default=str)
+    size = len(text.encode("utf-8"))
+    if size <= threshold_bytes:
+        return value
+    if not _is_shared_store(store_uri):
+        _warn_unshared_store(store_uri)
+        return value
+    if not store_uri:
+        return value
+
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    uri = f"{store_uri.rstrip('/')}/{key}/{digest}.json"
+    try:
+        _write_text(uri, text)
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logging.warning("Keeping %s (%d bytes) in session state, offload failed: %s", key, size, e)
+        return value
+    return {
+        REFERENCE_KEY: uri,
+        "size": size,
+        "preview": text[:PREVIEW_CHARS],
+    }
+
+
+def resolve(value: Any, default: Any = None) -> Any:
+    """Returns the original value behind a reference; other values unchanged.
+
+    If the referenced object no longer exists, returns `default` (and a warning
+    is logged).
+    """
+    if not is_reference(value):
+        return value
+    uri = value[REFERENCE_KEY]
+    try:
+        text = _load_text(uri)
+    except (FileNotFoundError, api_exceptions.NotFound) as e:
+        logging.warning("Offloaded state value %s is missing: %s", uri, e)
+        return default
+    return json.loads(text)
+
+
+def set_state(state: MutableMapping[str, Any], key: str, value: Any) -> None:
+    """Sets `state[key]`, offloading the value if it is large."""
+    state[key] = offload(key, value)
+
+
+def get_state(state: MutableMapping[str, Any], key: str, default: Any = None) -> Any:
+    """Reads `state[key]`, loading it from the store if it was offloaded."""
+    return resolve(state.get(key, default), default)
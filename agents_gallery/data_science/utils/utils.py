@@ -45,6 +45,20 @@ def get_env_var(var_name):
         raise ValueError(f"Missing environment variable: {var_name}")
 
 
+def content_text(content):
+    """Returns the text parts of a `types.Content` joined together.
+
+    Args:
+      content: A `google.genai.types.Content`, or None.
+
+    Returns:
+      The concatenated text of the content's parts ("" if there is none).
+    """
+    if content is None or not content.parts:
+        return ""
+    return " ".join(part.text for part in content.parts if part.text)
+
+
 def get_image_bytes(filepath):
     """Reads an image file and returns its bytes.
 
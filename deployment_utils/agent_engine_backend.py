@@ -0,0 +1,285 @@
+"""Pluggable control-plane backends for Agent Engine (reasoning engine) lifecycle calls.
+
+The deploy/destroy flows in the CLI scripts and the Web UI talk to Agent Engine
+through an `AgentEngineBackend` instead of calling `vertexai.agent_engines`
+directly. The default backend forwards to Vertex AI. Setting
+`AGENT_ENGINE_BACKEND=fake` swaps in an in-process stand-in that keeps engines
+in memory (or in a SQLite file) and simulates build/delete durations and
+failures, so the flows can be exercised and load tested without a GCP project.
+
+Fake backend settings (environment variables):
+    FAKE_AGENT_ENGINE_DB: SQLite path; defaults to an in-memory database.
+    FAKE_AGENT_ENGINE_BUILD_SECONDS: Simulated `create` duration (default 5).
+    FAKE_AGENT_ENGINE_DELETE_SECONDS: Simulated `delete` duration (default 1).
+    FAKE_AGENT_ENGINE_LIST_SECONDS: Simulated `list`/`get` latency (default 0.2).
+    FAKE_AGENT_ENGINE_JITTER: Relative +/- jitter applied to durations (default 0.2).
+    FAKE_AGENT_ENGINE_FAILURE_RATE: Probability that create/delete fails (default 0).
+    FAKE_AGENT_ENGINE_SEED: Optional seed for reproducible latency/failures.
+"""
+
+import datetime
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+from typing import Any, List, Optional
+
+from google.api_core import exceptions as google_exceptions
+
+from deployment_utils.constants import SUPPORTED_REGIONS
+
+BACKEND_ENV_VAR = "AGENT_ENGINE_BACKEND"
+
+
+class AgentEngineBackend:
+    """Interface for the Agent Engine control plane used by the lifecycle scripts."""
+
+    name = "base"
+
+    def init(self, project_id: str, location: str, staging_bucket: Optional[str] = None) -> None:
+        """Points the backend at a project/location. `staging_bucket` is a bare bucket name."""
+        raise NotImplementedError
+
+    def list(self) -> List[Any]:
+        """Returns all engines in the current project/location."""
+        raise NotImplementedError
+
+    def create(
+        self, agent: Any, *, requirements: List[str], extra_packages: List[str],
+        display_name: str, description: str,
+    ) -> Any:
+        """Builds and deploys `agent`, returning the created engine."""
+        raise NotImplementedError
+
+    def get(self, resource_name: str) -> Any:
+        """Returns the engine with the given resource name."""
+        raise NotImplementedError
+
+    def delete(self, resource_name: str, force: bool = True) -> None:
+        """Deletes the engine with the given resource name."""
+        raise NotImplementedError
+
+
+class VertexAgentEngineBackend(AgentEngineBackend):
+    """Backend that forwards every call to the Vertex AI SDK."""
+
+    name = "vertex"
+
+    def init(self, project_id: str, location: str, staging_bucket: Optional[str] = None) -> None:
+        import vertexai
+
+        init_kwargs = {"project": project_id, "location": location}
+        if staging_bucket:
+            init_kwargs["staging_bucket"] = f"gs://{staging_bucket}"
+        vertexai.init(**init_kwargs)
+
+    def list(self) -> List[Any]:
+        from vertexai import agent_engines
+
+        return list(agent_engines.list())
+
+    def create(
+        self, agent: Any, *, requirements: List[str], extra_packages: List[str],
+        display_name: str, description: str,
+    ) -> Any:
+        from vertexai import agent_engines
+
+        return agent_engines.create(
+            agent, requirements=requirements, extra_packages=extra_packages,
+            display_name=display_name, description=description,
+        )
+
+    def get(self, resource_name: str) -> Any:
+        from vertexai import agent_engines
+
+        return agent_engines.get(resource_name=resource_name)
+
+    def delete(self, resource_name: str, force: bool = True) -> None:
+        self.get(resource_name).delete(force=force)
+
+
+class FakeAgentEngine:
+    """Read-only view of a fake engine, shaped like `agent_engines.AgentEngine`."""
+
+    def __init__(self, backend: "FakeAgentEngineBackend", row: sqlite3.Row):
+        self._backend = backend
+        self.resource_name: str = row["resource_name"]
+        self.display_name: str = row["display_name"]
+        self.create_time = datetime.datetime.fromisoformat(row["create_time"])
+        self.update_time = datetime.datetime.fromisoformat(row["update_time"])
+        self.requirements: List[str] = json.loads(row["requirements"])
+        self.extra_packages: List[str] = json.loads(row["extra_packages"])
+        # The scripts read the description from the underlying proto.
+        self._gca_resource = SimpleNamespace(description=row["description"])
+
+    def delete(self, force: bool = True) -> None:
+        self._backend.delete(self.resource_name, force=force)
+
+    def __repr__(self) -> str:
+        return f"FakeAgentEngine(resource_name={self.resource_name!r}, display_name={self.display_name!r})"
+
+
+class FakeAgentEngineBackend(AgentEngineBackend):
+    """In-process Agent Engine stand-in with latency and failure injection.
+
+    Engines are stored in SQLite (`:memory:` by default, or a file so several
+    processes can share one control plane). Every call sleeps for its configured
+    duration, scaled by a random jitter, and `create`/`delete` fail with
+    `failure_rate` probability by raising `google_exceptions.ServiceUnavailable`.
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        db_path: str = ":memory:",
+        build_seconds: float = 5.0,
+        delete_seconds: float = 1.0,
+        list_seconds: float = 0.2,
+        jitter: float = 0.2,
+        failure_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        self.db_path = db_path
+        self.build_seconds = build_seconds
+        self.delete_seconds = delete_seconds
+        self.list_seconds = list_seconds
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._project_id: Optional[str] = None
+        self._location: Optional[str] = None
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS engines (
+                    resource_name TEXT PRIMARY KEY,
+                    project_id TEXT NOT NULL,
+                    location TEXT NOT NULL,
+                    display_name TEXT NOT NULL,
+                    description TEXT NOT NULL,
+                    requirements TEXT NOT NULL,
+                    extra_packages TEXT NOT NULL,
+                    create_time TEXT NOT NULL,
+                    update_time TEXT NOT NULL
+                )"""
+            )
+
+    @classmethod
+    def from_env(cls) -> "FakeAgentEngineBackend":
+        """Builds a fake backend configured from the FAKE_AGENT_ENGINE_* variables."""
+        seed = os.getenv("FAKE_AGENT_ENGINE_SEED")
+        return cls(
+            db_path=os.getenv("FAKE_AGENT_ENGINE_DB", ":memory:"),
+            build_seconds=float(os.getenv("FAKE_AGENT_ENGINE_BUILD_SECONDS", "5")),
+            delete_seconds=float(os.getenv("FAKE_AGENT_ENGINE_DELETE_SECONDS", "1")),
+            list_seconds=float(os.getenv("FAKE_AGENT_ENGINE_LIST_SECONDS", "0.2")),
+            jitter=float(os.getenv("FAKE_AGENT_ENGINE_JITTER", "0.2")),
+            failure_rate=float(os.getenv("FAKE_AGENT_ENGINE_FAILURE_RATE", "0")),
+            seed=int(seed) if seed else None,
+        )
+
+    def _simulate(self, seconds: float, operation: str, can_fail: bool = False) -> None:
+        """Sleeps for a jittered duration and raises an injected failure if drawn."""
+        with self._lock:
+            factor = 1 + self._random.uniform(-self.jitter, self.jitter)
+            failed = can_fail and self._random.random() < self.failure_rate
+        if seconds > 0:
+            time.sleep(max(0.0, seconds * factor))
+        if failed:
+            raise google_exceptions.ServiceUnavailable(f"Injected failure during fake Agent Engine {operation}.")
+
+    def _require_init(self) -> None:
+        if not self._project_id or not self._location:
+            raise RuntimeError("Fake Agent Engine backend used before init(project_id, location).")
+
+    def init(self, project_id: str, location: str, staging_bucket: Optional[str] = None) -> None:
+        if not project_id or location not in SUPPORTED_REGIONS:
+            raise google_exceptions.NotFound(f"Project '{project_id}' or Location '{location}' not found.")
+        # Callers still build an AdkApp locally, which reads the SDK's global project/location.
+        # vertexai.init only records configuration, so this makes no network calls.
+        import vertexai
+
+        vertexai.init(project=project_id, location=location)
+        self._project_id = project_id
+        self._location = location
+
+    def list(self) -> List[FakeAgentEngine]:
+        self._require_init()
+        self._simulate(self.list_seconds, "list")
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM engines WHERE project_id = ? AND location = ? ORDER BY create_time",
+                (self._project_id, self._location),
+            ).fetchall()
+        return [FakeAgentEngine(self, row) for row in rows]
+
+    def create(
+        self, agent: Any, *, requirements: List[str], extra_packages: List[str],
+        display_name: str, description: str,
+    ) -> FakeAgentEngine:
+        self._require_init()
+        project_id, location = self._project_id, self._location
+        self._simulate(self.build_seconds, "create", can_fail=True)
+        now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        engine_id = str(uuid.uuid4().int)[:19]
+        resource_name = f"projects/{project_id}/locations/{location}/reasoningEngines/{engine_id}"
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO engines VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (resource_name, project_id, location, display_name, description or "",
+                 json.dumps(list(requirements or [])), json.dumps(list(extra_packages or [])), now, now),
+            )
+        return self.get(resource_name, simulate=False)
+
+    def get(self, resource_name: str, simulate: bool = True) -> FakeAgentEngine:
+        if simulate:
+            self._simulate(self.list_seconds, "get")
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM engines WHERE resource_name = ?", (resource_name,)
+            ).fetchone()
+        if row is None:
+            raise google_exceptions.NotFound(f"Reasoning engine '{resource_name}' not found.")
+        return FakeAgentEngine(self, row)
+
+    def delete(self, resource_name: str, force: bool = True) -> None:
+        self._simulate(self.delete_seconds, "delete", can_fail=True)
+        with self._lock, self._conn:
+            deleted = self._conn.execute(
+                "DELETE FROM engines WHERE resource_name = ?", (resource_name,)
+            ).rowcount
+        if not deleted:
+            raise google_exceptions.NotFound(f"Reasoning engine '{resource_name}' not found.")
+
+
+_backend: Optional[AgentEngineBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> AgentEngineBackend:
+    """Returns the process-wide backend selected by AGENT_ENGINE_BACKEND ('vertex' or 'fake')."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            backend_name = os.getenv(BACKEND_ENV_VAR, VertexAgentEngineBackend.name).strip().lower()
+            if backend_name == FakeAgentEngineBackend.name:
+                _backend = FakeAgentEngineBackend.from_env()
+            elif backend_name == VertexAgentEngineBackend.name:
+                _backend = VertexAgentEngineBackend()
+            else:
+                raise ValueError(f"Unknown {BACKEND_ENV_VAR} '{backend_name}'. Expected 'vertex' or 'fake'.")
+        return _backend
+
+
+def set_backend(backend: Optional[AgentEngineBackend]) -> None:
+    """Overrides the process-wide backend (pass None to re-read the environment)."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
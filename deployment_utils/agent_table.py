@@ -0,0 +1,52 @@
+"""Row model for the Agent Engine tables shown in the Web UI (Destroy and Register tabs).
+
+Engines are flattened into plain dict rows once, when they are fetched, so the
+browser-side table can page, sort and filter them without another round trip
+and without the server re-formatting timestamps or reading `_gca_resource`.
+"""
+
+import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S %Z"
+ROWS_PER_PAGE = 25
+
+AGENT_TABLE_COLUMNS: List[Dict[str, Any]] = [
+    {"name": "display_name", "label": "Display Name", "field": "display_name", "sortable": True, "align": "left"},
+    {"name": "engine_id", "label": "Engine ID", "field": "engine_id", "sortable": True, "align": "left"},
+    {"name": "description", "label": "Description", "field": "description", "align": "left",
+     "classes": "whitespace-normal", "style": "min-width: 16rem"},
+    {"name": "created", "label": "Created", "field": "created", "sortable": True, "align": "left"},
+    {"name": "updated", "label": "Updated", "field": "updated", "sortable": True, "align": "left"},
+]
+
+
+def format_timestamp(value: Optional[datetime.datetime]) -> str:
+    """Formats an engine timestamp; these are UTC, so the strings also sort chronologically."""
+    return value.strftime(TIMESTAMP_FORMAT) if value else "N/A"
+
+
+def agent_engine_description(agent: Any) -> str:
+    """Returns the engine's description, which the SDK only exposes on the underlying proto."""
+    gca_resource = getattr(agent, "_gca_resource", None)
+    return getattr(gca_resource, "description", "") or "No description."
+
+
+def agent_engine_to_row(agent: Any) -> Dict[str, str]:
+    """Flattens an AgentEngine into a table row keyed by `resource_name`."""
+    resource_name = agent.resource_name
+    return {
+        "resource_name": resource_name,
+        "engine_id": resource_name.split("/")[-1],
+        "display_name": agent.display_name or "",
+        "description": agent_engine_description(agent),
+        "created": format_timestamp(agent.create_time),
+        "updated": format_timestamp(agent.update_time),
+    }
+
+
+def agent_engines_to_rows(agents: Iterable[Any]) -> List[Dict[str, str]]:
+    """Converts fetched engines to rows, newest first (engines without a create time last)."""
+    rows = [agent_engine_to_row(agent) for agent in agents]
+    rows.sort(key=lambda row: (row["created"] != "N/A", row["created"]), reverse=True)
+    return rows
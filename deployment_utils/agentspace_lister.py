@@ -10,6 +10,8 @@ from dotenv import load_dotenv
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
+from deployment_utils.metrics import track_call
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -141,8 +143,9 @@ def _fetch_matching_engines(project_number: str, locations: List[str] | str, acc
 
         try:
             logging.debug(f"Calling API: {api_endpoint}")
-            response = requests.get(api_endpoint, headers=headers, timeout=30) # Added timeout
-            response.raise_for_status()
+            with track_call("discoveryengine", "list_engines"):
+                response = requests.get(api_endpoint, headers=headers, timeout=30) # Added timeout
+                response.raise_for_status()
 
             data = response.json()
             engines_in_response = data.get("engines", [])
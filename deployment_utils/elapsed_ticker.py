@@ -0,0 +1,104 @@
+"""Server-wide ticker that drives every "Elapsed Time" label in the Web UI.
+
+Instead of one coroutine per deployment waking up every second, a single task
+walks all registered timers once per tick and updates their labels in one
+batch. Labels only need `set_text()` and, optionally, a NiceGUI-style `client`
+(with `id` and `on_disconnect`), which is used to drop a browser's timers as
+soon as it disconnects. The task stops itself once no timers are left.
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Set
+
+
+def format_elapsed(seconds: float) -> str:
+    """Formats a duration in seconds as MM:SS."""
+    minutes, secs = divmod(int(seconds), 60)
+    return f"{minutes:02d}:{secs:02d}"
+
+
+@dataclass
+class _Timer:
+    label: Any
+    start_time: float
+    prefix: str
+    client_id: Optional[str]
+    last_text: Optional[str] = None
+
+
+class ElapsedTimeTicker:
+    """Updates all active elapsed-time labels from one shared asyncio task."""
+
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self._timers: Dict[int, _Timer] = {}
+        self._ids = itertools.count(1)
+        self._clients_with_handler: Set[str] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def active_count(self) -> int:
+        """Number of timers currently being updated."""
+        return len(self._timers)
+
+    def start(self, label: Any, start_time: Optional[float] = None, prefix: str = "Elapsed Time: ") -> int:
+        """Registers `label` and returns a timer ID for `stop()`. Must run on the event loop."""
+        timer_id = next(self._ids)
+        client = getattr(label, "client", None)
+        client_id = getattr(client, "id", None)
+        self._timers[timer_id] = _Timer(
+            label=label,
+            start_time=time.monotonic() if start_time is None else start_time,
+            prefix=prefix,
+            client_id=client_id,
+        )
+        if client_id is not None and client_id not in self._clients_with_handler:
+            self._clients_with_handler.add(client_id)
+            client.on_disconnect(lambda: self.cancel_client(client_id))
+        self._update(timer_id, self._timers[timer_id], time.monotonic())
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return timer_id
+
+    def stop(self, timer_id: int) -> Optional[float]:
+        """Unregisters a timer and returns its elapsed seconds (None if already gone)."""
+        timer = self._timers.pop(timer_id, None)
+        if timer is None:
+            return None
+        return time.monotonic() - timer.start_time
+
+    def cancel_client(self, client_id: str) -> None:
+        """Drops every timer whose label belongs to a disconnected client."""
+        self._clients_with_handler.discard(client_id)
+        for timer_id in [tid for tid, t in self._timers.items() if t.client_id == client_id]:
+            del self._timers[timer_id]
+
+    def _update(self, timer_id: int, timer: _Timer, now: float) -> None:
+        text = f"{timer.prefix}{format_elapsed(now - timer.start_time)}"
+        if text == timer.last_text:
+            return
+        try:
+            timer.label.set_text(text)
+            timer.last_text = text
+        except Exception as e:  # Element deleted or client gone; stop updating it.
+            logging.warning(f"Dropping elapsed-time timer {timer_id}: {e}")
+            self._timers.pop(timer_id, None)
+
+    def tick(self) -> None:
+        """Updates every active timer once."""
+        now = time.monotonic()
+        for timer_id, timer in list(self._timers.items()):
+            self._update(timer_id, timer, now)
+
+    async def _run(self) -> None:
+        while self._timers:
+            await asyncio.sleep(self.interval)
+            self.tick()
+
+
+# Shared by every page served by this process.
+ELAPSED_TICKER = ElapsedTimeTicker()
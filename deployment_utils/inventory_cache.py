@@ -0,0 +1,82 @@
+"""Shared, time-limited cache of control-plane listings for the Web UI.
+
+Listing Agent Engines or Agentspace apps takes seconds, and several tabs (and
+several browser sessions) need the same listing for the same project/location.
+`InventoryStore` keeps one entry per (kind, key), serves it while it is younger
+than the TTL, and collapses concurrent loads of the same entry into one call.
+Loaders are blocking callables and run in a worker thread.
+"""
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+DEFAULT_INVENTORY_TTL = float(os.getenv("WEBUI_INVENTORY_TTL", "300"))
+
+AGENT_ENGINES = "agent_engines"
+AGENTSPACE_APPS = "agentspace_apps"
+
+
+@dataclass
+class InventoryEntry:
+    value: Any
+    fetched_at: float
+
+
+class InventoryStore:
+    """TTL cache of listings keyed by (kind, key), with in-flight request de-duplication."""
+
+    def __init__(self, ttl_seconds: float = DEFAULT_INVENTORY_TTL, clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: Dict[Tuple[str, Hashable], InventoryEntry] = {}
+        self._in_flight: Dict[Tuple[str, Hashable], asyncio.Future] = {}
+
+    def peek(self, kind: str, key: Hashable) -> Optional[Any]:
+        """Returns the cached value if it is still fresh, else None. Never loads."""
+        entry = self._entries.get((kind, key))
+        if entry is None or self._clock() - entry.fetched_at > self.ttl_seconds:
+            return None
+        return entry.value
+
+    def is_loading(self, kind: str, key: Hashable) -> bool:
+        return (kind, key) in self._in_flight
+
+    async def get(self, kind: str, key: Hashable, loader: Callable[[], Any], force: bool = False) -> Any:
+        """Returns the cached value, loading it with `loader()` if missing, stale or `force`d.
+
+        Concurrent callers for the same entry share one load. A forced refresh
+        still joins a load that is already in flight rather than starting another.
+        Loader exceptions propagate to every waiter and nothing is cached.
+        """
+        cache_key = (kind, key)
+        in_flight = self._in_flight.get(cache_key)
+        if in_flight is None:
+            if not force:
+                cached = self.peek(kind, key)
+                if cached is not None:
+                    return cached
+            in_flight = asyncio.ensure_future(self._load(cache_key, loader))
+            self._in_flight[cache_key] = in_flight
+        # Shield so one cancelled waiter (e.g. a closed tab) doesn't cancel the shared load.
+        return await asyncio.shield(in_flight)
+
+    def invalidate(self, kind: str, key: Optional[Hashable] = None) -> None:
+        """Drops one entry, or every entry of `kind` when `key` is None."""
+        for cache_key in list(self._entries):
+            if cache_key[0] == kind and (key is None or cache_key[1] == key):
+                del self._entries[cache_key]
+
+    async def _load(self, cache_key: Tuple[str, Hashable], loader: Callable[[], Any]) -> Any:
+        try:
+            value = await asyncio.to_thread(loader)
+            self._entries[cache_key] = InventoryEntry(value=value, fetched_at=self._clock())
+            return value
+        finally:
+            self._in_flight.pop(cache_key, None)
+
+
+# Shared by every page served by this process.
+INVENTORY_STORE = InventoryStore()
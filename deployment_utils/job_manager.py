@@ -0,0 +1,391 @@
+"""Server-side job registry for long-running Web UI operations (e.g. deployments).
+
+Jobs are decoupled from the browser tab that submitted them: each job gets an ID,
+a state, per-phase timings and a log, all persisted to SQLite so any connected
+client (or a restarted server) can see them. A fixed number of worker tasks
+pull jobs from a queue and run the registered runner for the job's kind in a
+thread. Runners receive a `JobContext` and report progress via `phase()` and
+`log()`; subscribers are notified on the event loop after every change. State
+and phase changes are written to SQLite right away; log lines are batched and
+written at most every `LOG_PERSIST_INTERVAL` seconds. Only the newest
+`max_finished_jobs` finished jobs are kept.
+
+CPU-heavy runners (e.g. deployments, which pickle the agent and tar its
+packages) can be registered with `use_process=True`. They then run in a
+`ProcessPoolExecutor` so they don't hold the GIL the event loop needs; their
+`phase()`/`log()` calls travel back to the server over a multiprocessing queue.
+Such runners and their params must be picklable (top-level functions).
+"""
+
+import asyncio
+import concurrent.futures
+import enum
+import json
+import logging
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from deployment_utils.metrics import ACTIVE_JOBS, JOB_DURATION, JOBS
+
+DEFAULT_JOB_DB = os.getenv("WEBUI_JOB_DB", "webui_jobs.sqlite3")
+DEFAULT_JOB_WORKERS = int(os.getenv("WEBUI_JOB_WORKERS", "2"))
+DEFAULT_MAX_FINISHED_JOBS = int(os.getenv("WEBUI_JOB_HISTORY", "200"))
+MAX_LOG_LINES = 500
+# Seconds log lines may wait before the job is written to SQLite
+LOG_PERSIST_INTERVAL = 2.0
+
+
+class JobState(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+@dataclass
+class Job:
+    """A unit of work tracked by the `JobManager`."""
+
+    job_id: str
+    kind: str
+    title: str
+    params: Dict[str, Any]
+    state: JobState = JobState.QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    phases: List[Dict[str, Any]] = field(default_factory=list)
+    logs: List[str] = field(default_factory=list)
+    result: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def is_finished(self) -> bool:
+        return self.state in (JobState.SUCCEEDED, JobState.FAILED)
+
+    @property
+    def current_phase(self) -> Optional[str]:
+        return self.phases[-1]["name"] if self.phases else None
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Seconds spent running so far (or in total once finished)."""
+        if self.started_at is None:
+            return None
+        return (self.finished_at or time.time()) - self.started_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["state"] = self.state.value
+        return data
+
+
+class JobContext:
+    """Progress reporting handle given to job runners. Safe to use from worker threads."""
+
+    def __init__(self, manager: "JobManager", job: Job, loop: asyncio.AbstractEventLoop):
+        self._manager = manager
+        self._job = job
+        self._loop = loop
+
+    @property
+    def job_id(self) -> str:
+        return self._job.job_id
+
+    def phase(self, name: str) -> None:
+        """Closes the current phase (if any) and starts a new one."""
+        self._loop.call_soon_threadsafe(self._manager._start_phase, self._job, name, time.time())
+
+    def log(self, message: str) -> None:
+        """Appends a line to the job log (also printed to the server console)."""
+        print(f"[job {self._job.job_id[:8]}] {message}")
+        self._loop.call_soon_threadsafe(self._manager._append_log, self._job, message)
+
+
+class ProcessJobContext:
+    """`JobContext` stand-in used inside pool processes; forwards progress over a queue."""
+
+    def __init__(self, job_id: str, queue: Any):
+        self._job_id = job_id
+        self._queue = queue
+
+    @property
+    def job_id(self) -> str:
+        return self._job_id
+
+    def phase(self, name: str) -> None:
+        self._queue.put(("phase", name))
+
+    def log(self, message: str) -> None:
+        self._queue.put(("log", message))
+
+
+def _run_in_process(runner: "JobRunner", job_id: str, queue: Any, params: Dict[str, Any]) -> Optional[str]:
+    """Pool-process entry point: runs `runner` with a queue-backed context."""
+    return runner(ProcessJobContext(job_id, queue), **params)
+
+
+def _forward_progress(queue: Any, ctx: JobContext) -> None:
+    """Replays progress messages from a pool process onto `ctx` until the None sentinel."""
+    while (message := queue.get()) is not None:
+        kind, value = message
+        if kind == "phase":
+            ctx.phase(value)
+        else:
+            ctx.log(value)
+
+
+JobRunner = Callable[..., Optional[str]]
+
+
+class JobManager:
+    """Runs submitted jobs on a bounded worker pool and persists their status.
+
+    Register a runner per job kind with `register_runner(kind, fn)`; `fn` is
+    called in a thread (or a pool process, with `use_process=True`) as
+    `fn(ctx, **params)` and may return a result string. Exceptions mark the job
+    FAILED with the traceback as its error.
+    """
+
+    def __init__(
+        self, db_path: str = DEFAULT_JOB_DB, workers: int = DEFAULT_JOB_WORKERS,
+        max_finished_jobs: int = DEFAULT_MAX_FINISHED_JOBS,
+    ):
+        self.db_path = db_path
+        self.workers = max(1, workers)
+        self.max_finished_jobs = max(1, max_finished_jobs)
+        self._runners: Dict[str, JobRunner] = {}
+        self._process_kinds: Set[str] = set()
+        self._process_pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+        self._mp_manager: Optional[Any] = None
+        self._jobs: Dict[str, Job] = {}
+        self._subscribers: List[Callable[[Job], None]] = []
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        self._pending_writes: Dict[str, asyncio.TimerHandle] = {}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs (job_id TEXT PRIMARY KEY, created_at REAL NOT NULL, data TEXT NOT NULL)"
+            )
+        self._load()
+
+    # --- Persistence ---
+    def _load(self) -> None:
+        """Loads persisted jobs; anything still queued/running was interrupted by a restart."""
+        for (data,) in self._conn.execute("SELECT data FROM jobs ORDER BY created_at"):
+            raw = json.loads(data)
+            job = Job(**{**raw, "state": JobState(raw["state"])})
+            if not job.is_finished:
+                job.state = JobState.FAILED
+                job.error = "Interrupted by a Web UI server restart."
+                job.finished_at = job.finished_at or time.time()
+                self._persist(job)
+            self._jobs[job.job_id] = job
+        self._prune()
+
+    def _persist(self, job: Job) -> None:
+        pending = self._pending_writes.pop(job.job_id, None)
+        if pending is not None:
+            pending.cancel()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (job_id, created_at, data) VALUES (?, ?, ?)",
+                (job.job_id, job.created_at, json.dumps(job.to_dict())),
+            )
+
+    def _persist_soon(self, job: Job) -> None:
+        """Persists `job` within LOG_PERSIST_INTERVAL, batching the changes made meanwhile."""
+        if job.job_id not in self._pending_writes:
+            self._pending_writes[job.job_id] = asyncio.get_running_loop().call_later(
+                LOG_PERSIST_INTERVAL, self._persist, job
+            )
+
+    def _prune(self) -> None:
+        """Forgets finished jobs beyond the newest `max_finished_jobs`, in memory and in SQLite."""
+        finished = sorted(
+            (job for job in self._jobs.values() if job.is_finished), key=lambda j: j.finished_at, reverse=True
+        )
+        stale = finished[self.max_finished_jobs:]
+        if not stale:
+            return
+        for job in stale:
+            del self._jobs[job.job_id]
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM jobs WHERE job_id = ?", [(job.job_id,) for job in stale])
+
+    # --- Public API ---
+    def register_runner(self, kind: str, runner: JobRunner, use_process: bool = False) -> None:
+        """Registers the runner for `kind`; `use_process` runs it in the process pool."""
+        self._runners[kind] = runner
+        if use_process:
+            self._process_kinds.add(kind)
+        else:
+            self._process_kinds.discard(kind)
+
+    def subscribe(self, callback: Callable[[Job], None]) -> Callable[[], None]:
+        """Calls `callback(job)` on the event loop after every change; returns an unsubscribe function."""
+        self._subscribers.append(callback)
+
+        def unsubscribe() -> None:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+        return unsubscribe
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def list_jobs(self, limit: Optional[int] = None) -> List[Job]:
+        """Returns jobs newest first."""
+        jobs = sorted(self._jobs.values(), key=lambda j: j.created_at, reverse=True)
+        return jobs[:limit] if limit else jobs
+
+    @property
+    def active_count(self) -> int:
+        return sum(1 for job in self._jobs.values() if not job.is_finished)
+
+    def submit(self, kind: str, title: str, params: Dict[str, Any]) -> Job:
+        """Queues a job. Must be called from the event loop. `params` must be JSON-serializable."""
+        if kind not in self._runners:
+            raise ValueError(f"No job runner registered for kind '{kind}'.")
+        self._ensure_workers()
+        job = Job(job_id=uuid.uuid4().hex, kind=kind, title=title, params=dict(params))
+        self._jobs[job.job_id] = job
+        self._persist(job)
+        self._notify(job)
+        self._queue.put_nowait(job.job_id)
+        return job
+
+    async def wait(self, job_id: str) -> Job:
+        """Waits until the job finishes and returns it.
+
+        Raises KeyError if the job is unknown, e.g. already pruned from the history.
+        """
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise KeyError(f"Job '{job_id}' not found.")
+        finished = asyncio.Event()
+
+        def on_change(changed: Job) -> None:
+            if changed.job_id == job_id and changed.is_finished:
+                finished.set()
+        unsubscribe = self.subscribe(on_change)
+        try:
+            if not job.is_finished:
+                await finished.wait()
+        finally:
+            unsubscribe()
+        # The job object is kept, so newer jobs pruning it meanwhile doesn't matter.
+        return job
+
+    # --- Internals (event loop only) ---
+    def _ensure_workers(self) -> None:
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        self._worker_tasks = [t for t in self._worker_tasks if not t.done()]
+        loop = asyncio.get_running_loop()
+        while len(self._worker_tasks) < self.workers:
+            self._worker_tasks.append(loop.create_task(self._worker()))
+
+    def _notify(self, job: Job) -> None:
+        for callback in list(self._subscribers):
+            try:
+                callback(job)
+            except Exception as e:
+                logging.warning(f"Job subscriber failed: {e}")
+
+    def _start_phase(self, job: Job, name: str, now: float) -> None:
+        if job.phases and job.phases[-1]["finished_at"] is None:
+            job.phases[-1]["finished_at"] = now
+        job.phases.append({"name": name, "started_at": now, "finished_at": None})
+        self._persist(job)
+        self._notify(job)
+
+    def _append_log(self, job: Job, message: str) -> None:
+        job.logs.append(f"{time.strftime('%H:%M:%S')} {message}")
+        del job.logs[:-MAX_LOG_LINES]
+        self._persist_soon(job)
+        self._notify(job)
+
+    def _finish(self, job: Job, state: JobState, result: Optional[str] = None, error: Optional[str] = None) -> None:
+        now = time.time()
+        if job.phases and job.phases[-1]["finished_at"] is None:
+            job.phases[-1]["finished_at"] = now
+        job.state, job.result, job.error, job.finished_at = state, result, error, now
+        JOBS.inc(kind=job.kind, state=state.value)
+        JOB_DURATION.observe(job.duration or 0.0, kind=job.kind)
+        self._persist(job)
+        self._prune()
+        self._notify(job)
+
+    def _ensure_process_pool(self) -> concurrent.futures.ProcessPoolExecutor:
+        if self._process_pool is None:
+            # Spawn rather than fork: the server process runs threads and an event loop.
+            mp_context = multiprocessing.get_context("spawn")
+            self._mp_manager = mp_context.Manager()
+            self._process_pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=mp_context
+            )
+        return self._process_pool
+
+    def shutdown(self) -> None:
+        """Writes out batched log lines and stops the process pool (if started). Running pool jobs are waited for."""
+        for job_id in list(self._pending_writes):
+            self._persist(self._jobs[job_id])
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=True, cancel_futures=True)
+            self._mp_manager.shutdown()
+            self._process_pool = self._mp_manager = None
+
+    async def _execute(self, job: Job, ctx: JobContext) -> Optional[str]:
+        """Runs the job's runner off the event loop, in a thread or a pool process."""
+        runner = self._runners[job.kind]
+        if job.kind not in self._process_kinds:
+            return await asyncio.to_thread(runner, ctx, **job.params)
+
+        loop = asyncio.get_running_loop()
+        pool = self._ensure_process_pool()
+        queue = self._mp_manager.Queue()
+        forwarder = asyncio.ensure_future(asyncio.to_thread(_forward_progress, queue, ctx))
+        try:
+            return await loop.run_in_executor(pool, _run_in_process, runner, job.job_id, queue, job.params)
+        finally:
+            queue.put(None)  # Queued after everything the runner sent, so no progress is lost.
+            await forwarder
+
+    async def _worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            job_id = await self._queue.get()
+            job = self._jobs[job_id]
+            job.state, job.started_at = JobState.RUNNING, time.time()
+            self._persist(job)
+            self._notify(job)
+            try:
+                result = await self._execute(job, JobContext(self, job, loop))
+            except Exception as e:
+                self._finish(job, JobState.FAILED, error=f"{e}\n\n{traceback.format_exc()}")
+            else:
+                self._finish(job, JobState.SUCCEEDED, result=result)
+            finally:
+                self._queue.task_done()
+
+
+_manager: Optional[JobManager] = None
+
+
+def get_job_manager() -> JobManager:
+    """Returns the process-wide job manager (configured by WEBUI_JOB_DB / WEBUI_JOB_WORKERS / WEBUI_JOB_HISTORY)."""
+    global _manager
+    if _manager is None:
+        _manager = JobManager()
+        ACTIVE_JOBS.set_function(lambda: _manager.active_count)
+    return _manager
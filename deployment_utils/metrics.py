@@ -0,0 +1,233 @@
+"""In-process metrics for the Web UI control plane, rendered in Prometheus text format.
+
+A deliberately small subset of the Prometheus data model (counters, gauges and
+histograms with labels) so the Web UI can expose `/metrics` without another
+dependency. All metrics are registered in `REGISTRY`; `REGISTRY.render()`
+returns the exposition text. Updates are thread-safe, so they can be recorded
+from `asyncio.to_thread` workers as well as from the event loop.
+"""
+
+import contextlib
+import math
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Buckets (seconds) for API calls; deployments use DEPLOYMENT_BUCKETS
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+DEPLOYMENT_BUCKETS = (30.0, 60.0, 120.0, 180.0, 300.0, 600.0, 900.0, 1800.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class _Metric:
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _label_values(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Metric '{self.name}' expects labels {self.labelnames}, got {tuple(labels)}.")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, per label combination."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase.")
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._label_values(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down. Unlabelled gauges may instead read a callback at render time."""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Reads the gauge from `function()` whenever metrics are rendered."""
+        if self.labelnames:
+            raise ValueError("Callback gauges cannot have labels.")
+        self._function = function
+
+    def value(self, **labels: str) -> float:
+        if self._function is not None:
+            return float(self._function())
+        with self._lock:
+            return self._values.get(self._label_values(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        if self._function is not None:
+            return [f"{self.name} {_format_value(self.value())}"]
+        with self._lock:
+            items = sorted(self._values.items()) or ([((), 0.0)] if not self.labelnames else [])
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets, plus their sum and count."""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            counts = self._counts.setdefault(key, [0] * len(self.buckets))
+            for i, upper_bound in enumerate(self.buckets):
+                if value <= upper_bound:
+                    counts[i] += 1
+            self._sums[key] = self._sums.get(key, 0.0) + value
+
+    @contextlib.contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observes the wall-clock duration of the `with` block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            counts = self._counts.get(self._label_values(labels))
+            return counts[-1] if counts else 0
+
+    def _samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            items = sorted((key, list(counts), self._sums[key]) for key, counts in self._counts.items())
+        for key, counts, total in items:
+            for upper_bound, count in zip(self.buckets, counts):
+                labels = _format_labels(self.labelnames + ("le",), key + (_format_value(upper_bound),))
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {counts[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """Ordered collection of metrics rendered together by `/metrics`."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric '{metric.name}' is already registered.")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+JOBS = REGISTRY.register(Counter(
+    "webui_jobs_total", "Background jobs finished, by kind (e.g. deploy) and final state.", ["kind", "state"]))
+JOB_DURATION = REGISTRY.register(Histogram(
+    "webui_job_duration_seconds", "Run time of finished background jobs.", ["kind"], buckets=DEPLOYMENT_BUCKETS))
+ACTIVE_JOBS = REGISTRY.register(Gauge(
+    "webui_active_jobs", "Background jobs currently queued or running."))
+DELETIONS = REGISTRY.register(Counter(
+    "webui_agent_engine_deletions_total", "Agent Engine deletions, by outcome.", ["outcome"]))
+REGISTRATIONS = REGISTRY.register(Counter(
+    "webui_agentspace_registrations_total", "Agentspace register/deregister operations, by outcome.", ["operation", "outcome"]))
+CONTROL_PLANE_CALLS = REGISTRY.register(Counter(
+    "webui_control_plane_calls_total", "Calls to Vertex AI, Discovery Engine and Resource Manager, by outcome.",
+    ["service", "operation", "outcome"]))
+CONTROL_PLANE_LATENCY = REGISTRY.register(Histogram(
+    "webui_control_plane_call_seconds", "Latency of calls to Vertex AI, Discovery Engine and Resource Manager.",
+    ["service", "operation"]))
+CONNECTED_CLIENTS = REGISTRY.register(Gauge(
+    "webui_connected_clients", "Browser sessions currently connected to the Web UI."))
+
+
+def record_call(service: str, operation: str, seconds: float, ok: bool) -> None:
+    """Records a control-plane call timed elsewhere, e.g. in a job pool process."""
+    CONTROL_PLANE_LATENCY.observe(seconds, service=service, operation=operation)
+    CONTROL_PLANE_CALLS.inc(service=service, operation=operation, outcome="ok" if ok else "error")
+
+
+@contextlib.contextmanager
+def track_call(service: str, operation: str) -> Iterator[None]:
+    """Times a control-plane call and counts it as 'ok', or 'error' if the block raises."""
+    outcome = "error"
+    try:
+        with CONTROL_PLANE_LATENCY.time(service=service, operation=operation):
+            yield
+        outcome = "ok"
+    finally:
+        CONTROL_PLANE_CALLS.inc(service=service, operation=operation, outcome=outcome)
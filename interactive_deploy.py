@@ -19,17 +19,16 @@ import time
 import traceback
 from typing import Any, Optional, Tuple
 
-import vertexai
 from dotenv import load_dotenv
 from google.api_core import exceptions as google_exceptions
 from prompt_toolkit import prompt
 from prompt_toolkit.completion import WordCompleter
 from prompt_toolkit.shortcuts import message_dialog, radiolist_dialog
-from vertexai import agent_engines
 from vertexai.preview.reasoning_engines import AdkApp
 
 # --- Configuration Loading ---
 try:
+    from deployment_utils.agent_engine_backend import get_backend
     from deployment_utils.constants import SUPPORTED_REGIONS
     from deployment_utils.deployment_configs import AGENT_CONFIGS
 except ImportError as e:
@@ -67,10 +66,7 @@ def init_vertex_ai(project_id: str, location: str, staging_bucket: Optional[str]
     try:
         bucket_info = f"(Bucket: gs://{staging_bucket})" if staging_bucket else "(No bucket specified)"
         print(f"Initializing Vertex AI SDK for {project_id}/{location} {bucket_info}...")
-        init_kwargs = {"project": project_id, "location": location}
-        if staging_bucket:
-            init_kwargs["staging_bucket"] = f"gs://{staging_bucket}"
-        vertexai.init(**init_kwargs)
+        get_backend().init(project_id, location, staging_bucket)
         print("Vertex AI initialized successfully.")
         return True, None
     except google_exceptions.NotFound:
@@ -193,7 +189,7 @@ def run_deployment(
     remote_agent = None
     deployment_error = None
     try:
-        remote_agent = agent_engines.create(
+        remote_agent = get_backend().create(
             adk_app, requirements=combined_requirements, extra_packages=extra_packages,
             display_name=display_name, description=description,
         )
@@ -14,7 +14,6 @@
 
 import os
 
-import vertexai
 from dotenv import load_dotenv
 from prompt_toolkit import prompt
 from prompt_toolkit.shortcuts import (
@@ -22,7 +21,8 @@ from prompt_toolkit.shortcuts import (
     message_dialog,
     yes_no_dialog,
 )
-from vertexai import agent_engines
+
+from deployment_utils.agent_engine_backend import get_backend
 
 # from utils.adc_utils import get_adc_info_string # No longer needed for confirmation
 
@@ -34,10 +34,7 @@ def run_deletion(project_id: str, location: str) -> None:
     # 1. Initialize Vertex AI SDK
     try:
         print("Initializing Vertex AI SDK...")
-        vertexai.init(
-            project=project_id,
-            location=location,
-        )
+        get_backend().init(project_id, location)
         print("Vertex AI initialized successfully.")
     except Exception as e:
         message_dialog(
@@ -49,8 +46,8 @@ def run_deletion(project_id: str, location: str) -> None:
     # 2. List existing agent engines
     try:
         print(f"Fetching agent engines in {project_id}/{location}...")
-        # Fetch and immediately convert to list to handle potential generator issues early
-        existing_agents_list = list(agent_engines.list())
+        # The backend returns a fully materialized list, so listing errors surface here
+        existing_agents_list = get_backend().list()
         print(f"Found {len(existing_agents_list)} agent engine(s).")
     except Exception as e:
         message_dialog(
@@ -109,8 +106,7 @@ def run_deletion(project_id: str, location: str) -> None:
         for resource_name in selected_agents:
             try:
                 print(f"Deleting {resource_name}...")
-                agent_to_delete = agent_engines.get(resource_name)
-                agent_to_delete.delete(force=True) # force=True bypasses safety check if agent is used elsewhere
+                get_backend().delete(resource_name, force=True) # force=True bypasses safety check if agent is used elsewhere
                 print(f"Successfully deleted {resource_name}")
                 success_count += 1
             except Exception as e:
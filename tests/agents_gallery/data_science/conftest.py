@@ -0,0 +1,34 @@
+#  Copyright (C) 2025 Google LLC
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+# Lets the data science tests import its modules without building the agents
+
+import importlib.util
+import os
+import sys
+
+import agents_gallery
+
+# These packages import the agents, which needs a Google Cloud project. They are
+# registered without running their __init__ so the modules below them can load.
+_DATA_SCIENCE_DIR = os.path.join(os.path.dirname(agents_gallery.__file__), "data_science")
+for _name, _path in (
+    ("agents_gallery.data_science", _DATA_SCIENCE_DIR),
+    ("agents_gallery.data_science.sub_agents", os.path.join(_DATA_SCIENCE_DIR, "sub_agents")),
+):
+    if _name not in sys.modules:
+        _spec = importlib.util.spec_from_file_location(
+            _name, os.path.join(_path, "__init__.py"), submodule_search_locations=[_path]
+        )
+        sys.modules[_name] = importlib.util.module_from_spec(_spec)
@@ -0,0 +1,207 @@
+#  Copyright (C) 2025 Google LLC
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+# Unit testing for ChaseSQL candidate selection
+
+import threading
+
+from agents_gallery.data_science.sub_agents.bigquery.chase_sql import (
+    candidate_selection,
+)
+
+
+class FakeJob:
+    """A query job that blocks in `result` until it is cancelled."""
+
+    def __init__(self, job_id, rows=()):
+        self.job_id = job_id
+        self.rows = list(rows)
+        self.total_bytes_processed = 10
+        self.cancelled = threading.Event()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def result(self, max_results=None, page_size=None):
+        return [FakeRow(row) for row in self.rows[:max_results]]
+
+
+class FakeRow:
+    def __init__(self, values):
+        self._values = values
+
+    def values(self):
+        return self._values
+
+
+class FakeClient:
+    """Records the SQL of every query and returns a job with fixed rows."""
+
+    def __init__(self, rows=((1,),)):
+        self.rows = rows
+        self.queries = []
+
+    def query(self, sql, job_config=None):
+        self.queries.append(sql)
+        return FakeJob(f"job{len(self.queries)}", self.rows)
+
+
+def fake_execute(results, started):
+    """Returns an `execute` giving each SQL's hash, and blocking on SQL mapped to None."""
+
+    def execute(client, candidate, max_rows, max_bytes_billed, jobs):
+        job = FakeJob(candidate.sql)
+        started.append(job)
+        jobs.add(job)
+        try:
+            if results[candidate.sql] is None:
+                job.cancelled.wait(5)
+                raise RuntimeError("cancelled")
+            return results[candidate.sql]
+        finally:
+            jobs.discard(job)
+
+    return execute
+
+
+def test_duplicates_are_grouped_with_their_weight():
+    """
+    Test that candidates with the same canonical form are merged and unparsable ones dropped.
+    """
+    candidates = ["SELECT 1 AS x", "select 1 as x", None, "Timeout", "SELECT 2 AS x"]
+    unique = candidate_selection.dedupe_candidates(candidates)
+
+    assert [(c.sql, c.weight, c.index) for c in unique] == [
+        ("SELECT 1 AS x", 2, 0),
+        ("SELECT 2 AS x", 1, 4),
+    ]
+
+
+def test_result_hash_ignores_order_unless_ordered():
+    """
+    Test that row order only changes the hash of ordered results.
+    """
+    rows = [(1, "a"), (2, "b")]
+    assert candidate_selection.result_hash(rows, False) == candidate_selection.result_hash(rows[::-1], False)
+    assert candidate_selection.result_hash(rows, True) != candidate_selection.result_hash(rows[::-1], True)
+
+
+def test_locally_invalid_candidates_are_dropped():
+    """
+    Test that a candidate reading an unknown column is dropped without executing it.
+    """
+    schema = {"orders": {"id": "INT64", "amount": "FLOAT64"}}
+    candidates = ["SELECT nope FROM orders", "SELECT amount FROM orders"]
+
+    def execute(*args):
+        raise AssertionError("a single valid candidate needs no execution")
+
+    selected = candidate_selection.select_candidate(
+        candidates, FakeClient(), schema_dict=schema, execute=execute
+    )
+    assert selected == "SELECT amount FROM orders"
+
+
+def test_execute_candidate_runs_the_returned_sql_with_a_limit():
+    """
+    Test that the candidate's own SQL text is dry-run, then executed with a LIMIT of max_rows + 1.
+    """
+    client = FakeClient(rows=[(1,), (2,)])
+    candidate = candidate_selection.Candidate(sql="select id from orders", canonical="SELECT id FROM orders")
+
+    digest = candidate_selection.execute_candidate(client, candidate, 80, 0, candidate_selection.RunningJobs())
+
+    assert client.queries == ["select id from orders", "select id from orders\nLIMIT 81"]
+    assert digest == candidate_selection.result_hash([(1,), (2,)], ordered=False)
+
+
+def test_truncated_results_agree_only_when_ordered():
+    """
+    Test that equal ordered results cut off at max_rows agree, and unordered ones don't vote.
+    """
+    jobs = candidate_selection.RunningJobs()
+    rows = [(i,) for i in range(10)]
+    ordered = [
+        candidate_selection.Candidate(sql=sql, canonical=sql)
+        for sql in ("SELECT id FROM orders ORDER BY id", "SELECT id FROM orders AS o ORDER BY o.id")
+    ]
+    digests = [
+        candidate_selection.execute_candidate(FakeClient(rows=rows), candidate, 5, 0, jobs)
+        for candidate in ordered
+    ]
+    assert digests[0] == digests[1]
+    assert digests[0] != candidate_selection.result_hash(rows[:5], ordered=True)
+
+    unordered = candidate_selection.Candidate(sql="SELECT id FROM orders", canonical="SELECT id FROM orders")
+    assert candidate_selection.execute_candidate(FakeClient(rows=rows), unordered, 5, 0, jobs) is None
+    assert candidate_selection.execute_candidate(FakeClient(rows=rows[:5]), unordered, 5, 0, jobs) is not None
+
+
+def test_candidates_without_comparable_results_do_not_vote():
+    """
+    Test that a candidate whose result isn't comparable doesn't count towards any result.
+    """
+    candidates = ["SELECT 1 AS a", "SELECT 1 AS b", "SELECT 1 AS c"]
+    results = {"SELECT 1 AS a": None, "SELECT 1 AS b": None, "SELECT 1 AS c": "h1"}
+
+    def execute(client, candidate, max_rows, max_bytes_billed, jobs):
+        return results[candidate.sql]
+
+    selected = candidate_selection.select_candidate(candidates, FakeClient(), execute=execute)
+    assert selected == "SELECT 1 AS c"
+
+
+def test_majority_result_wins_and_running_queries_are_cancelled():
+    """
+    Test that a quorum returns early and the query still running is cancelled.
+    """
+    candidates = ["SELECT 1 AS a", "SELECT 1 AS b", "SELECT 1 AS c", "SELECT 2 AS d"]
+    results = {"SELECT 1 AS a": None, "SELECT 1 AS b": "h1", "SELECT 1 AS c": "h1", "SELECT 2 AS d": "h1"}
+    started = []
+
+    selected = candidate_selection.select_candidate(
+        candidates, FakeClient(), execute=fake_execute(results, started)
+    )
+
+    assert selected in {"SELECT 1 AS b", "SELECT 1 AS c", "SELECT 2 AS d"}
+    blocked = next(job for job in started if job.job_id == "SELECT 1 AS a")
+    assert blocked.cancelled.is_set()
+
+
+def test_timeout_picks_the_best_result_and_cancels_the_rest():
+    """
+    Test that on timeout the best-supported result so far wins and running queries are cancelled.
+    """
+    candidates = ["SELECT 1 AS a", "SELECT 1 AS b", "SELECT 1 AS c"]
+    results = {"SELECT 1 AS a": None, "SELECT 1 AS b": None, "SELECT 1 AS c": "h1"}
+    started = []
+
+    selected = candidate_selection.select_candidate(
+        candidates, FakeClient(), timeout=0.2, execute=fake_execute(results, started)
+    )
+
+    assert selected == "SELECT 1 AS c"
+    assert all(job.cancelled.is_set() for job in started if job.job_id != "SELECT 1 AS c")
+
+
+def test_jobs_added_after_cancel_all_are_cancelled():
+    """
+    Test that a job started after the selection ended is cancelled right away.
+    """
+    jobs = candidate_selection.RunningJobs()
+    jobs.cancel_all()
+    job = FakeJob("late")
+    jobs.add(job)
+    assert job.cancelled.is_set()
@@ -0,0 +1,212 @@
+#  Copyright (C) 2025 Google LLC
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+# Unit testing for the ChaseSQL context caches
+
+import datetime
+import threading
+from types import SimpleNamespace
+
+from agents_gallery.data_science.sub_agents.bigquery.chase_sql import (
+    chase_db_tools,
+    context_cache,
+)
+
+TEMPLATE = (
+    "Instructions for {BQ_PROJECT_ID}\n{SCHEMA}\n"
+    + context_cache.QUESTION_MARKER + "\nExample\n"
+    + context_cache.QUESTION_MARKER + "\n{QUESTION}\n"
+)
+
+
+def in_hours(hours):
+    return datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(hours=hours)
+
+
+class FakeCachedContent:
+    """Stands in for `caching.CachedContent`, keeping caches in class attributes."""
+
+    created = []
+    existing = []
+    fail = False
+    # Set to block `create` until the event is set.
+    create_gate = None
+
+    def __init__(self, cached_content_name=None):
+        self.resource_name = cached_content_name
+        self.display_name = None
+        self.expire_time = in_hours(1)
+        self.updated = False
+
+    @classmethod
+    def list(cls):
+        return list(cls.existing)
+
+    @classmethod
+    def create(cls, model_name, contents, ttl, display_name):
+        if cls.create_gate is not None:
+            cls.create_gate.wait(5)
+        if cls.fail:
+            raise ValueError("prefix too small")
+        cached_content = cls(f"caches/{len(cls.created)}")
+        cached_content.display_name = display_name
+        cls.created.append(cached_content)
+        return cached_content
+
+    def update(self, ttl):
+        self.updated = True
+
+    def refresh(self):
+        self.expire_time = in_hours(1)
+
+
+def fake_caching(monkeypatch):
+    FakeCachedContent.created = []
+    FakeCachedContent.existing = []
+    FakeCachedContent.fail = False
+    FakeCachedContent.create_gate = None
+    monkeypatch.setattr(context_cache, "caching", SimpleNamespace(CachedContent=FakeCachedContent))
+    return FakeCachedContent
+
+
+def test_split_prompt_cuts_before_the_last_question():
+    """
+    Test that the prefix holds the instructions, schema and examples, and the rest the question.
+    """
+    prefix, question_part = context_cache.split_prompt(TEMPLATE, "CREATE TABLE t (id INT64);", "How many?", "proj")
+
+    assert prefix == "Instructions for proj\nCREATE TABLE t (id INT64);\n" + context_cache.QUESTION_MARKER + "\nExample\n"
+    assert question_part == context_cache.QUESTION_MARKER + "\nHow many?\n"
+    assert context_cache.split_prompt("No marker {SCHEMA}", "s", "q", "p") is None
+
+
+def test_cache_is_created_once_and_reused(monkeypatch):
+    """
+    Test that the first call creates a cache and later calls for the same prefix reuse it.
+    """
+    cached_contents = fake_caching(monkeypatch)
+    caches = context_cache.ContextCaches(ttl_seconds=3600)
+
+    name = caches.get_cache_name("gemini", "prefix")
+    assert name == "caches/0"
+    assert caches.get_cache_name("gemini", "prefix") == name
+    assert caches.get_cache_name("gemini", "other prefix") == "caches/1"
+    assert len(cached_contents.created) == 2
+
+
+def test_cache_created_by_another_process_is_reused(monkeypatch):
+    """
+    Test that a live cache with the prefix's display name is used instead of creating one.
+    """
+    cached_contents = fake_caching(monkeypatch)
+    existing = FakeCachedContent("caches/shared")
+    existing.display_name = context_cache.DISPLAY_NAME_PREFIX + context_cache.prefix_hash("gemini", "prefix")[:32]
+    cached_contents.existing = [existing]
+
+    assert context_cache.ContextCaches().get_cache_name("gemini", "prefix") == "caches/shared"
+    assert not cached_contents.created
+
+
+def test_cache_close_to_expiry_is_renewed(monkeypatch):
+    """
+    Test that a cache with less than half its TTL left gets its TTL extended.
+    """
+    cached_contents = fake_caching(monkeypatch)
+    caches = context_cache.ContextCaches(ttl_seconds=3600)
+    caches.get_cache_name("gemini", "prefix")
+    key = context_cache.prefix_hash("gemini", "prefix")
+    caches._caches[key] = ("caches/0", in_hours(0.25))
+
+    assert caches.get_cache_name("gemini", "prefix") == "caches/0"
+    assert caches._caches[key][1] > in_hours(0.9)
+    assert len(cached_contents.created) == 1
+
+
+def test_failed_creation_is_not_retried_until_the_ttl_passed(monkeypatch):
+    """
+    Test that a prefix whose cache couldn't be created is sent uncached without trying again.
+    """
+    cached_contents = fake_caching(monkeypatch)
+    cached_contents.fail = True
+    caches = context_cache.ContextCaches(ttl_seconds=3600)
+
+    assert caches.get_cache_name("gemini", "prefix") is None
+    cached_contents.fail = False
+    assert caches.get_cache_name("gemini", "prefix") is None
+    assert not cached_contents.created
+
+
+def test_slow_creation_does_not_block_other_prefixes(monkeypatch):
+    """
+    Test that a cache being created for one prefix doesn't hold up lookups for another one.
+    """
+    cached_contents = fake_caching(monkeypatch)
+    caches = context_cache.ContextCaches()
+    caches.get_cache_name("gemini", "ready")
+    cached_contents.create_gate = threading.Event()
+    slow = threading.Thread(target=caches.get_cache_name, args=("gemini", "slow"))
+    slow.start()
+
+    try:
+        result = []
+        fast = threading.Thread(target=lambda: result.append(caches.get_cache_name("gemini", "ready")))
+        fast.start()
+        fast.join(1)
+        assert result == ["caches/0"]
+    finally:
+        cached_contents.create_gate.set()
+        slow.join(5)
+
+
+class FakeModel:
+    prompts = []
+
+    def __init__(self, model_name, temperature, cache_name):
+        self.cache_name = cache_name
+
+    def generate_n(self, prompt, n, parser_func=None):
+        FakeModel.prompts.append(prompt)
+        return ["SELECT 1"]
+
+
+def test_uncached_prompt_uses_the_relevant_schema(monkeypatch):
+    """
+    Test that without a context cache the prompt is built with the pruned schema, not the full one.
+    """
+    monkeypatch.setattr(context_cache, "CONTEXT_CACHE_ENABLED", True)
+    monkeypatch.setattr(context_cache, "CONTEXT_CACHES", SimpleNamespace(get_cache_name=lambda model, prefix: None))
+    monkeypatch.setattr(chase_db_tools, "get_cached_sql", lambda question, tool_context: None)
+    monkeypatch.setattr(chase_db_tools, "get_relevant_schema", lambda question, settings: "RELEVANT SCHEMA")
+    monkeypatch.setattr(chase_db_tools, "GeminiModel", FakeModel)
+    FakeModel.prompts = []
+    tool_context = SimpleNamespace(state={
+        "database_settings": {
+            "bq_ddl_schema": "FULL SCHEMA",
+            "bq_project_id": "proj",
+            "bq_dataset_id": "shop",
+            "transpile_to_bigquery": False,
+            "process_input_errors": False,
+            "process_tool_output_errors": False,
+            "number_of_candidates": 1,
+            "model": "gemini",
+            "temperature": 0.0,
+            "generate_sql_type": "dc",
+        },
+    })
+
+    assert chase_db_tools.initial_bq_nl2sql("How many orders?", tool_context) == "SELECT 1"
+    assert "RELEVANT SCHEMA" in FakeModel.prompts[0]
+    assert "FULL SCHEMA" not in FakeModel.prompts[0]
+    assert "How many orders?" in FakeModel.prompts[0]
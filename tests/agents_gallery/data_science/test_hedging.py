@@ -0,0 +1,115 @@
+#  Copyright (C) 2025 Google LLC
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+# Unit testing for hedged Gemini requests
+
+import threading
+
+from agents_gallery.data_science.sub_agents.bigquery.chase_sql import hedging, llm_utils
+from agents_gallery.data_science.sub_agents.bigquery.chase_sql.rate_limiting import (
+    RateLimiters,
+    RetryBudget,
+)
+from agents_gallery.data_science.sub_agents.bigquery.chase_sql.resilience import (
+    CircuitBreakers,
+)
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModel:
+    """Answers the first request only once `release` is set, and later ones at once."""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = threading.Event()
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt, generation_config=None, safety_settings=None):
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+        if call == 1:
+            self.release.wait(5)
+            return FakeResponse("slow")
+        return FakeResponse("fast")
+
+
+def hedged_model(monkeypatch, latencies, budget):
+    monkeypatch.setattr(llm_utils, "LATENCIES", latencies)
+    monkeypatch.setattr(llm_utils, "HEDGE_BUDGET", budget)
+    monkeypatch.setattr(llm_utils, "RATE_LIMITERS", RateLimiters(rate=1000, capacity=1000))
+    monkeypatch.setattr(llm_utils, "CIRCUIT_BREAKERS", CircuitBreakers())
+    monkeypatch.setattr(llm_utils, "GenerativeModel", lambda model_name: FakeModel())
+    return llm_utils.GeminiModel(model_name="gemini-test", hedge_requests=True)
+
+
+def test_percentile_needs_enough_samples():
+    """
+    Test that no hedge delay is given until the window has min_samples latencies.
+    """
+    window = hedging.LatencyWindow(size=10, min_samples=3)
+    window.record("m", 1.0)
+    window.record("m", 2.0)
+    assert window.percentile("m", 95) is None
+    window.record("m", 3.0)
+    assert window.percentile("m", 95) == 3.0
+    assert window.percentile("m", 50) == 2.0
+    assert window.percentile("other", 50) is None
+
+
+def test_window_keeps_only_recent_latencies():
+    """
+    Test that the window forgets latencies beyond its size.
+    """
+    window = hedging.LatencyWindow(size=3, min_samples=1)
+    for latency in (10.0, 1.0, 2.0, 3.0):
+        window.record("m", latency)
+    assert window.percentile("m", 100) == 3.0
+
+
+def test_slow_request_is_hedged_and_first_response_wins(monkeypatch):
+    """
+    Test that a request slower than the percentile gets a duplicate whose response is returned.
+    """
+    latencies = hedging.LatencyWindow(min_samples=1)
+    latencies.record("gemini-test", 0.01)
+    model = hedged_model(monkeypatch, latencies, RetryBudget(max_tokens=1, ratio=0))
+
+    try:
+        assert model.call("question") == "fast"
+        assert model.model.calls == 2
+    finally:
+        model.model.release.set()
+
+
+def test_no_hedge_without_budget_or_latency_history(monkeypatch):
+    """
+    Test that requests aren't duplicated before there are enough samples or when the budget is spent.
+    """
+    model = hedged_model(monkeypatch, hedging.LatencyWindow(min_samples=1), RetryBudget(max_tokens=1))
+    model.model.release.set()
+    assert model.call("question") == "slow"
+    assert model.model.calls == 1
+
+    latencies = hedging.LatencyWindow(min_samples=1)
+    latencies.record("gemini-test", 0.01)
+    model = hedged_model(monkeypatch, latencies, RetryBudget(max_tokens=0, ratio=0))
+    threading.Timer(0.1, model.model.release.set).start()
+    assert model.call("question") == "slow"
+    assert model.model.calls == 1
@@ -0,0 +1,69 @@
+#  Copyright (C) 2025 Google LLC
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+# Unit testing for multi-candidate generation with the Gemini model client
+
+import pytest
+from google.api_core import exceptions as api_exceptions
+
+from agents_gallery.data_science.sub_agents.bigquery.chase_sql import llm_utils
+
+
+class FakeResponse:
+    text = "SELECT 1"
+
+
+class FakeModel:
+    """Fails the first request (the multi-candidate one) with `error`, then answers."""
+
+    def __init__(self, error):
+        self.error = error
+
+    def generate_content(self, prompt, generation_config=None, safety_settings=None):
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+        return FakeResponse()
+
+
+@pytest.fixture
+def gemini_model(monkeypatch):
+    monkeypatch.setattr(llm_utils, "_CANDIDATE_COUNT_UNSUPPORTED", set())
+
+    def make(error):
+        monkeypatch.setattr(llm_utils, "GenerativeModel", lambda model_name: FakeModel(error))
+        return llm_utils.GeminiModel(model_name="gemini-test", hedge_requests=False)
+
+    return make
+
+
+def test_rejected_candidate_count_marks_the_model_unsupported(gemini_model):
+    """
+    Test that an InvalidArgument naming candidate_count stops multi-candidate calls for the model.
+    """
+    model = gemini_model(api_exceptions.InvalidArgument("candidateCount must be 1 for this model"))
+
+    assert model.generate_n("question", 3) == ["SELECT 1"] * 3
+    assert "gemini-test" in llm_utils._CANDIDATE_COUNT_UNSUPPORTED
+
+
+def test_other_invalid_arguments_only_fall_back_for_the_call(gemini_model):
+    """
+    Test that an InvalidArgument unrelated to candidate_count doesn't disable it for the model.
+    """
+    model = gemini_model(api_exceptions.InvalidArgument("The input token count exceeds the maximum"))
+
+    assert model.generate_n("question", 3) == ["SELECT 1"] * 3
+    assert "gemini-test" not in llm_utils._CANDIDATE_COUNT_UNSUPPORTED
@@ -0,0 +1,149 @@
+#  Copyright (C) 2025 Google LLC
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+# Unit testing for the local SQL checks against the schema
+
+import pytest
+
+from agents_gallery.data_science.sub_agents.bigquery import local_validation
+
+DDL_SCHEMA = """CREATE OR REPLACE TABLE `proj.shop.orders` (
+  id INT64,
+  customer_id INT64,
+  status STRING,
+  amount FLOAT64
+);
+CREATE OR REPLACE TABLE `proj.shop.customers` (
+  id INT64,
+  customer_code STRING,
+  country STRING
+);
+"""
+
+
+@pytest.fixture
+def schema():
+    return local_validation.schema_for_ddl(DDL_SCHEMA)
+
+
+def validate(sql, schema):
+    return local_validation.validate_sql(sql, schema, db="shop", catalog="proj")
+
+
+def error_types(errors):
+    return [error["type"] for error in errors]
+
+
+def test_valid_queries_have_no_errors(schema):
+    """
+    Test that correct queries, including CTEs, joins and aggregates, pass.
+    """
+    assert validate("SELECT status, COUNT(*) AS n FROM orders GROUP BY status", schema) == []
+    assert validate(
+        "SELECT c.country, SUM(o.amount) FROM orders o JOIN customers c ON o.customer_id = c.id"
+        " GROUP BY c.country",
+        schema,
+    ) == []
+    assert validate("WITH big AS (SELECT * FROM orders WHERE amount > 10) SELECT id FROM big", schema) == []
+
+
+def test_syntax_errors_are_reported_without_a_schema():
+    """
+    Test that a syntax error is found even when no schema is available.
+    """
+    assert error_types(local_validation.validate_sql("SELECT FROM WHERE", None)) == ["syntax"]
+    assert local_validation.validate_sql("SELECT 1", None) == []
+
+
+def test_unknown_table_is_reported_with_suggestions(schema):
+    """
+    Test that a table missing from the dataset is reported with close table names.
+    """
+    errors = validate("SELECT id FROM order", schema)
+    assert error_types(errors) == ["unknown_table"]
+    assert errors[0]["suggestions"] == ["orders"]
+
+
+def test_unknown_column_is_reported_with_suggestions(schema):
+    """
+    Test that a column that can't be resolved is reported with close column names.
+    """
+    errors = validate("SELECT ammount FROM orders", schema)
+    assert error_types(errors) == ["unknown_column"]
+    assert "amount" in errors[0]["suggestions"]
+
+
+def test_join_on_incompatible_types_is_reported(schema):
+    """
+    Test that a JOIN comparing STRING with INT64 is reported.
+    """
+    errors = validate(
+        "SELECT o.id FROM orders o JOIN customers c ON o.customer_id = c.customer_code", schema
+    )
+    assert error_types(errors) == ["join_type_mismatch"]
+
+
+def test_ungrouped_column_is_reported(schema):
+    """
+    Test that a selected column that is neither grouped nor aggregated is reported.
+    """
+    errors = validate("SELECT status, amount, COUNT(*) FROM orders GROUP BY status", schema)
+    assert error_types(errors) == ["not_grouped"]
+    assert "amount" in errors[0]["message"]
+
+
+def test_aggregates_unknown_to_sqlglot_count_as_aggregated(schema):
+    """
+    Test that BigQuery aggregates sqlglot parses as anonymous functions aren't reported as ungrouped.
+    """
+    assert validate(
+        "SELECT customer_id, APPROX_QUANTILES(amount, 4) AS quartiles FROM orders GROUP BY customer_id",
+        schema,
+    ) == []
+    assert validate("SELECT status, BIT_OR(id) AS ids FROM orders GROUP BY status", schema) == []
+    assert validate(
+        "SELECT status, APPROX_TOP_COUNT(customer_id, 3) AS top, COUNT(*) AS n FROM orders GROUP BY status",
+        schema,
+    ) == []
+    # Columns outside the unknown function are still checked.
+    errors = validate("SELECT status, amount, BIT_OR(id) FROM orders GROUP BY status", schema)
+    assert error_types(errors) == ["not_grouped"]
+
+
+def test_other_datasets_and_pseudo_columns_are_left_to_bigquery(schema):
+    """
+    Test that tables of other datasets and BigQuery pseudo-columns aren't judged.
+    """
+    assert validate("SELECT anything FROM other_dataset.events", schema) == []
+    assert validate("SELECT _PARTITIONTIME FROM orders", schema) == []
+
+
+def test_schema_for_ddl_without_tables_is_none():
+    """
+    Test that an empty or table-less DDL gives no schema.
+    """
+    assert local_validation.schema_for_ddl(None) is None
+    assert local_validation.schema_for_ddl("") is None
+
+
+def test_format_errors_joins_messages_and_suggestions():
+    """
+    Test that errors are formatted as one message with their suggestions.
+    """
+    message = local_validation.format_errors([
+        {"type": "unknown_table", "message": "Table 'order' does not exist.", "suggestions": ["orders"]},
+        {"type": "syntax", "message": "Syntax error."},
+    ])
+    assert message == "Table 'order' does not exist. Did you mean: orders? Syntax error."
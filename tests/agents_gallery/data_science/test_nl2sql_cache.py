@@ -0,0 +1,88 @@
+#  Copyright (C) 2025 Google LLC
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+# Unit testing for the question to SQL cache
+
+from agents_gallery.data_science.sub_agents.bigquery import nl2sql_cache
+from agents_gallery.data_science.sub_agents.bigquery.nl2sql_cache import NL2SQLCache
+
+SQL = "SELECT COUNT(*) FROM orders WHERE EXTRACT(YEAR FROM created_at) = 2024"
+
+
+def test_normalize_question_keeps_operators():
+    """
+    Test that case and punctuation are normalized but comparison operators are kept.
+    """
+    assert nl2sql_cache.normalize_question("  How many Orders,  in 2024? ") == "how many orders in 2024"
+    assert nl2sql_cache.normalize_question("revenue >= 100") == "revenue >= 100"
+    assert nl2sql_cache.normalize_question("margin != 5%") == "margin != 5 %"
+
+
+def test_exact_and_reworded_questions_hit():
+    """
+    Test that the same question and a small rewording return the cached SQL.
+    """
+    cache = NL2SQLCache()
+    cache.put("How many orders were placed in 2024?", "v1", SQL)
+
+    assert cache.get("how many orders were placed in 2024", "v1") == SQL
+    assert cache.get("How many orders placed in 2024?", "v1") == SQL
+
+
+def test_different_filters_and_schema_versions_miss():
+    """
+    Test that a different year or schema version doesn't reuse the SQL.
+    """
+    cache = NL2SQLCache()
+    cache.put("How many orders were placed in 2024?", "v1", SQL)
+
+    assert cache.get("How many orders were placed in 2023?", "v1") is None
+    assert cache.get("How many orders were placed in 2024?", "v2") is None
+
+
+def test_opposite_comparisons_dont_share_sql():
+    """
+    Test that questions differing only in a comparison operator get no cached SQL.
+    """
+    cache = NL2SQLCache()
+    cache.put("Customers with revenue > 100", "v1", "SELECT * FROM c WHERE revenue > 100")
+
+    assert cache.get("Customers with revenue < 100", "v1") is None
+    assert cache.get("Customers with revenue >= 100", "v1") is None
+    assert cache.get("customers with revenue > 100", "v1") == "SELECT * FROM c WHERE revenue > 100"
+
+
+def test_least_recently_used_entry_is_evicted():
+    """
+    Test that the cache keeps at most max_entries questions, dropping the least recently used.
+    """
+    cache = NL2SQLCache(max_entries=2)
+    cache.put("orders in 2022", "v1", "a")
+    cache.put("orders in 2023", "v1", "b")
+    cache.get("orders in 2022", "v1")
+    cache.put("orders in 2024", "v1", "c")
+
+    assert cache.get("orders in 2022", "v1") == "a"
+    assert cache.get("orders in 2023", "v1") is None
+    assert cache.get("orders in 2024", "v1") == "c"
+
+
+def test_disabled_cache_stores_nothing():
+    """
+    Test that a cache with max_entries 0 never returns SQL.
+    """
+    cache = NL2SQLCache(max_entries=0)
+    cache.put("orders in 2024", "v1", SQL)
+    assert cache.get("orders in 2024", "v1") is None
@@ -0,0 +1,96 @@
+#  Copyright (C) 2025 Google LLC
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+# Unit testing for the run_bigquery_validation result cache
+
+from agents_gallery.data_science.sub_agents.bigquery.query_cache import (
+    QueryResultCache,
+    cache_key,
+    canonical_sql,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_canonical_sql_ignores_formatting_and_comments():
+    """
+    Test that whitespace, keyword case and comments don't change the canonical form.
+    """
+    assert canonical_sql("select a\n  from t -- all of them\n") == canonical_sql("SELECT a FROM t")
+
+
+def test_unparsable_sql_is_not_cached():
+    """
+    Test that SQL sqlglot can't tokenize or parse gets no cache key instead of raising.
+    """
+    assert canonical_sql("SELECT 'abc") is None
+    assert canonical_sql("SELECT `a FROM t") is None
+    assert cache_key("SELECT 'abc", "v1") is None
+
+
+def test_only_single_statements_are_cached():
+    """
+    Test that multi-statement and empty input get no cache key, so they can't share one with their first statement.
+    """
+    assert cache_key("SELECT 1; SELECT 2", "v1") is None
+    assert cache_key("", "v1") is None
+    assert cache_key("SELECT 1;", "v1") == cache_key("SELECT 1", "v1")
+
+
+def test_non_deterministic_queries_are_not_cached():
+    """
+    Test that queries using functions like CURRENT_DATE get no cache key.
+    """
+    assert cache_key("SELECT * FROM t WHERE d = current_date()", "v1") is None
+
+
+def test_cache_key_depends_on_schema_version():
+    """
+    Test that a schema change invalidates cached results.
+    """
+    assert cache_key("SELECT a FROM t", "v1") != cache_key("SELECT a FROM t", "v2")
+
+
+def test_cache_expires_and_evicts_least_recently_used():
+    """
+    Test that entries expire after the TTL and the least recently used entry is evicted.
+    """
+    clock = FakeClock()
+    cache = QueryResultCache(max_entries=2, ttl_seconds=10, clock=clock)
+    cache.put("a", {"rows": [1]})
+    cache.put("b", {"rows": [2]})
+    assert cache.get("a") == {"rows": [1]}
+    cache.put("c", {"rows": [3]})
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+
+    clock.now = 11
+    assert cache.get("a") is None
+    assert cache.get("c") is None
+
+
+def test_cache_returns_copies():
+    """
+    Test that mutating a returned value doesn't change the cached one.
+    """
+    cache = QueryResultCache(max_entries=2, ttl_seconds=10)
+    cache.put("a", {"rows": [1]})
+    cache.get("a")["rows"].append(2)
+    assert cache.get("a") == {"rows": [1]}
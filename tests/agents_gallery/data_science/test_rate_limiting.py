@@ -0,0 +1,104 @@
+#  Copyright (C) 2025 Google LLC
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+# Unit testing for the ChaseSQL rate limits and retry budget
+
+import asyncio
+
+from agents_gallery.data_science.sub_agents.bigquery.chase_sql import rate_limiting
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bucket_allows_a_burst_then_spaces_requests():
+    """
+    Test that the bucket serves `capacity` requests at once, then one per 1/rate seconds.
+    """
+    clock = FakeClock()
+    bucket = rate_limiting.TokenBucket(rate=2, capacity=3, clock=clock)
+
+    assert [bucket._reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket._reserve() == 0.5
+    # The next caller waits behind the one already in debt.
+    assert bucket._reserve() == 1.0
+
+
+def test_bucket_refills_up_to_capacity():
+    """
+    Test that tokens come back with time but never above the capacity.
+    """
+    clock = FakeClock()
+    bucket = rate_limiting.TokenBucket(rate=1, capacity=2, clock=clock)
+    bucket._reserve()
+    bucket._reserve()
+
+    clock.now += 60
+    assert [bucket._reserve() for _ in range(2)] == [0.0, 0.0]
+    assert bucket._reserve() == 1.0
+
+
+def test_acquire_waits_for_the_token(monkeypatch):
+    """
+    Test that acquire and acquire_async sleep for the reserved delay.
+    """
+    clock = FakeClock()
+    bucket = rate_limiting.TokenBucket(rate=4, capacity=1, clock=clock)
+    sleeps = []
+    monkeypatch.setattr(rate_limiting.time, "sleep", sleeps.append)
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+
+    monkeypatch.setattr(rate_limiting.asyncio, "sleep", fake_sleep)
+
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == 0.25
+    assert asyncio.run(bucket.acquire_async()) == 0.5
+    assert sleeps == [0.25, 0.5]
+
+
+def test_rate_limiters_share_one_bucket_per_key():
+    """
+    Test that the same key always gets the same bucket, with the configured limits.
+    """
+    limiters = rate_limiting.RateLimiters(rate=5, capacity=7)
+    bucket = limiters.get(("gemini", "us-central1"))
+
+    assert limiters.get(("gemini", "us-central1")) is bucket
+    assert limiters.get(("gemini", "europe-west4")) is not bucket
+    assert (bucket.rate, bucket.capacity) == (5, 7)
+
+
+def test_retry_budget_is_spent_and_earned_back():
+    """
+    Test that retries stop when the budget is empty and successes refill it up to the maximum.
+    """
+    budget = rate_limiting.RetryBudget(max_tokens=2, ratio=0.5)
+
+    assert budget.try_spend() and budget.try_spend()
+    assert not budget.try_spend()
+    budget.record_success()
+    assert not budget.try_spend()
+    budget.record_success()
+    assert budget.try_spend()
+    for _ in range(10):
+        budget.record_success()
+    assert budget.tokens == 2
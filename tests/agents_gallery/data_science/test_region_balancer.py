@@ -0,0 +1,126 @@
+#  Copyright (C) 2025 Google LLC
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+# Unit testing for the ChaseSQL region balancer
+
+import pytest
+from google.api_core import exceptions as api_exceptions
+
+from agents_gallery.data_science.sub_agents.bigquery.chase_sql import region_balancer
+from agents_gallery.data_science.sub_agents.bigquery.chase_sql.region_balancer import (
+    RegionBalancer,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_needs_a_region():
+    """
+    Test that a balancer without regions is rejected.
+    """
+    with pytest.raises(ValueError):
+        RegionBalancer([])
+
+
+def test_rate_limit_errors_are_recognized():
+    """
+    Test that 429 errors count as rate limiting and other errors don't.
+    """
+    assert region_balancer.is_rate_limited(api_exceptions.TooManyRequests("quota"))
+    assert region_balancer.is_rate_limited(Exception("429 Resource exhausted"))
+    assert not region_balancer.is_rate_limited(api_exceptions.InternalServerError("boom"))
+    assert not region_balancer.is_rate_limited(None)
+
+
+def test_faster_region_wins():
+    """
+    Test that of two regions the one with the lower latency is chosen.
+    """
+    balancer = RegionBalancer(["slow", "fast"])
+    balancer.record(balancer.choose(exclude=("fast",)), 5.0)
+    balancer.record(balancer.choose(exclude=("slow",)), 0.5)
+
+    assert {balancer.choose() for _ in range(5)} == {"fast"}
+
+
+def test_choose_counts_calls_in_flight_until_recorded():
+    """
+    Test that a chosen region is in flight until its outcome is recorded.
+    """
+    balancer = RegionBalancer(["only"])
+    balancer.choose()
+    assert balancer.snapshot()["only"].in_flight == 1
+    balancer.record("only", 1.0)
+    assert balancer.snapshot()["only"].in_flight == 0
+    assert balancer.snapshot()["only"].calls == 1
+
+
+def test_errors_raise_the_error_rate_but_not_the_latency():
+    """
+    Test that failed calls count in the error rate and leave the latency average alone.
+    """
+    balancer = RegionBalancer(["r"], alpha=0.5)
+    balancer.choose()
+    balancer.record("r", 2.0)
+    balancer.choose()
+    balancer.record("r", 0.01, api_exceptions.InternalServerError("boom"))
+
+    stats = balancer.snapshot()["r"]
+    assert stats.latency == 2.0
+    assert stats.error_rate == 0.5
+
+
+def test_rate_limited_region_is_quarantined_until_the_cooldown_ends():
+    """
+    Test that a region answering 429 isn't chosen again until its quarantine has passed.
+    """
+    clock = FakeClock()
+    balancer = RegionBalancer(["a", "b"], quarantine_seconds=60, clock=clock)
+    balancer.choose(exclude=("b",))
+    balancer.record("a", 0.1, api_exceptions.TooManyRequests("quota"))
+
+    assert {balancer.choose() for _ in range(5)} == {"b"}
+    clock.now += 61
+    balancer.record("b", 10.0)
+    assert balancer.choose() == "a"
+
+
+def test_all_quarantined_uses_the_one_recovering_first():
+    """
+    Test that with every region quarantined the one whose quarantine ends first is used.
+    """
+    clock = FakeClock()
+    balancer = RegionBalancer(["a", "b"], quarantine_seconds=60, clock=clock)
+    balancer.record("a", 0.1, api_exceptions.TooManyRequests("quota"))
+    clock.now += 10
+    balancer.record("b", 0.1, api_exceptions.TooManyRequests("quota"))
+
+    assert balancer.choose() == "a"
+    assert balancer.choose(exclude=("a",)) == "b"
+
+
+def test_unavailable_regions_are_skipped():
+    """
+    Test that regions rejected by is_available (e.g. with an open circuit breaker) aren't chosen.
+    """
+    balancer = RegionBalancer(["a", "b", "c"])
+    chosen = {balancer.choose(is_available=lambda region: region == "c") for _ in range(10)}
+    assert chosen == {"c"}
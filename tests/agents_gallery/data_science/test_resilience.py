@@ -0,0 +1,205 @@
+#  Copyright (C) 2025 Google LLC
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+# Unit testing for ChaseSQL retries and circuit breakers
+
+import logging
+
+import pytest
+from google.api_core import exceptions as api_exceptions
+
+from agents_gallery.data_science.sub_agents.bigquery.chase_sql import (
+    llm_utils,
+    resilience,
+)
+from agents_gallery.data_science.sub_agents.bigquery.chase_sql.rate_limiting import (
+    RateLimiters,
+    RetryBudget,
+)
+from agents_gallery.data_science.sub_agents.bigquery.chase_sql.region_balancer import (
+    RegionBalancer,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class Flaky:
+    """Raises the given errors in turn, then returns "ok"."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+        self.__name__ = "flaky"
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(resilience.time, "sleep", lambda delay: None)
+
+
+def test_full_jitter_delay_stays_below_the_capped_backoff():
+    """
+    Test that retry delays are between 0 and the exponential backoff, capped at max_delay.
+    """
+    for attempt in range(1, 8):
+        delay = resilience.full_jitter_delay(attempt, base_delay=1, max_delay=5)
+        assert 0 <= delay <= min(5, 2 ** (attempt - 1))
+
+
+def test_transient_errors_are_retried_and_logged(caplog):
+    """
+    Test that retryable errors are retried until the call succeeds, with a warning per failure.
+    """
+    func = Flaky(api_exceptions.ServiceUnavailable("down"), TimeoutError("slow"))
+    with caplog.at_level(logging.WARNING):
+        assert resilience.retry(max_attempts=3)(func)() == "ok"
+    assert func.calls == 3
+    assert caplog.text.count("failed") == 2
+
+
+def test_other_errors_and_open_circuits_are_not_retried():
+    """
+    Test that non-transient errors and CircuitOpenError are raised at once.
+    """
+    func = Flaky(ValueError("bad prompt"))
+    with pytest.raises(ValueError):
+        resilience.retry()(func)()
+    assert func.calls == 1
+
+    func = Flaky(resilience.CircuitOpenError("open"))
+    with pytest.raises(resilience.CircuitOpenError):
+        resilience.retry(retryable=(Exception,))(func)()
+    assert func.calls == 1
+
+
+def test_retries_stop_at_max_attempts_and_budget(caplog):
+    """
+    Test that retrying gives up after max_attempts or when the retry budget is spent.
+    """
+    func = Flaky(*[api_exceptions.InternalServerError("boom")] * 5)
+    with caplog.at_level(logging.WARNING), pytest.raises(api_exceptions.InternalServerError):
+        resilience.retry(max_attempts=2)(func)()
+    assert func.calls == 2
+    assert "attempts exhausted" in caplog.text
+
+    func = Flaky(*[api_exceptions.InternalServerError("boom")] * 5)
+    with pytest.raises(api_exceptions.InternalServerError):
+        resilience.retry(max_attempts=5, retry_budget=RetryBudget(max_tokens=1))(func)()
+    assert func.calls == 2
+
+
+def test_breaker_opens_after_consecutive_transient_failures():
+    """
+    Test that the breaker opens at the failure threshold and ignores non-transient errors.
+    """
+    clock = FakeClock()
+    breaker = resilience.CircuitBreaker("m", failure_threshold=2, reset_seconds=30, clock=clock)
+    breaker.record_failure(ValueError("bad request"))
+    breaker.record_failure(api_exceptions.ServiceUnavailable("down"))
+    assert breaker.state == breaker.CLOSED and not breaker.is_open()
+
+    breaker.record_failure(api_exceptions.ServiceUnavailable("down"))
+    assert breaker.state == breaker.OPEN and breaker.is_open()
+    with pytest.raises(resilience.CircuitOpenError):
+        breaker.before_call()
+
+
+def test_breaker_lets_one_trial_call_through_after_the_reset_time():
+    """
+    Test that after reset_seconds one trial call runs and its outcome closes or reopens the breaker.
+    """
+    clock = FakeClock()
+    breaker = resilience.CircuitBreaker("m", failure_threshold=1, reset_seconds=30, clock=clock)
+    breaker.record_failure(api_exceptions.ServiceUnavailable("down"))
+
+    clock.now += 31
+    assert not breaker.is_open()
+    breaker.before_call()
+    assert breaker.state == breaker.HALF_OPEN and breaker.is_open()
+    with pytest.raises(resilience.CircuitOpenError):
+        breaker.before_call()
+    breaker.record_failure(api_exceptions.ServiceUnavailable("still down"))
+    assert breaker.state == breaker.OPEN
+
+    clock.now += 31
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == breaker.CLOSED
+
+
+class FakeResponse:
+    text = "SELECT 1"
+
+
+class FakeRegionalModel:
+    def __init__(self, model_name, sent_to):
+        # Regional models are created with the full endpoint path.
+        self.region = model_name.split("/locations/")[-1].split("/")[0]
+        self.sent_to = sent_to
+
+    def generate_content(self, prompt, generation_config=None, safety_settings=None):
+        self.sent_to.append(self.region)
+        return FakeResponse()
+
+
+def test_distributed_calls_avoid_regions_with_open_breakers(monkeypatch):
+    """
+    Test that a distributed model sends calls to regions whose breaker is closed.
+    """
+    breakers = resilience.CircuitBreakers(failure_threshold=1)
+    sent_to = []
+    monkeypatch.setattr(llm_utils, "CIRCUIT_BREAKERS", breakers)
+    monkeypatch.setattr(llm_utils, "REGION_BALANCER", RegionBalancer(["a", "b"]))
+    monkeypatch.setattr(llm_utils, "RATE_LIMITERS", RateLimiters(rate=1000, capacity=1000))
+    monkeypatch.setattr(
+        llm_utils, "GenerativeModel", lambda model_name: FakeRegionalModel(model_name, sent_to)
+    )
+    model = llm_utils.GeminiModel(model_name="m", distribute_requests=True, hedge_requests=False)
+    breakers.get(("m", "a")).record_failure(api_exceptions.ServiceUnavailable("down"))
+
+    for _ in range(5):
+        assert model.call("question") == "SELECT 1"
+    assert sent_to == ["b"] * 5
+
+
+def test_call_moves_to_another_region_when_the_breaker_opens_after_choosing(monkeypatch):
+    """
+    Test that a CircuitOpenError for the chosen region sends the request to another region.
+    """
+    breakers = resilience.CircuitBreakers(failure_threshold=1)
+    sent_to = []
+    monkeypatch.setattr(llm_utils, "CIRCUIT_BREAKERS", breakers)
+    monkeypatch.setattr(llm_utils, "REGION_BALANCER", RegionBalancer(["a", "b"]))
+    monkeypatch.setattr(llm_utils, "RATE_LIMITERS", RateLimiters(rate=1000, capacity=1000))
+    monkeypatch.setattr(
+        llm_utils, "GenerativeModel", lambda model_name: FakeRegionalModel(model_name, sent_to)
+    )
+    model = llm_utils.GeminiModel(model_name="m", distribute_requests=True, hedge_requests=False)
+    breakers.get(("m", "a")).record_failure(api_exceptions.ServiceUnavailable("down"))
+
+    assert model._send_rerouted("question", None, "a").text == "SELECT 1"
+    assert sent_to == ["b"]
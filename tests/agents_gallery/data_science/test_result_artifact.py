@@ -0,0 +1,98 @@
+#  Copyright (C) 2025 Google LLC
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+# Unit testing for the Parquet query result handoff
+
+import base64
+import datetime
+import io
+
+import pyarrow.parquet as pq
+from google.adk.code_executors.code_executor_context import CodeExecutorContext
+
+from agents_gallery.data_science.sub_agents.bigquery import result_artifact
+
+
+class FakeToolContext:
+    """Keeps session state in a dict and artifacts in memory."""
+
+    def __init__(self):
+        self.state = {}
+        self.artifacts = {}
+
+    def save_artifact(self, filename, artifact):
+        self.artifacts[filename] = artifact
+
+    def load_artifact(self, filename):
+        return self.artifacts.get(filename)
+
+
+ROWS = [
+    {"id": i, "country": "NL" if i % 2 else "DE", "day": datetime.date(2025, 1, i + 1)}
+    for i in range(8)
+]
+
+
+def test_save_query_result_writes_parquet_and_returns_a_summary():
+    """
+    Test that the rows are saved as a Parquet artifact and only a JSON-friendly summary is returned.
+    """
+    tool_context = FakeToolContext()
+    summary = result_artifact.save_query_result(tool_context, ROWS)
+
+    part = tool_context.artifacts[result_artifact.QUERY_RESULT_ARTIFACT]
+    assert part.inline_data.mime_type == result_artifact.PARQUET_MIME_TYPE
+    assert pq.read_table(io.BytesIO(part.inline_data.data)).to_pylist() == ROWS
+    assert summary["num_rows"] == 8
+    assert summary["columns"] == {"id": "int64", "country": "string", "day": "date32[day]"}
+    assert summary["head"][0] == {"id": 0, "country": "DE", "day": "2025-01-01"}
+    assert len(summary["head"]) == result_artifact.SUMMARY_HEAD_ROWS
+
+
+def test_format_summary_describes_file_columns_and_head():
+    """
+    Test that the prompt text names the file, how to load it, its columns and first rows.
+    """
+    summary = result_artifact.summarize_table(result_artifact.rows_to_table(ROWS[:2]))
+    text = result_artifact.format_summary(summary)
+    assert "pd.read_parquet('query_result.parquet')" in text
+    assert "(2 rows)" in text
+    assert "  - country: string" in text
+
+
+def test_attach_and_detach_query_result():
+    """
+    Test that the saved artifact becomes a code executor input file and is removed again.
+    """
+    tool_context = FakeToolContext()
+    tool_context.state[result_artifact.QUERY_RESULT_SUMMARY_KEY] = result_artifact.save_query_result(tool_context, ROWS)
+
+    summary = result_artifact.attach_query_result(tool_context)
+    assert summary["filename"] == result_artifact.QUERY_RESULT_ARTIFACT
+    [input_file] = CodeExecutorContext(tool_context.state).get_input_files()
+    assert input_file.name == result_artifact.QUERY_RESULT_ARTIFACT
+    assert pq.read_table(io.BytesIO(base64.b64decode(input_file.content))).num_rows == 8
+
+    result_artifact.detach_query_result(tool_context)
+    assert CodeExecutorContext(tool_context.state).get_input_files() == []
+
+
+def test_attach_without_a_result_does_nothing():
+    """
+    Test that nothing is attached when there is no summary or no artifact.
+    """
+    tool_context = FakeToolContext()
+    assert result_artifact.attach_query_result(tool_context) is None
+    tool_context.state[result_artifact.QUERY_RESULT_SUMMARY_KEY] = {"filename": "missing.parquet"}
+    assert result_artifact.attach_query_result(tool_context) is None
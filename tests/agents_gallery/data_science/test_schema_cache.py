@@ -0,0 +1,103 @@
+#  Copyright (C) 2025 Google LLC
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+# Unit testing for the persistent DDL schema cache
+
+from types import SimpleNamespace
+
+from agents_gallery.data_science.sub_agents.bigquery import schema_cache
+
+
+class FakeClient:
+    """Serves __TABLES__ and INFORMATION_SCHEMA queries for a mutable set of tables."""
+
+    def __init__(self, tables):
+        # Table name -> (last modified ms, [(column name, data type)])
+        self.tables = tables
+        self.introspected = []
+
+    def query(self, query, job_config=None):
+        if "__TABLES__" in query:
+            rows = [{"table_id": name, "last_modified_time": modified} for name, (modified, _) in self.tables.items()]
+        else:
+            names = job_config.query_parameters[0].values if job_config else list(self.tables)
+            self.introspected.append(sorted(names))
+            rows = [
+                {"table_name": name, "column_name": column, "data_type": data_type, "description": None}
+                for name in names
+                for column, data_type in self.tables[name][1]
+            ]
+        return SimpleNamespace(result=lambda: rows)
+
+    def list_rows(self, table, max_results=None):
+        return []
+
+
+def _client():
+    return FakeClient({
+        "orders": (100, [("id", "INT64"), ("customer_id", "INT64")]),
+        "customers": (200, [("id", "INT64"), ("name", "STRING")]),
+    })
+
+
+def test_refresh_reintrospects_only_modified_tables():
+    """
+    Test that a refresh introspects new and modified tables and keeps the rest from the cache.
+    """
+    client = _client()
+    first = schema_cache.refresh_snapshot(client, "proj", "shop")
+    client.tables["orders"] = (150, [("id", "INT64"), ("customer_id", "INT64"), ("total", "FLOAT64")])
+    second = schema_cache.refresh_snapshot(client, "proj", "shop", cached=first)
+
+    assert client.introspected == [["customers", "orders"], ["orders"]]
+    assert "`total` FLOAT" in second.tables["orders"]["ddl"]
+    assert second.tables["customers"] == first.tables["customers"]
+    assert second.version != first.version
+
+
+def test_snapshot_is_persisted_and_trusted(tmp_path):
+    """
+    Test that the snapshot is written to the cache and reused without any query within the trust window.
+    """
+    cache_uri = str(tmp_path)
+    snapshot = schema_cache.get_schema_snapshot(_client(), "proj", "shop", cache_uri=cache_uri)
+
+    class NoQueries:
+        def query(self, *args, **kwargs):
+            raise AssertionError("The trusted cache should not be re-checked.")
+
+    cached = schema_cache.get_schema_snapshot(NoQueries(), "proj", "shop", cache_uri=cache_uri, trust_seconds=60)
+    assert cached.ddl == snapshot.ddl
+    assert cached.version == snapshot.version
+    assert list(cached.table_ddls) == ["customers", "orders"]
+
+
+def test_stale_cache_is_checked_with_one_metadata_query(tmp_path):
+    """
+    Test that an expired but unchanged cache costs only the __TABLES__ query.
+    """
+    cache_uri = str(tmp_path)
+    client = _client()
+    schema_cache.get_schema_snapshot(client, "proj", "shop", cache_uri=cache_uri)
+    schema_cache.get_schema_snapshot(client, "proj", "shop", cache_uri=cache_uri, trust_seconds=0)
+
+    assert client.introspected == [["customers", "orders"]]
+
+
+def test_unreadable_cache_is_ignored(tmp_path):
+    """
+    Test that a corrupt cache file is treated as missing.
+    """
+    (tmp_path / "proj.shop.json").write_text("{not json")
+    assert schema_cache.load_snapshot(str(tmp_path), "proj", "shop") is None
@@ -0,0 +1,123 @@
+#  Copyright (C) 2025 Google LLC
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+# Unit testing for the BigQuery schema introspection
+
+from types import SimpleNamespace
+
+from agents_gallery.data_science.sub_agents.bigquery import schema_introspection
+from agents_gallery.data_science.sub_agents.bigquery.schema_introspection import (
+    build_table_ddls,
+    fetch_dataset_columns,
+    legacy_field_type,
+)
+
+
+class FakeRow(dict):
+    def values(self):
+        return tuple(super().values())
+
+
+class FakeClient:
+    """Answers the INFORMATION_SCHEMA query and list_rows from canned data."""
+
+    def __init__(self, column_rows, sample_rows=None, failing_tables=()):
+        self.column_rows = column_rows
+        self.sample_rows = sample_rows or {}
+        self.failing_tables = set(failing_tables)
+        self.queries = []
+
+    def query(self, query, job_config=None):
+        self.queries.append((query, job_config))
+        return SimpleNamespace(result=lambda: list(self.column_rows))
+
+    def list_rows(self, table, max_results=None):
+        if table.table_id in self.failing_tables:
+            raise RuntimeError("permission denied")
+        return [FakeRow(row) for row in self.sample_rows.get(table.table_id, [])][:max_results]
+
+
+COLUMN_ROWS = [
+    {"table_name": "orders", "column_name": "id", "data_type": "INT64", "description": None},
+    {"table_name": "orders", "column_name": "tags", "data_type": "ARRAY<STRING>", "description": "Labels"},
+    {"table_name": "customers", "column_name": "name", "data_type": "STRING(100)", "description": None},
+]
+
+
+def test_legacy_field_type_maps_googlesql_names():
+    """
+    Test that GoogleSQL type names map to the legacy names used in the DDL.
+    """
+    assert legacy_field_type("INT64") == ("INTEGER", False)
+    assert legacy_field_type("ARRAY<FLOAT64>") == ("FLOAT", True)
+    assert legacy_field_type("STRUCT<a INT64>") == ("RECORD", False)
+    assert legacy_field_type("STRING(10)") == ("STRING", False)
+
+
+def test_fetch_dataset_columns_groups_columns_by_table():
+    """
+    Test that one query's rows are grouped per table, in order, with legacy types.
+    """
+    client = FakeClient(COLUMN_ROWS)
+    tables = fetch_dataset_columns(client, "proj", "shop")
+
+    assert list(tables) == ["orders", "customers"]
+    assert tables["orders"][1] == {"name": "tags", "field_type": "STRING", "repeated": True, "description": "Labels"}
+    assert len(client.queries) == 1
+    query, job_config = client.queries[0]
+    assert "`proj.shop`.INFORMATION_SCHEMA.COLUMNS" in query
+    assert job_config is None
+
+
+def test_fetch_dataset_columns_filters_tables_with_a_parameter():
+    """
+    Test that a table filter is passed as a query parameter, not spliced into the SQL.
+    """
+    client = FakeClient([])
+    fetch_dataset_columns(client, "proj", "shop", table_names=["orders"])
+
+    query, job_config = client.queries[0]
+    assert "UNNEST(@table_names)" in query
+    assert job_config.query_parameters[0].values == ["orders"]
+
+
+def test_build_table_ddls_includes_examples_and_survives_unreadable_tables():
+    """
+    Test that each table gets its DDL with example rows, and a table whose rows can't be read still gets its CREATE statement.
+    """
+    client = FakeClient(
+        COLUMN_ROWS,
+        sample_rows={"orders": [{"id": 1, "tags": ["a"]}, {"id": 2, "tags": []}]},
+        failing_tables={"customers"},
+    )
+    tables = fetch_dataset_columns(client, "proj", "shop")
+    ddls = build_table_ddls(client, "proj", "shop", tables)
+
+    assert sorted(ddls) == ["customers", "orders"]
+    assert ddls["orders"].startswith("CREATE OR REPLACE TABLE `proj.shop.orders` (\n  `id` INTEGER,\n  `tags` STRING ARRAY COMMENT 'Labels'\n);")
+    assert "INSERT INTO `proj.shop.orders` VALUES\n(1,['a']);" in ddls["orders"]
+    assert ddls["customers"] == "CREATE OR REPLACE TABLE `proj.shop.customers` (\n  `name` STRING\n);\n\n"
+
+
+def test_sample_rows_are_read_with_the_known_schema():
+    """
+    Test that list_rows gets the table schema up front for scalar columns, so it skips get_table.
+    """
+    columns = fetch_dataset_columns(FakeClient(COLUMN_ROWS), "proj", "shop")["orders"]
+    table_ref = schema_introspection.bigquery.DatasetReference("proj", "shop").table("orders")
+    table = schema_introspection._table_for_list_rows(table_ref, columns)
+
+    assert [(field.name, field.field_type, field.mode) for field in table.schema] == [
+        ("id", "INTEGER", "NULLABLE"), ("tags", "STRING", "REPEATED"),
+    ]
@@ -0,0 +1,96 @@
+#  Copyright (C) 2025 Google LLC
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+# Unit testing for the question-aware schema retriever
+
+from agents_gallery.data_science.sub_agents.bigquery.schema_retriever import (
+    SchemaRetriever,
+    tokenize,
+)
+
+
+def _table(name, *columns):
+    ddl = f"CREATE OR REPLACE TABLE `shop.{name}` (\n" + ",\n".join(f"  `{c}` STRING" for c in columns) + "\n);\n\n"
+    return {"ddl": ddl, "columns": [{"name": c, "description": None} for c in columns]}
+
+
+TABLES = {
+    "customers": _table("customers", "id", "name", "country"),
+    "orders": _table("orders", "id", "customer_id", "total"),
+    "payments": _table("payments", "id", "customer_id", "method"),
+    "products": _table("products", "id", "title", "price"),
+    "suppliers": _table("suppliers", "id", "company"),
+    "warehouses": _table("warehouses", "id", "city"),
+}
+
+
+def test_tokenize_splits_identifiers_and_folds_plurals():
+    """
+    Test that identifiers are split into terms, plurals folded and stop words dropped.
+    """
+    assert tokenize("How many Orders per customerId?") == ["order", "customer", "id"]
+
+
+def test_select_tables_prunes_to_the_most_relevant_tables():
+    """
+    Test that only the top tables for the question are selected.
+    """
+    retriever = SchemaRetriever(TABLES)
+    assert retriever.select_tables("price of each product", top_k=2) == ["products"]
+    assert retriever.select_tables("total of orders by country", top_k=2) == ["customers", "orders"]
+
+
+def test_bare_id_is_not_a_join_key():
+    """
+    Test that tables sharing only a bare `id` column get no join hint.
+    """
+    retriever = SchemaRetriever(TABLES)
+    assert retriever.join_keys(["customers", "products"]) == {}
+    assert retriever.references(["customers", "products"]) == []
+    schema = retriever.build_schema("customer names and product titles", top_k=2)
+    assert "joined" not in schema
+
+
+def test_table_id_columns_reference_the_table_id():
+    """
+    Test that `<table>_id` columns are hinted as joins to that table's `id`, and shared key names as shared joins.
+    """
+    retriever = SchemaRetriever(TABLES)
+    assert retriever.references(["customers", "orders", "payments"]) == [
+        ("orders", "customer_id", "customers", "id"),
+        ("payments", "customer_id", "customers", "id"),
+    ]
+    assert retriever.join_keys(["customers", "orders", "payments"]) == {"customer_id": ["orders", "payments"]}
+
+    schema = retriever.build_schema("order totals by customer country", top_k=2)
+    assert "-- Tables `orders` and `customers` can be joined on `orders`.`customer_id` = `customers`.`id`.\n" in schema
+    assert "on `id`" not in schema
+
+
+def test_join_boost_pulls_in_referenced_tables():
+    """
+    Test that a table referenced by a matching table is boosted above unrelated ones.
+    """
+    retriever = SchemaRetriever(TABLES)
+    assert retriever.select_tables("payment method", top_k=2) == ["customers", "payments"]
+
+
+def test_small_datasets_and_unmatched_questions_get_the_full_schema():
+    """
+    Test that pruning is skipped when the dataset fits or nothing matches.
+    """
+    retriever = SchemaRetriever(TABLES)
+    assert retriever.select_tables("payment method", top_k=10) == sorted(TABLES)
+    assert retriever.select_tables("zzz", top_k=2) == sorted(TABLES)
+    assert retriever.build_schema("zzz", top_k=2) == "".join(TABLES[name]["ddl"] for name in sorted(TABLES))
@@ -0,0 +1,110 @@
+#  Copyright (C) 2025 Google LLC
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+# Unit testing for the parsed DDL schema cache of the SQL translator
+
+import pytest
+
+from agents_gallery.data_science.sub_agents.bigquery.chase_sql.sql_postprocessor import (
+    sql_translator,
+)
+from agents_gallery.data_science.sub_agents.bigquery.chase_sql.sql_postprocessor.sql_translator import (
+    SqlTranslator,
+)
+
+DDL_SCHEMA = """CREATE OR REPLACE TABLE `proj.shop.orders` (
+  id INT64,
+  customer_id INT64,
+  amount FLOAT64
+);
+CREATE OR REPLACE TABLE `proj.shop.customers` (
+  id INT64,
+  name STRING
+);
+"""
+
+
+@pytest.fixture(autouse=True)
+def empty_schema_cache():
+    sql_translator._schema_cache.clear()
+    yield
+    sql_translator._schema_cache.clear()
+
+
+def count_parses(monkeypatch):
+    parses = []
+    extract = SqlTranslator.extract_schema_from_ddls.__func__
+
+    def counting_extract(cls, ddls):
+        parses.append(ddls)
+        return extract(cls, ddls)
+
+    monkeypatch.setattr(SqlTranslator, "extract_schema_from_ddls", classmethod(counting_extract))
+    return parses
+
+
+def test_ddl_is_parsed_into_a_nested_schema():
+    """
+    Test that the DDL becomes a project / dataset / table / column mapping.
+    """
+    schema_dict, mapping_schema = SqlTranslator._parse_ddl_schema(DDL_SCHEMA)
+
+    assert schema_dict["proj"]["shop"]["customers"] == {"id": "INT64", "name": "STRING"}
+    assert set(schema_dict["proj"]["shop"]["orders"]) == {"id", "customer_id", "amount"}
+    assert mapping_schema.column_names("proj.shop.customers") == ["id", "name"]
+
+
+def test_same_ddl_is_parsed_once(monkeypatch):
+    """
+    Test that repeated lookups of the same DDL text return the cached objects.
+    """
+    parses = count_parses(monkeypatch)
+
+    first = SqlTranslator._parse_ddl_schema(DDL_SCHEMA)
+    assert SqlTranslator._parse_ddl_schema(DDL_SCHEMA) is first
+    assert SqlTranslator.mapping_schema_for_sqlglot(DDL_SCHEMA) is first[1]
+    assert SqlTranslator.rewrite_schema_for_sqlglot(DDL_SCHEMA) is first[0]
+    assert len(parses) == 1
+
+
+def test_least_recently_used_schema_is_evicted(monkeypatch):
+    """
+    Test that the cache holds at most SCHEMA_CACHE_SIZE schemas and drops the least recently used.
+    """
+    monkeypatch.setattr(sql_translator, "SCHEMA_CACHE_SIZE", 2)
+    parses = count_parses(monkeypatch)
+    ddl_a = DDL_SCHEMA
+    ddl_b = DDL_SCHEMA.replace("name STRING", "email STRING")
+    ddl_c = DDL_SCHEMA.replace("amount FLOAT64", "total NUMERIC")
+
+    SqlTranslator._parse_ddl_schema(ddl_a)
+    SqlTranslator._parse_ddl_schema(ddl_b)
+    SqlTranslator._parse_ddl_schema(ddl_a)
+    SqlTranslator._parse_ddl_schema(ddl_c)
+    assert len(sql_translator._schema_cache) == 2
+
+    SqlTranslator._parse_ddl_schema(ddl_a)
+    assert len(parses) == 3
+    SqlTranslator._parse_ddl_schema(ddl_b)
+    assert len(parses) == 4
+
+
+def test_empty_schema_has_no_mapping():
+    """
+    Test that no schema gives no MappingSchema and nothing is cached.
+    """
+    assert SqlTranslator.mapping_schema_for_sqlglot(None) is None
+    assert SqlTranslator.mapping_schema_for_sqlglot("") is None
+    assert not sql_translator._schema_cache
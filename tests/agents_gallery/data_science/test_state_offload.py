@@ -0,0 +1,78 @@
+#  Copyright (C) 2025 Google LLC
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+# Unit testing for offloading large session state values
+
+import logging
+import os
+
+from agents_gallery.data_science.utils import state_offload
+
+LARGE = {"rows": ["x" * 100] * 10}
+
+
+def test_small_values_stay_in_state(tmp_path):
+    """
+    Test that values below the threshold are kept as they are.
+    """
+    value = {"rows": [1, 2, 3]}
+    assert state_offload.offload("k", value, threshold_bytes=1000, store_uri=str(tmp_path)) == value
+    assert not os.listdir(tmp_path)
+
+
+def test_large_values_are_offloaded_and_resolved(tmp_path):
+    """
+    Test that a large value is replaced by a reference that resolves to the original value.
+    """
+    reference = state_offload.offload("k", LARGE, threshold_bytes=100, store_uri=str(tmp_path))
+
+    assert state_offload.is_reference(reference)
+    assert reference[state_offload.REFERENCE_KEY].startswith(str(tmp_path))
+    assert len(reference["preview"]) == state_offload.PREVIEW_CHARS
+    assert state_offload.get_state({"k": reference}, "k") == LARGE
+
+
+def test_same_value_is_stored_once(tmp_path):
+    """
+    Test that offloading the same value twice gives the same reference and one object.
+    """
+    first = state_offload.offload("k", LARGE, threshold_bytes=100, store_uri=str(tmp_path))
+    second = state_offload.offload("k", LARGE, threshold_bytes=100, store_uri=str(tmp_path))
+
+    assert first == second
+    assert len(os.listdir(tmp_path / "k")) == 1
+
+
+def test_missing_object_reads_as_default(tmp_path, caplog):
+    """
+    Test that a reference to a deleted object returns the default and logs a warning.
+    """
+    reference = state_offload.offload("gone", LARGE, threshold_bytes=100, store_uri=str(tmp_path))
+    os.remove(reference[state_offload.REFERENCE_KEY])
+
+    with caplog.at_level(logging.WARNING):
+        assert state_offload.get_state({"gone": reference}, "gone", default="N/A") == "N/A"
+    assert "missing" in caplog.text
+
+
+def test_deployed_agent_keeps_values_in_state_without_gcs_store(tmp_path, monkeypatch):
+    """
+    Test that a deployed agent doesn't offload to a local directory, which other replicas can't read.
+    """
+    monkeypatch.setattr(state_offload, "DEPLOYED", True)
+
+    assert state_offload.offload("k", LARGE, threshold_bytes=100, store_uri=str(tmp_path)) == LARGE
+    assert state_offload.offload("k", LARGE, threshold_bytes=100, store_uri="") == LARGE
+    assert not os.listdir(tmp_path)
@@ -0,0 +1,137 @@
+#  Copyright (C) 2025 Google LLC
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+# Unit testing for the BigQuery agent tools
+
+from types import SimpleNamespace
+
+import pytest
+
+from agents_gallery.data_science.sub_agents.bigquery import query_cache, tools
+
+DDL_SCHEMA = (
+    "CREATE OR REPLACE TABLE `proj.shop.orders` (\n"
+    "  `id` INTEGER,\n"
+    "  `total` FLOAT\n"
+    ");\n\n"
+)
+
+
+class UnusedClient:
+    def query(self, *args, **kwargs):
+        raise AssertionError("BigQuery should not be called.")
+
+
+class FakeRows(list):
+    """The RowIterator of a query returning `total_rows` rows of (id, total)."""
+
+    schema = [SimpleNamespace(name="id", field_type="INTEGER", mode="NULLABLE"),
+              SimpleNamespace(name="total", field_type="FLOAT", mode="NULLABLE")]
+
+    def __init__(self, total_rows, max_results):
+        super().__init__(SimpleNamespace(values=lambda i=i: (i, 1.5)) for i in range(min(total_rows, max_results)))
+        self.total_rows = total_rows
+
+
+class FakeClient:
+    """Runs every query as if its unlimited result had `result_rows` rows."""
+
+    def __init__(self, result_rows, estimated_bytes=1000):
+        self.result_rows = result_rows
+        self.estimated_bytes = estimated_bytes
+        self.queries = []
+
+    def query(self, sql, job_config=None):
+        if job_config.dry_run:
+            return SimpleNamespace(total_bytes_processed=self.estimated_bytes, referenced_tables=[])
+        self.queries.append(sql)
+        if sql.startswith("SELECT COUNT(*)"):
+            return SimpleNamespace(result=lambda: [(self.result_rows,)])
+        limit = int(sql.rsplit("LIMIT", 1)[1]) if "\nLIMIT" in sql else self.result_rows
+        return SimpleNamespace(
+            result=lambda max_results=None, page_size=None: FakeRows(min(self.result_rows, limit), max_results),
+            total_bytes_processed=self.estimated_bytes, total_bytes_billed=self.estimated_bytes, cache_hit=False,
+        )
+
+
+@pytest.fixture
+def tool_context(monkeypatch):
+    monkeypatch.setattr(tools, "bq_client", UnusedClient())
+    query_cache.RESULT_CACHE.clear()
+    return SimpleNamespace(state={
+        "database_settings": {
+            "bq_project_id": "proj",
+            "bq_dataset_id": "shop",
+            "bq_ddl_schema": DDL_SCHEMA,
+            "bq_schema_version": "v1",
+        },
+    })
+
+
+@pytest.mark.parametrize("sql", ["SELECT 'abc", "SELECT `total FROM orders"])
+def test_validation_reports_untokenizable_sql(tool_context, sql):
+    """
+    Test that SQL sqlglot can't tokenize is reported as invalid instead of raising.
+    """
+    result = tools.run_bigquery_validation(sql, tool_context)
+    assert result["error_message"].startswith("Invalid SQL")
+    assert result["query_result"] is None
+
+
+@pytest.mark.parametrize("sql, expected", [
+    ("SELECT id FROM orders", "SELECT id FROM orders\nLIMIT 81"),
+    ("SELECT id FROM orders;\n", "SELECT id FROM orders\nLIMIT 81"),
+    ("SELECT id FROM orders -- newest first", "SELECT id FROM orders -- newest first\nLIMIT 81"),
+    ("SELECT id FROM orders LIMIT 5", "SELECT id FROM orders LIMIT 5"),
+    ("SELECT id FROM orders UNION ALL SELECT id FROM orders", "SELECT id FROM orders UNION ALL SELECT id FROM orders\nLIMIT 81"),
+    ("SELECT * FROM (SELECT id FROM orders LIMIT 5)", "SELECT * FROM (SELECT id FROM orders LIMIT 5)\nLIMIT 81"),
+    ("SELECT 1; SELECT 2", "SELECT 1; SELECT 2"),
+    ("SELECT 'abc", "SELECT 'abc"),
+])
+def test_with_row_limit_only_adds_a_missing_top_level_limit(sql, expected):
+    """
+    Test that LIMIT is appended only to single queries without a top-level LIMIT.
+    """
+    assert tools.with_row_limit(sql, 81) == expected
+
+
+def test_validation_limits_the_query_and_reports_small_results_exactly(tool_context, monkeypatch):
+    """
+    Test that the query runs with a LIMIT and a result below it reports its own row count.
+    """
+    client = FakeClient(result_rows=12)
+    monkeypatch.setattr(tools, "bq_client", client)
+
+    result = tools.run_bigquery_validation("SELECT id, total FROM orders", tool_context)
+    assert client.queries == [f"SELECT id, total FROM orders\nLIMIT {tools.MAX_NUM_ROWS + 1}"]
+    assert len(result["query_result"]) == 12
+    assert result["total_rows"] == 12
+
+
+def test_validation_counts_cut_off_results_when_cheap(tool_context, monkeypatch):
+    """
+    Test that a result cut off by the LIMIT is counted with COUNT(*) when the query is cheap, and left unknown otherwise.
+    """
+    client = FakeClient(result_rows=5000)
+    monkeypatch.setattr(tools, "bq_client", client)
+    result = tools.run_bigquery_validation("SELECT id, total FROM orders", tool_context)
+    assert len(result["query_result"]) == tools.MAX_NUM_ROWS
+    assert result["total_rows"] == 5000
+    assert client.queries[1] == "SELECT COUNT(*) FROM (\nSELECT id, total FROM orders\n)"
+
+    client = FakeClient(result_rows=5000, estimated_bytes=tools.ROW_COUNT_MAX_BYTES + 1)
+    monkeypatch.setattr(tools, "bq_client", client)
+    result = tools.run_bigquery_validation("SELECT id FROM orders", tool_context)
+    assert result["total_rows"] is None
+    assert len(client.queries) == 1
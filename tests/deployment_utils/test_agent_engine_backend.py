@@ -0,0 +1,97 @@
+#  Copyright (C) 2025 Google LLC
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+# Unit testing for the fake Agent Engine backend
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+from deployment_utils.agent_engine_backend import FakeAgentEngineBackend
+
+
+def _fast_backend(**kwargs) -> FakeAgentEngineBackend:
+    defaults = dict(build_seconds=0, delete_seconds=0, list_seconds=0, jitter=0, seed=7)
+    defaults.update(kwargs)
+    return FakeAgentEngineBackend(**defaults)
+
+
+def test_create_list_get_delete_round_trip():
+    """
+    Test that a created engine can be listed, fetched and deleted.
+    """
+    backend = _fast_backend()
+    backend.init("my-project", "us-central1")
+    engine = backend.create(
+        object(), requirements=["google-adk"], extra_packages=["./agents_gallery/basic_agent"],
+        display_name="Basic Agent", description="A very basic agent",
+    )
+    assert engine.resource_name.startswith("projects/my-project/locations/us-central1/reasoningEngines/")
+    assert engine._gca_resource.description == "A very basic agent"
+
+    listed = backend.list()
+    assert [e.resource_name for e in listed] == [engine.resource_name]
+    assert backend.get(engine.resource_name).display_name == "Basic Agent"
+
+    backend.get(engine.resource_name).delete(force=True)
+    assert backend.list() == []
+    with pytest.raises(google_exceptions.NotFound):
+        backend.get(engine.resource_name)
+
+
+def test_list_is_scoped_to_project_and_location():
+    """
+    Test that engines are only listed for the project/location they were created in.
+    """
+    backend = _fast_backend()
+    backend.init("my-project", "us-central1")
+    backend.create(object(), requirements=[], extra_packages=[], display_name="A", description="")
+    backend.init("my-project", "europe-west1")
+    assert backend.list() == []
+
+
+def test_init_rejects_unsupported_location():
+    """
+    Test that init raises NotFound like the real SDK for an unknown location.
+    """
+    with pytest.raises(google_exceptions.NotFound):
+        _fast_backend().init("my-project", "mars-north1")
+
+
+def test_failure_injection():
+    """
+    Test that create and delete raise ServiceUnavailable when failures are injected.
+    """
+    backend = _fast_backend()
+    backend.init("my-project", "us-central1")
+    engine = backend.create(object(), requirements=[], extra_packages=[], display_name="A", description="")
+    backend.failure_rate = 1.0
+    with pytest.raises(google_exceptions.ServiceUnavailable):
+        backend.create(object(), requirements=[], extra_packages=[], display_name="B", description="")
+    with pytest.raises(google_exceptions.ServiceUnavailable):
+        backend.delete(engine.resource_name)
+    assert len(backend.list()) == 1
+
+
+def test_sqlite_file_is_shared_between_instances(tmp_path):
+    """
+    Test that two backends pointed at the same SQLite file see the same engines.
+    """
+    db_path = str(tmp_path / "engines.db")
+    first = _fast_backend(db_path=db_path)
+    first.init("my-project", "us-central1")
+    engine = first.create(object(), requirements=[], extra_packages=[], display_name="A", description="")
+
+    second = _fast_backend(db_path=db_path)
+    second.init("my-project", "us-central1")
+    assert [e.resource_name for e in second.list()] == [engine.resource_name]
@@ -0,0 +1,56 @@
+#  Copyright (C) 2025 Google LLC
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+# Unit testing for the Web UI Agent Engine table rows
+
+import datetime
+from types import SimpleNamespace
+
+from deployment_utils.agent_table import AGENT_TABLE_COLUMNS, agent_engines_to_rows
+
+
+def _engine(engine_id, display_name, created, description=None):
+    return SimpleNamespace(
+        resource_name=f"projects/p/locations/us-central1/reasoningEngines/{engine_id}",
+        display_name=display_name,
+        create_time=created,
+        update_time=created,
+        _gca_resource=SimpleNamespace(description=description),
+    )
+
+
+def test_rows_are_flattened_and_sorted_newest_first():
+    """
+    Test that engines become flat rows with formatted fields, newest first and undated last.
+    """
+    older = datetime.datetime(2025, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc)
+    newer = datetime.datetime(2025, 6, 1, 0, 0, 0, tzinfo=datetime.timezone.utc)
+    rows = agent_engines_to_rows([
+        _engine("111", "Old", older, "First agent"),
+        _engine("333", "Undated", None),
+        _engine("222", "New", newer),
+    ])
+
+    assert [row["engine_id"] for row in rows] == ["222", "111", "333"]
+    assert rows[1] == {
+        "resource_name": "projects/p/locations/us-central1/reasoningEngines/111",
+        "engine_id": "111",
+        "display_name": "Old",
+        "description": "First agent",
+        "created": "2025-01-02 03:04:05 UTC",
+        "updated": "2025-01-02 03:04:05 UTC",
+    }
+    assert rows[0]["description"] == "No description."
+    assert rows[2]["created"] == "N/A"
+    assert {column["field"] for column in AGENT_TABLE_COLUMNS} <= set(rows[0])
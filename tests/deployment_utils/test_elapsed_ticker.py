@@ -0,0 +1,92 @@
+#  Copyright (C) 2025 Google LLC
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+# Unit testing for the shared elapsed-time ticker
+
+import asyncio
+import time
+
+from deployment_utils.elapsed_ticker import ElapsedTimeTicker, format_elapsed
+
+
+class _FakeClient:
+    def __init__(self, client_id):
+        self.id = client_id
+        self.disconnect_handlers = []
+
+    def on_disconnect(self, handler):
+        self.disconnect_handlers.append(handler)
+
+    def disconnect(self):
+        for handler in self.disconnect_handlers:
+            handler()
+
+
+class _FakeLabel:
+    def __init__(self, client=None):
+        self.client = client
+        self.texts = []
+
+    def set_text(self, text):
+        self.texts.append(text)
+
+
+def test_format_elapsed():
+    """
+    Test that durations are formatted as MM:SS without wrapping at one hour.
+    """
+    assert format_elapsed(0) == "00:00"
+    assert format_elapsed(65.9) == "01:05"
+    assert format_elapsed(3725) == "62:05"
+
+
+def test_tick_updates_all_timers_and_skips_unchanged_text():
+    """
+    Test that one tick updates every label, and only when its text changes.
+    """
+    async def scenario():
+        ticker = ElapsedTimeTicker(interval=60)
+        first, second = _FakeLabel(), _FakeLabel()
+        ticker.start(first, time.monotonic() - 5)
+        ticker.start(second, time.monotonic() - 125, prefix="T: ")
+        ticker.tick()
+        return ticker, first, second
+
+    ticker, first, second = asyncio.run(scenario())
+    assert first.texts == ["Elapsed Time: 00:05"]
+    assert second.texts == ["T: 02:05"]
+    assert ticker.active_count == 2
+
+
+def test_stop_and_client_disconnect_remove_timers():
+    """
+    Test that stopped timers and timers of disconnected clients are dropped.
+    """
+    async def scenario():
+        ticker = ElapsedTimeTicker(interval=0.01)
+        client = _FakeClient("client-1")
+        kept = ticker.start(_FakeLabel())
+        ticker.start(_FakeLabel(client))
+        ticker.start(_FakeLabel(client))
+        assert ticker.active_count == 3
+        client.disconnect()
+        assert ticker.active_count == 1
+        assert ticker.stop(kept) is not None
+        assert ticker.stop(kept) is None
+        await asyncio.sleep(0.05)  # The shared task exits once no timers remain.
+        return ticker
+
+    ticker = asyncio.run(scenario())
+    assert ticker.active_count == 0
+    assert ticker._task.done()
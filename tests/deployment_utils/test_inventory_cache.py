@@ -0,0 +1,98 @@
+#  Copyright (C) 2025 Google LLC
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+# Unit testing for the Web UI shared inventory store
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from deployment_utils.inventory_cache import AGENT_ENGINES, InventoryStore
+
+
+class _CountingLoader:
+    def __init__(self, delay: float = 0.0):
+        self.calls = 0
+        self.delay = delay
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        time.sleep(self.delay)
+        with self._lock:
+            self.calls += 1
+            return [f"engine-{self.calls}"]
+
+
+def test_concurrent_loads_are_deduplicated():
+    """
+    Test that concurrent requests for the same entry share a single loader call.
+    """
+    store = InventoryStore(ttl_seconds=60)
+    loader = _CountingLoader(delay=0.05)
+
+    async def scenario():
+        return await asyncio.gather(*(store.get(AGENT_ENGINES, ("p", "us-central1"), loader) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+    assert loader.calls == 1
+    assert all(result == ["engine-1"] for result in results)
+
+
+def test_ttl_force_and_invalidate():
+    """
+    Test that fresh entries are reused and that expiry, force and invalidate trigger a reload.
+    """
+    now = [0.0]
+    store = InventoryStore(ttl_seconds=10, clock=lambda: now[0])
+    loader = _CountingLoader()
+    key = ("p", "us-central1")
+
+    async def scenario():
+        assert await store.get(AGENT_ENGINES, key, loader) == ["engine-1"]
+        now[0] = 5
+        assert await store.get(AGENT_ENGINES, key, loader) == ["engine-1"]
+        assert store.peek(AGENT_ENGINES, key) == ["engine-1"]
+        now[0] = 11
+        assert store.peek(AGENT_ENGINES, key) is None
+        assert await store.get(AGENT_ENGINES, key, loader) == ["engine-2"]
+        assert await store.get(AGENT_ENGINES, key, loader, force=True) == ["engine-3"]
+        store.invalidate(AGENT_ENGINES, key)
+        assert store.peek(AGENT_ENGINES, key) is None
+
+    asyncio.run(scenario())
+    assert loader.calls == 3
+
+
+def test_loader_errors_are_not_cached():
+    """
+    Test that a failed load propagates and the next request retries.
+    """
+    store = InventoryStore(ttl_seconds=60)
+    attempts = []
+
+    def flaky_loader():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("list failed")
+        return ["engine"]
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await store.get(AGENT_ENGINES, "k", flaky_loader)
+        return await store.get(AGENT_ENGINES, "k", flaky_loader)
+
+    assert asyncio.run(scenario()) == ["engine"]
+    assert len(attempts) == 2
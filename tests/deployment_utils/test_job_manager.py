@@ -0,0 +1,215 @@
+#  Copyright (C) 2025 Google LLC
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+# Unit testing for the Web UI background job manager
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from deployment_utils.job_manager import JobManager, JobState
+
+
+def _echo_runner(ctx, message):
+    ctx.phase("Echo")
+    ctx.log(message)
+    return message.upper()
+
+
+def _failing_runner(ctx):
+    ctx.phase("Explode")
+    raise RuntimeError("boom")
+
+
+def test_job_success_records_phases_logs_and_result(tmp_path):
+    """
+    Test that a successful job ends SUCCEEDED with its phases, logs and result.
+    """
+    async def scenario():
+        manager = JobManager(db_path=str(tmp_path / "jobs.db"), workers=1)
+        manager.register_runner("echo", _echo_runner)
+        job = manager.submit("echo", "Echo job", {"message": "hello"})
+        return await manager.wait(job.job_id)
+
+    job = asyncio.run(scenario())
+    assert job.state == JobState.SUCCEEDED
+    assert job.result == "HELLO"
+    assert [p["name"] for p in job.phases] == ["Echo"]
+    assert job.phases[0]["finished_at"] is not None
+    assert job.logs[-1].endswith("hello")
+
+
+def test_job_failure_records_error(tmp_path):
+    """
+    Test that an exception in the runner marks the job FAILED with the error text.
+    """
+    async def scenario():
+        manager = JobManager(db_path=str(tmp_path / "jobs.db"), workers=1)
+        manager.register_runner("fail", _failing_runner)
+        job = manager.submit("fail", "Failing job", {})
+        return await manager.wait(job.job_id)
+
+    job = asyncio.run(scenario())
+    assert job.state == JobState.FAILED
+    assert job.error.startswith("boom")
+
+
+def test_worker_count_bounds_concurrency(tmp_path):
+    """
+    Test that no more jobs run at once than the configured worker count.
+    """
+    running, peak, lock = [0], [0], threading.Lock()
+
+    def slow_runner(ctx):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+
+    async def scenario():
+        manager = JobManager(db_path=str(tmp_path / "jobs.db"), workers=2)
+        manager.register_runner("slow", slow_runner)
+        jobs = [manager.submit("slow", f"Job {i}", {}) for i in range(6)]
+        return await asyncio.gather(*(manager.wait(job.job_id) for job in jobs))
+
+    jobs = asyncio.run(scenario())
+    assert all(job.state == JobState.SUCCEEDED for job in jobs)
+    assert peak[0] == 2
+
+
+def test_jobs_persist_and_unfinished_jobs_are_marked_interrupted(tmp_path):
+    """
+    Test that jobs survive a restart and jobs left running are marked FAILED.
+    """
+    db_path = str(tmp_path / "jobs.db")
+
+    async def scenario():
+        manager = JobManager(db_path=db_path, workers=1)
+        manager.register_runner("echo", _echo_runner)
+        done = manager.submit("echo", "Done", {"message": "x"})
+        await manager.wait(done.job_id)
+        # Returning right away stops the loop while this job is still queued.
+        pending = manager.submit("echo", "Pending", {"message": "y"})
+        return done.job_id, pending.job_id
+
+    done_id, pending_id = asyncio.run(scenario())
+    restarted = JobManager(db_path=db_path, workers=1)
+    assert restarted.get(done_id).state == JobState.SUCCEEDED
+    assert restarted.get(pending_id).state == JobState.FAILED
+    assert "restart" in restarted.get(pending_id).error
+    assert [job.title for job in restarted.list_jobs()] == ["Pending", "Done"]
+
+
+def test_process_pool_runner_forwards_progress(tmp_path):
+    """
+    Test that a runner registered with use_process runs in another process and its progress reaches the job.
+    """
+    async def scenario():
+        manager = JobManager(db_path=str(tmp_path / "jobs.db"), workers=1)
+        manager.register_runner("echo", _echo_runner, use_process=True)
+        try:
+            job = manager.submit("echo", "Echo job", {"message": "from a process"})
+            return await manager.wait(job.job_id)
+        finally:
+            manager.shutdown()
+
+    job = asyncio.run(scenario())
+    assert job.state == JobState.SUCCEEDED
+    assert job.result == "FROM A PROCESS"
+    assert [p["name"] for p in job.phases] == ["Echo"]
+    assert job.logs[-1].endswith("from a process")
+
+
+def test_process_pool_runner_failure_records_error(tmp_path):
+    """
+    Test that an exception raised in a pool process marks the job FAILED.
+    """
+    async def scenario():
+        manager = JobManager(db_path=str(tmp_path / "jobs.db"), workers=1)
+        manager.register_runner("fail", _failing_runner, use_process=True)
+        try:
+            job = manager.submit("fail", "Failing job", {})
+            return await manager.wait(job.job_id)
+        finally:
+            manager.shutdown()
+
+    job = asyncio.run(scenario())
+    assert job.state == JobState.FAILED
+    assert job.error.startswith("boom")
+    assert [p["name"] for p in job.phases] == ["Explode"]
+
+
+def test_log_lines_are_batched_into_one_write(tmp_path):
+    """
+    Test that log lines are written to SQLite in one batch, not once per line.
+    """
+    def chatty_runner(ctx):
+        for i in range(50):
+            ctx.log(f"line {i}")
+
+    async def scenario():
+        manager = JobManager(db_path=str(tmp_path / "jobs.db"), workers=1)
+        manager.register_runner("chatty", chatty_runner)
+        writes = []
+        persist = manager._persist
+        manager._persist = lambda job: (writes.append(len(job.logs)), persist(job))
+        job = manager.submit("chatty", "Chatty job", {})
+        await manager.wait(job.job_id)
+        return writes
+
+    writes = asyncio.run(scenario())
+    # Submitted, started and finished; the 50 log lines ride along with the last write.
+    assert writes == [0, 0, 50]
+
+
+def test_only_newest_finished_jobs_are_kept(tmp_path):
+    """
+    Test that finished jobs beyond max_finished_jobs are removed from memory and SQLite.
+    """
+    db_path = str(tmp_path / "jobs.db")
+
+    async def scenario():
+        manager = JobManager(db_path=db_path, workers=1, max_finished_jobs=2)
+        manager.register_runner("echo", _echo_runner)
+        for i in range(4):
+            job = manager.submit("echo", f"Job {i}", {"message": str(i)})
+            await manager.wait(job.job_id)
+        return [job.title for job in manager.list_jobs()]
+
+    assert asyncio.run(scenario()) == ["Job 3", "Job 2"]
+    restarted = JobManager(db_path=db_path, workers=1, max_finished_jobs=2)
+    assert [job.title for job in restarted.list_jobs()] == ["Job 3", "Job 2"]
+
+
+def test_wait_returns_jobs_pruned_meanwhile_and_rejects_unknown_ones(tmp_path):
+    """
+    Test that wait returns a job pruned after it finished, and raises KeyError for unknown jobs.
+    """
+    async def scenario():
+        manager = JobManager(db_path=str(tmp_path / "jobs.db"), workers=2, max_finished_jobs=1)
+        manager.register_runner("echo", _echo_runner)
+        first = manager.submit("echo", "First", {"message": "a"})
+        second = manager.submit("echo", "Second", {"message": "b"})
+        jobs = await asyncio.gather(manager.wait(first.job_id), manager.wait(second.job_id))
+        pruned = [job for job in jobs if manager.get(job.job_id) is None]
+        assert len(pruned) == 1
+        with pytest.raises(KeyError, match="not found"):
+            await manager.wait(pruned[0].job_id)
+        return jobs
+
+    assert [job.result for job in asyncio.run(scenario())] == ["A", "B"]
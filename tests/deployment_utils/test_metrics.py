@@ -0,0 +1,92 @@
+#  Copyright (C) 2025 Google LLC
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+# Unit testing for the Web UI Prometheus metrics
+
+import pytest
+
+from deployment_utils.metrics import (
+    CONTROL_PLANE_CALLS,
+    CONTROL_PLANE_LATENCY,
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+    record_call,
+    track_call,
+)
+
+
+def test_registry_renders_prometheus_text():
+    """
+    Test that counters, gauges and histograms render in the Prometheus text format.
+    """
+    registry = MetricsRegistry()
+    calls = registry.register(Counter("demo_calls_total", "Demo calls.", ["outcome"]))
+    clients = registry.register(Gauge("demo_clients", "Demo clients."))
+    latency = registry.register(Histogram("demo_seconds", "Demo latency.", buckets=(0.1, 1.0)))
+
+    calls.inc(outcome="ok")
+    calls.inc(2, outcome="error")
+    clients.set_function(lambda: 3)
+    latency.observe(0.05)
+    latency.observe(0.5)
+
+    assert registry.render() == "\n".join([
+        "# HELP demo_calls_total Demo calls.",
+        "# TYPE demo_calls_total counter",
+        'demo_calls_total{outcome="error"} 2',
+        'demo_calls_total{outcome="ok"} 1',
+        "# HELP demo_clients Demo clients.",
+        "# TYPE demo_clients gauge",
+        "demo_clients 3",
+        "# HELP demo_seconds Demo latency.",
+        "# TYPE demo_seconds histogram",
+        'demo_seconds_bucket{le="0.1"} 1',
+        'demo_seconds_bucket{le="1"} 2',
+        'demo_seconds_bucket{le="+Inf"} 2',
+        "demo_seconds_sum 0.55",
+        "demo_seconds_count 2",
+    ]) + "\n"
+    with pytest.raises(ValueError):
+        calls.inc(outcome="ok", extra="label")
+
+
+def test_track_call_counts_outcomes_and_latency():
+    """
+    Test that track_call records latency and counts failing blocks as errors.
+    """
+    labels = {"service": "test", "operation": "track_call"}
+    with track_call(**labels):
+        pass
+    with pytest.raises(RuntimeError):
+        with track_call(**labels):
+            raise RuntimeError("boom")
+
+    assert CONTROL_PLANE_CALLS.value(outcome="ok", **labels) == 1
+    assert CONTROL_PLANE_CALLS.value(outcome="error", **labels) == 1
+    assert CONTROL_PLANE_LATENCY.count(**labels) == 2
+
+
+def test_record_call_counts_outcomes_and_latency():
+    """
+    Test that record_call records a call timed elsewhere like track_call would.
+    """
+    labels = {"service": "test", "operation": "record_call"}
+    record_call(seconds=120.0, ok=True, **labels)
+    record_call(seconds=30.0, ok=False, **labels)
+
+    assert CONTROL_PLANE_CALLS.value(outcome="ok", **labels) == 1
+    assert CONTROL_PLANE_CALLS.value(outcome="error", **labels) == 1
+    assert CONTROL_PLANE_LATENCY.count(**labels) == 2
@@ -13,20 +13,21 @@
 
 # --- Standard Library Imports ---
 import asyncio
+import html
 import importlib
 import json
 import os
 import re
 import sys
+import threading
 import time
 import traceback
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-import vertexai
 from dotenv import load_dotenv
+from fastapi.responses import Response
 from google.api_core import exceptions as google_exceptions
-from nicegui import Client, ui
-from vertexai import agent_engines
+from nicegui import Client, app, ui
 from vertexai.preview.reasoning_engines import AdkApp
 
 # --- Google Cloud & Auth Imports ---
@@ -42,6 +43,12 @@ except ImportError as e:
 
 # --- Configuration Loading ---
 try:
+    from deployment_utils.agent_engine_backend import get_backend
+    from deployment_utils.agent_table import (
+        AGENT_TABLE_COLUMNS,
+        ROWS_PER_PAGE,
+        agent_engines_to_rows,
+    )
     from deployment_utils.agentspace_lister import (
         get_agentspace_apps_from_projectid,  # Used for Register & Deregister
     )
@@ -52,6 +59,27 @@ try:
     from deployment_utils.deployment_configs import (
         AGENT_CONFIGS,  # Used for Deploy & Register
     )
+    from deployment_utils.elapsed_ticker import ELAPSED_TICKER, format_elapsed
+    from deployment_utils.inventory_cache import (
+        AGENT_ENGINES,
+        AGENTSPACE_APPS,
+        INVENTORY_STORE,
+    )
+    from deployment_utils.job_manager import (
+        Job,
+        JobContext,
+        JobState,
+        get_job_manager,
+    )
+    from deployment_utils.metrics import (
+        CONNECTED_CLIENTS,
+        CONTENT_TYPE,
+        DELETIONS,
+        REGISTRATIONS,
+        REGISTRY,
+        record_call,
+        track_call,
+    )
 except ImportError as e:
     print(
         "Error: Could not import from 'deployment_utils'. "
@@ -61,6 +89,7 @@ except ImportError as e:
     SUPPORTED_REGIONS = ["us-central1"]
     WEBUI_AGENTDEPLOYMENT_HELPTEXT = "Error: Help text constant not found." # Fallback
     get_agentspace_apps_from_projectid = None # Indicate function is missing
+    get_backend = None # Indicate Agent Engine backend is missing
     IMPORT_ERROR_MESSAGE = (
         "Failed to import 'AGENT_CONFIGS', 'SUPPORTED_REGIONS', 'WEBUI_AGENTDEPLOYMENT_HELPTEXT', or 'get_agentspace_apps_from_projectid' from 'deployment_utils'. "
         "Please ensure 'deployment_configs.py', 'constants.py', and 'agentspace_lister.py' exist in the 'deployment_utils' directory "
@@ -77,6 +106,12 @@ _BASE_REQUIREMENTS = [
     "requests",
     "google-cloud-resource-manager",
 ]
+# Deployment job phase that covers the Agent Engine create call
+DEPLOY_CREATE_PHASE = "Deploying ADK to Agent Engine (this may take 2-5 minutes)"
+# Seconds the GCP settings must stay unchanged before inventory is prefetched
+PREFETCH_DEBOUNCE_SECONDS = float(os.getenv("WEBUI_PREFETCH_DEBOUNCE", "1.0"))
+# vertexai.init is process-global; every init + control-plane call sequence holds this so others can't swap project mid-call
+_CONTROL_PLANE_LOCK = threading.Lock()
 
 # --- Helper Functions ---
 
@@ -89,10 +124,7 @@ def init_vertex_ai(project_id: str, location: str, staging_bucket: Optional[str]
     try:
         bucket_info = f"(Bucket: gs://{staging_bucket})" if staging_bucket else "(No bucket specified)"
         print(f"Initializing Vertex AI SDK for {project_id}/{location} {bucket_info}...")
-        init_kwargs = {"project": project_id, "location": location}
-        if staging_bucket:
-            init_kwargs["staging_bucket"] = f"gs://{staging_bucket}"
-        vertexai.init(**init_kwargs)
+        get_backend().init(project_id, location, staging_bucket)
         print("Vertex AI initialized successfully.")
         return True, None
     except google_exceptions.NotFound:
@@ -110,7 +142,8 @@ def get_project_number_sync(project_id: str) -> Optional[str]:
     try:
         client = resourcemanager_v3.ProjectsClient()
         request = resourcemanager_v3.GetProjectRequest(name=f"projects/{project_id}")
-        project = client.get_project(request=request)
+        with track_call("resourcemanager", "get_project"):
+            project = client.get_project(request=request)
         return project.name.split('/')[-1]
     except Exception as e:
         print(f"Error getting project number for '{project_id}': {e}")
@@ -122,7 +155,7 @@ async def get_project_number(project_id: str) -> Optional[str]:
     return await asyncio.to_thread(get_project_number_sync, project_id)
 
 
-async def get_agent_root_nicegui(agent_config: dict) -> Tuple[Optional[Any], Optional[str]]:
+def get_agent_root(agent_config: dict) -> Tuple[Optional[Any], Optional[str]]:
     """
     Dynamically imports the root_agent for deployment.
     """
@@ -161,213 +194,265 @@ async def get_agent_root_nicegui(agent_config: dict) -> Tuple[Optional[Any], Opt
     except Exception as e:
         return None, f"An unexpected error occurred during agent import: {e}"
 
-async def update_timer(start_time: float, timer_label: ui.label, stop_event: asyncio.Event, status_area: ui.element):
-    """Updates the timer label every second until stop_event is set."""
-    while not stop_event.is_set():
-        elapsed_seconds = time.monotonic() - start_time
-        minutes, seconds = divmod(int(elapsed_seconds), 60)
-        time_str = f"{minutes:02d}:{seconds:02d}"
-        try:
-            with status_area: # Use the specific status area passed
-                timer_label.set_text(f"Elapsed Time: {time_str}")
-        except Exception as e:
-            print(f"Error updating timer UI: {e}")
-            break
-        await asyncio.sleep(1)
-
-# --- Deployment Logic ---
-async def run_deployment_async(
-    project_id: str, location: str, bucket: str,
-    agent_name: str, agent_config: dict, display_name: str, description: str, # Accept edited name/desc
-    deploy_button: ui.button, status_area: ui.column,
-) -> None:
-    """Performs the agent deployment steps asynchronously."""
-    deploy_button.disable()
-    status_area.clear()
-
-    timer_label = None
-    stop_timer_event = asyncio.Event()
+def list_agent_engines_sync(project_id: str, location: str) -> List[Any]:
+    """Lists the Agent Engines in project_id/location. Raises RuntimeError if the SDK can't be initialized."""
+    with _CONTROL_PLANE_LOCK:
+        init_success, init_error_msg = init_vertex_ai(project_id, location) # No bucket needed
+        if not init_success:
+            raise RuntimeError(init_error_msg or "Vertex AI initialization failed.")
+        with track_call("vertex", "list_agent_engines"):
+            return get_backend().list()
+
+def delete_agent_engine_sync(project_id: str, location: str, resource_name: str) -> None:
+    """Deletes one Agent Engine in project_id/location. Raises RuntimeError if the SDK can't be initialized."""
+    with _CONTROL_PLANE_LOCK:
+        init_success, init_error_msg = init_vertex_ai(project_id, location)
+        if not init_success:
+            raise RuntimeError(init_error_msg or "Vertex AI initialization failed.")
+        with track_call("vertex", "delete_agent_engine"):
+            get_backend().delete(resource_name, force=True)
+
+def agentspace_inventory_key(project_id: str, locations: List[str]) -> Tuple[str, Tuple[str, ...]]:
+    return project_id, tuple(sorted(locations))
+
+async def load_agent_engines(project_id: str, location: str, force: bool = False) -> List[Any]:
+    """Returns Agent Engines from the shared inventory store, listing them if needed (or if force)."""
+    return await INVENTORY_STORE.get(
+        AGENT_ENGINES, (project_id, location),
+        lambda: list_agent_engines_sync(project_id, location), force=force,
+    )
 
-    with status_area:
-        ui.label(f"Starting deployment for: {agent_name}").classes("text-lg font-semibold")
-        progress_label = ui.label("Initializing Vertex AI SDK...")
-        spinner = ui.spinner(size="lg", color="primary")
-        timer_label = ui.label("Elapsed Time: 00:00").classes("text-sm text-gray-500 mt-1")
+async def load_agentspace_apps(project_id: str, locations: List[str], force: bool = False) -> List[Dict[str, Any]]:
+    """Returns Agentspace Apps from the shared inventory store, listing them if needed (or if force)."""
+    return await INVENTORY_STORE.get(
+        AGENTSPACE_APPS, agentspace_inventory_key(project_id, locations),
+        lambda: get_agentspace_apps_from_projectid(project_id, locations=list(locations)), force=force,
+    )
 
-    init_success, init_error_msg = await asyncio.to_thread(init_vertex_ai, project_id, location, bucket)
+# --- Deployment Logic ---
+def run_deployment_job(
+    ctx: JobContext, project_id: str, location: str, bucket: str,
+    agent_name: str, display_name: str, description: str,
+) -> str:
+    """Deploys an agent as a background job and returns the resource name.
+
+    Runs in a job pool process (see register_job_runners), so importing the agent,
+    pickling the AdkApp and packaging extra_packages stay off the server's GIL.
+    vertexai.init is process-global, so everything from init through create holds
+    _CONTROL_PLANE_LOCK: uncontended in a pool process, while deployments run in
+    server threads go one at a time instead of deploying to each other's project.
+    """
+    agent_config = AGENT_CONFIGS.get(agent_name)
+    if not agent_config:
+        raise ValueError(f"Unknown agent configuration '{agent_name}'.")
 
+    if not _CONTROL_PLANE_LOCK.acquire(blocking=False):
+        ctx.phase("Waiting for other Vertex AI operations to finish")
+        _CONTROL_PLANE_LOCK.acquire()
+    try:
+        return _deploy_locked(ctx, agent_config, project_id, location, bucket, display_name, description)
+    finally:
+        _CONTROL_PLANE_LOCK.release()
+
+def _deploy_locked(
+    ctx: JobContext, agent_config: dict, project_id: str, location: str, bucket: str,
+    display_name: str, description: str,
+) -> str:
+    """Body of run_deployment_job; the caller holds _CONTROL_PLANE_LOCK."""
+    ctx.phase("Initializing Vertex AI SDK")
+    init_success, init_error_msg = init_vertex_ai(project_id, location, bucket)
     if not init_success:
-        spinner.set_visibility(False)
-        with status_area: progress_label.set_text(f"Error: {init_error_msg}")
-        ui.notify(f"Vertex AI Initialization Failed: {init_error_msg}", type="negative", multi_line=True, close_button=True)
-        deploy_button.enable()
-        return
+        raise RuntimeError(f"Vertex AI Initialization Failed: {init_error_msg}")
+    ctx.log(f"Vertex AI initialized for {project_id}/{location} (gs://{bucket}).")
 
-    with status_area:
-        progress_label.set_text("Vertex AI Initialized. Importing agent code...")
-        ui.notify("Vertex AI Initialized Successfully.", type="positive")
-
-    root_agent, import_error_msg = await get_agent_root_nicegui(agent_config)
+    ctx.phase("Importing agent code")
+    root_agent, import_error_msg = get_agent_root(agent_config)
     if root_agent is None:
-        spinner.set_visibility(False)
-        with status_area: progress_label.set_text(f"Error: {import_error_msg}")
-        ui.notify(f"Agent Import Failed: {import_error_msg}", type="negative", multi_line=True, close_button=True)
-        deploy_button.enable()
-        return
-
-    with status_area: progress_label.set_text("Agent code imported. Preparing deployment...")
+        raise RuntimeError(f"Agent Import Failed: {import_error_msg}")
+    ctx.log(f"Imported '{agent_config.get('root_variable')}' from '{agent_config.get('module_path')}'.")
 
+    ctx.phase("Preparing deployment")
     adk_app = AdkApp(agent=root_agent, enable_tracing=True)
     agent_specific_reqs = agent_config.get("requirements", [])
     if not isinstance(agent_specific_reqs, list): agent_specific_reqs = []
     combined_requirements = sorted(list(set(_BASE_REQUIREMENTS) | set(agent_specific_reqs)))
     extra_packages = agent_config.get("extra_packages", [])
     if not isinstance(extra_packages, list): extra_packages = []
-    # display_name and description are now passed directly as arguments
-    # display_name = agent_config.get("ae_display_name", f"{agent_name.replace('_', ' ').title()} Agent") # No longer needed here
-    # description = agent_config.get("description", f"Agent: {agent_name}") # No longer needed here
-
-    with status_area: progress_label.set_text("Configuration ready. Deploying ADK to Agent Engine (this may take 2-5 minutes)...")
-    print("\n--- Deployment Details ---")
-    print(f"Display Name: {display_name}")
-    print(f"Description: {description}")
-    print("Requirements:"); [print(f"- {req}") for req in combined_requirements]
-    print(f"Extra Packages: {extra_packages}")
-    print("--------------------------")
-
-    start_time = time.monotonic()
-    # Create the timer task but indicate we don't need the task object itself
-    _ = asyncio.create_task(update_timer(start_time, timer_label, stop_timer_event, status_area))
-    remote_agent = None
-    deployment_error = None
-    try:
-        def sync_create_agent():
-            return agent_engines.create(
-                adk_app, requirements=combined_requirements, extra_packages=extra_packages,
-                display_name=display_name, description=description,
-            )
-        remote_agent = await asyncio.to_thread(sync_create_agent)
-    except Exception as e:
-        deployment_error = e
-        tb_str = traceback.format_exc()
-        print(f"--- Agent creation failed ---\n{tb_str}")
-    finally:
-        stop_timer_event.set()
-        await asyncio.sleep(0.1)
-        end_time = time.monotonic()
-        duration = end_time - start_time
-        duration_str = time.strftime("%M:%S", time.gmtime(duration))
-        spinner.set_visibility(False)
+    ctx.log(f"Display Name: {display_name}")
+    ctx.log(f"Description: {description}")
+    ctx.log(f"Requirements: {', '.join(combined_requirements)}")
+    ctx.log(f"Extra Packages: {extra_packages}")
+
+    ctx.phase(DEPLOY_CREATE_PHASE)
+    remote_agent = get_backend().create(
+        adk_app, requirements=combined_requirements, extra_packages=extra_packages,
+        display_name=display_name, description=description,
+    )
+    ctx.log(f"Successfully created remote agent: {remote_agent.resource_name}")
+    return remote_agent.resource_name
 
+
+def watch_deployment_job(job_id: str, status_area: ui.column, on_finished: Optional[Callable[[], None]] = None) -> None:
+    """Renders a deployment job's live progress into status_area until it finishes or the page goes away.
+
+    on_finished, if given, is called once the job has finished (not if the page went away first).
+    """
+    manager = get_job_manager()
+    job = manager.get(job_id)
+    status_area.clear()
+    with status_area:
+        ui.label(f"Deployment: {job.title}").classes("text-lg font-semibold")
+        progress_label = ui.label("Queued...")
+        spinner = ui.spinner(size="lg", color="primary")
+        timer_label = ui.label("Elapsed Time: 00:00").classes("text-sm text-gray-500 mt-1")
+        ui.link("View all jobs", "/jobs").classes("text-sm")
+    watch_state = {"timer_id": None}
+
+    def render(changed_job: Job) -> None:
+        if changed_job.job_id != job_id:
+            return
+        if status_area.is_deleted:  # Client went away; the job keeps running server-side.
+            unsubscribe()
+            if watch_state["timer_id"] is not None: ELAPSED_TICKER.stop(watch_state["timer_id"])
+            return
+        if changed_job.state == JobState.RUNNING:
+            progress_label.set_text(f"{changed_job.current_phase or 'Starting'}...")
+            if watch_state["timer_id"] is None:
+                # Job timestamps are wall-clock; the ticker works in monotonic time.
+                start_mono = time.monotonic() - (time.time() - changed_job.started_at)
+                watch_state["timer_id"] = ELAPSED_TICKER.start(timer_label, start_mono)
+            return
+        if not changed_job.is_finished:
+            return
+
+        unsubscribe()
+        if watch_state["timer_id"] is not None: ELAPSED_TICKER.stop(watch_state["timer_id"])
+        if on_finished: on_finished()
+        duration_str = format_elapsed(changed_job.duration or 0)
+        spinner.set_visibility(False)
+        timer_label.set_text(f"Final Elapsed Time: {duration_str}")
         with status_area:
-            timer_label.set_text(f"Final Elapsed Time: {duration_str}")
-
-        if remote_agent:
-            success_msg = f"Successfully created remote agent: {remote_agent.resource_name}"
-            with status_area:
-                 progress_label.set_text(f"Deployment Successful! (Duration: {duration_str})")
-                 ui.label("Resource Name:").classes("font-semibold mt-2")
-                 ui.markdown(f"`{remote_agent.resource_name}`").classes("text-sm")
-                 ui.notify(success_msg, type="positive", multi_line=True, close_button=True)
-            print(f"--- Agent creation complete ({duration_str}) ---")
-        else:
-            error_msg = f"Error during agent engine creation: {deployment_error}"
-            with status_area:
-                 progress_label.set_text(f"Deployment Failed! (Duration: {duration_str})")
-                 ui.label("Error Details:").classes("font-semibold mt-2 text-red-600")
-                 ui.html(f"<pre class='text-xs p-2 bg-gray-100 dark:bg-gray-800 rounded overflow-auto'>{traceback.format_exc()}</pre>")
-                 ui.notify(error_msg, type="negative", multi_line=True, close_button=True)
-        deploy_button.enable()
+            if changed_job.state == JobState.SUCCEEDED:
+                progress_label.set_text(f"Deployment Successful! (Duration: {duration_str})")
+                ui.label("Resource Name:").classes("font-semibold mt-2")
+                ui.markdown(f"`{changed_job.result}`").classes("text-sm")
+                ui.notify(f"Successfully created remote agent: {changed_job.result}", type="positive", multi_line=True, close_button=True)
+            else:
+                progress_label.set_text(f"Deployment Failed! (Duration: {duration_str})")
+                ui.label("Error Details:").classes("font-semibold mt-2 text-red-600")
+                ui.html(f"<pre class='text-xs p-2 bg-gray-100 dark:bg-gray-800 rounded overflow-auto'>{html.escape(changed_job.error or '')}</pre>")
+                error_summary = (changed_job.error or "Unknown error").splitlines()[0]
+                ui.notify(f"Error during agent engine creation: {error_summary}", type="negative", multi_line=True, close_button=True)
+
+    unsubscribe = manager.subscribe(render)
+    render(job)
+
+
+def start_deployment_job(
+    project_id: str, location: str, bucket: str,
+    agent_name: str, display_name: str, description: str, # Accept edited name/desc
+    status_area: ui.column, on_finished: Optional[Callable[[], None]] = None,
+) -> None:
+    """Queues a deployment on the server-side job manager and shows its progress in status_area."""
+    job = get_job_manager().submit(
+        "deploy", title=f"{display_name} ({agent_name}) -> {project_id}/{location}",
+        params={
+            "project_id": project_id, "location": location, "bucket": bucket,
+            "agent_name": agent_name, "display_name": display_name, "description": description,
+        },
+    )
+    ui.notify(f"Deployment job {job.job_id[:8]} queued.", type="info")
+    watch_deployment_job(job.job_id, status_area, on_finished)
+
+def register_job_runners() -> None:
+    """Registers the background job runners. Deployments run in the job process pool unless disabled."""
+    use_process = os.getenv("WEBUI_DEPLOY_PROCESS_POOL", "1") != "0"
+    if use_process and getattr(get_backend(), "db_path", None) == ":memory:":
+        # Pool processes would each get their own in-memory fake control plane.
+        print("Fake Agent Engine uses an in-memory DB; running deployments in threads. Set FAKE_AGENT_ENGINE_DB to use the process pool.")
+        use_process = False
+    get_job_manager().register_runner("deploy", run_deployment_job, use_process=use_process)
+
+    def invalidate_inventory_on_deploy(job: Job) -> None:
+        if job.kind == "deploy" and job.state == JobState.SUCCEEDED:
+            INVENTORY_STORE.invalidate(AGENT_ENGINES, (job.params["project_id"], job.params["location"]))
+    get_job_manager().subscribe(invalidate_inventory_on_deploy)
+
+    def record_create_call(job: Job) -> None:
+        # The create call may run in a pool process, whose metrics never reach /metrics; time it from its phase.
+        if job.kind != "deploy" or not job.is_finished or job.current_phase != DEPLOY_CREATE_PHASE:
+            return
+        phase = job.phases[-1]
+        record_call("vertex", "create_agent_engine", phase["finished_at"] - phase["started_at"], job.state == JobState.SUCCEEDED)
+    get_job_manager().subscribe(record_create_call)
 
 # --- Destruction Logic ---
+def create_agent_engine_table(selection: str) -> ui.table:
+    """Builds a paginated, virtual-scrolling Agent Engine table with a client-side filter box.
+
+    Sorting, filtering and paging all happen in the browser, and only the rows on
+    screen are rendered, so large projects don't flood the page with elements.
+    """
+    filter_input = ui.input(placeholder="Filter by name, ID or description").props("outlined dense clearable").classes("w-full")
+    table = ui.table(
+        columns=AGENT_TABLE_COLUMNS, rows=[], row_key="resource_name", selection=selection,
+        pagination={"rowsPerPage": ROWS_PER_PAGE, "sortBy": "created", "descending": True},
+    ).classes("w-full").props('flat bordered virtual-scroll no-data-label="No agent engines loaded."').style("max-height: 60vh")
+    table.bind_filter_from(filter_input, "value")
+    return table
+
 async def fetch_agents_for_destroy(
     project_id: str, location: str,
-    list_container: ui.column, delete_button: ui.button, fetch_button: ui.button,
-    page_state: dict # Pass page state for storing fetched agents and selections
+    count_label: ui.label, agent_table: ui.table, delete_button: ui.button, fetch_button: ui.button,
+    page_state: dict, # Pass page state for storing fetched agents and selections
+    force: bool = True, # False: use the shared inventory cache and stay quiet (prefetch/tab switch)
 ) -> None:
     """Fetches agent engines for the destroy tab."""
     if not project_id or not location:
-        ui.notify("Please enter both Project ID and Location.", type="warning")
+        if force: ui.notify("Please enter both Project ID and Location.", type="warning")
         return
 
     fetch_button.disable()
-    progress_notification = ui.notification(timeout=None, close_button=False)
-    list_container.clear()
-    # Removed destroy_agent_cards state
+    progress_notification = ui.notification("Fetching agent engines...", timeout=None, close_button=False, spinner=True) if force else None
     page_state["destroy_agents"] = [] # Reset fetched agents
     page_state["destroy_selected"] = {} # Reset selections
+    page_state["destroy_loaded_key"] = None
+    agent_table.selected.clear()
+    agent_table.rows = []
+    count_label.classes(remove="text-red-500")
     delete_button.disable()
 
-    init_success, init_error_msg = await asyncio.to_thread(init_vertex_ai, project_id, location) # No bucket needed
-
-    if not init_success:
-        progress_notification.dismiss()
-        if init_error_msg: ui.notify(init_error_msg, type="negative", multi_line=True, close_button=True)
-        fetch_button.enable()
-        return
-
     try:
-        ui.notify("Vertex AI initialized successfully.", type="positive")
-        progress_notification.message = "Fetching agent engines..."
-        progress_notification.spinner = True
-
-        agent_generator = await asyncio.to_thread(agent_engines.list)
-        existing_agents = list(agent_generator)
+        existing_agents = await load_agent_engines(project_id, location, force=force)
 
         print(f"Found {len(existing_agents)} agents for destruction list.")
-        progress_notification.spinner = False
-        progress_notification.message = f"Found {len(existing_agents)} agents."
-        list_container.clear()
-
-        if not existing_agents: # Handle case where no agents are found
-            page_state["destroy_agents"] = []
-            with list_container:
-                ui.label("0 Available Agent Engines").classes("text-lg font-semibold mb-2") # Show 0 count
-                ui.label(f"No agent engines found in {project_id}/{location}.")
-            ui.notify("No agent engines found.", type="info")
-        else:
-            with list_container:
-                page_state["destroy_agents"] = existing_agents # Store fetched agents
-                ui.label(f"{len(existing_agents)} Available Agent Engines:").classes("text-lg font-semibold mb-2") # Add count to label
-                for agent in existing_agents:
-                    resource_name = agent.resource_name
-                    create_time_str = agent.create_time.strftime('%Y-%m-%d %H:%M:%S %Z') if agent.create_time else "N/A"
-                    update_time_str = agent.update_time.strftime('%Y-%m-%d %H:%M:%S %Z') if agent.update_time else "N/A"
-                    description_str = "No description."
-                    if hasattr(agent, '_gca_resource') and hasattr(agent._gca_resource, 'description') and agent._gca_resource.description:
-                        description_str = agent._gca_resource.description
-
-                    # Create card without border classes
-                    card = ui.card().classes("w-full mb-2 p-3")
-
-                    with card: # Add content to the card
-                        with ui.row().classes("w-full items-center justify-between"):
-                            ui.label(f"{agent.display_name}").classes("text-lg font-medium")
-                        with ui.column().classes("gap-0 mt-1 text-sm text-gray-600 dark:text-gray-400"):
-                            ui.label(f"Resource: {resource_name}")
-                            ui.label(f"Description: {description_str}")
-                            with ui.row().classes("gap-4 items-center"): # Add items-center
-                                ui.label(f"Created: {create_time_str}")
-                                ui.label(f"Updated: {update_time_str}")
-                        # Add checkbox inside the card context
-                        checkbox = ui.checkbox("Select for Deletion")
-                        checkbox.bind_value(page_state["destroy_selected"], resource_name) # Bind to selection dict
-                        checkbox.classes("absolute top-2 right-2") # Position checkbox
-            delete_button.enable()
+        page_state["destroy_agents"] = existing_agents # Store fetched agents
+        page_state["destroy_loaded_key"] = (project_id, location)
+        agent_table.rows = agent_engines_to_rows(existing_agents)
+        count_label.set_text(f"{len(existing_agents)} Available Agent Engines in {project_id}/{location}")
+
+        if progress_notification:
+            progress_notification.spinner = False
+            progress_notification.message = f"Found {len(existing_agents)} agents."
+            if not existing_agents: # Handle case where no agents are found
+                ui.notify("No agent engines found.", type="info")
 
     except google_exceptions.PermissionDenied:
         msg = f"Permission denied. Ensure the account has 'Vertex AI User' role or necessary permissions in '{project_id}'."
-        progress_notification.dismiss(); list_container.clear()
-        with list_container: ui.label(msg).classes("text-red-500")
-        ui.notify(msg, type="negative", multi_line=True, close_button=True)
+        count_label.set_text(msg); count_label.classes(add="text-red-500")
+        if progress_notification:
+            progress_notification.dismiss()
+            ui.notify(msg, type="negative", multi_line=True, close_button=True)
     except Exception as e:
         msg = f"Failed to list agent engines: {e}"
-        progress_notification.dismiss(); list_container.clear()
-        with list_container: ui.label(msg).classes("text-red-500")
-        ui.notify(msg, type="negative", multi_line=True, close_button=True)
+        count_label.set_text(msg); count_label.classes(add="text-red-500")
+        if progress_notification:
+            progress_notification.dismiss()
+            ui.notify(msg, type="negative", multi_line=True, close_button=True)
     finally:
-        await asyncio.sleep(2)
-        progress_notification.dismiss()
+        if progress_notification:
+            await asyncio.sleep(2)
+            progress_notification.dismiss()
         fetch_button.enable()
 
 async def confirm_and_delete_agents(
@@ -406,7 +491,11 @@ async def run_actual_deletion(
     """Performs the actual deletion of agents."""
     dialog.close()
 
-    init_success, init_error_msg = await asyncio.to_thread(init_vertex_ai, project_id, location)
+    def check_init() -> Tuple[bool, Optional[str]]:
+        with _CONTROL_PLANE_LOCK:
+            return init_vertex_ai(project_id, location)
+
+    init_success, init_error_msg = await asyncio.to_thread(check_init)
     if not init_success:
         full_msg = f"Failed to re-initialize Vertex AI. Deletion aborted.\nDetails: {init_error_msg}" if init_error_msg else "Failed to re-initialize Vertex AI. Deletion aborted."
         ui.notify(full_msg, type="negative", multi_line=True, close_button=True)
@@ -420,18 +509,15 @@ async def run_actual_deletion(
     fail_count = 0
     failed_agents: List[str] = []
 
-    def delete_single_agent(resource_name_to_delete):
-        agent_to_delete = agent_engines.get(resource_name=resource_name_to_delete)
-        agent_to_delete.delete(force=True)
-
     for i, resource_name in enumerate(resource_names):
         try:
             progress_notification.message = f"Deleting {i+1}/{len(resource_names)}: {resource_name.split('/')[-1]}..."
             progress_notification.spinner = True
             print(f"Attempting to delete {resource_name}...")
-            await asyncio.to_thread(delete_single_agent, resource_name)
+            await asyncio.to_thread(delete_agent_engine_sync, project_id, location, resource_name)
             print(f"Successfully deleted {resource_name}")
             ui.notify(f"Successfully deleted {resource_name.split('/')[-1]}", type="positive")
+            DELETIONS.inc(outcome="success")
             success_count += 1
             if resource_name in page_state.get("destroy_selected", {}):
                  del page_state["destroy_selected"][resource_name] # Remove from selection
@@ -442,6 +528,7 @@ async def run_actual_deletion(
             error_msg = f"Failed to delete {resource_name.split('/')[-1]}: {e}"
             print(error_msg)
             ui.notify(error_msg, type="negative", multi_line=True, close_button=True)
+            DELETIONS.inc(outcome="failure")
             fail_count += 1
             failed_agents.append(resource_name)
         finally:
@@ -449,6 +536,13 @@ async def run_actual_deletion(
 
     progress_notification.dismiss()
     print("--- Deletion process finished ---")
+    INVENTORY_STORE.invalidate(AGENT_ENGINES, (project_id, location))
+    agent_table = page_state.get("destroy_table")
+    if agent_table is not None and success_count:
+        remaining = {a.resource_name for a in page_state.get("destroy_agents", [])}
+        agent_table.rows = [row for row in agent_table.rows if row["resource_name"] in remaining]
+        agent_table.selected[:] = [row for row in agent_table.selected if row["resource_name"] in remaining]
+        agent_table.update()
 
     # Show summary dialog
     summary_title = "Deletion Complete" if fail_count == 0 else "Deletion Finished with Errors"
@@ -462,64 +556,49 @@ async def run_actual_deletion(
         with ui.row().classes("mt-4 w-full justify-end"):
             ui.button("OK", on_click=summary_dialog.close)
     await summary_dialog
-    # Note: We removed the automatic refresh. User needs to click "Fetch Agents" again.
 
 # --- Registration Logic (Adapted from interactive_register.py) ---
 
 async def fetch_agent_engines_for_register(
-    project_id: str, location: str, select_element: ui.select, fetch_button: ui.button, page_state: dict, next_button: ui.button
+    project_id: str, location: str, agent_table: ui.table, fetch_button: ui.button, page_state: dict, next_button: ui.button,
+    force: bool = True, # False: use the shared inventory cache and stay quiet (prefetch/tab switch)
 ) -> None:
     """Fetches deployed Agent Engines for the registration tab."""
     if not project_id or not location:
-        ui.notify("Please enter Project ID and Location first.", type="warning")
+        if force: ui.notify("Please enter Project ID and Location first.", type="warning")
         return
 
     next_button.disable() # Disable next until fetch is complete and selection is made
 
     fetch_button.disable()
-    select_element.clear()
-    select_element.set_value(None)
+    agent_table.selected.clear()
+    agent_table.rows = []
     page_state["register_agent_engines"] = [] # Clear previous list
-    ui.notify("Fetching Agent Engines...", type="info", spinner=True)
-
-    init_success, init_error_msg = await asyncio.to_thread(init_vertex_ai, project_id, location)
-    if not init_success:
-        ui.notify(f"Vertex AI Init Failed: {init_error_msg}", type="negative", multi_line=True, close_button=True)
-        fetch_button.enable()
-        return
+    page_state["register_loaded_key"] = None
+    if force: ui.notify("Fetching Agent Engines...", type="info", spinner=True)
 
     try:
-        agent_generator = await asyncio.to_thread(agent_engines.list)
-        existing_agents = list(agent_generator)
+        existing_agents = await load_agent_engines(project_id, location, force=force)
         page_state["register_agent_engines"] = existing_agents # Store fetched agents
+        page_state["register_loaded_key"] = (project_id, location)
+        agent_table.rows = agent_engines_to_rows(existing_agents)
 
-        if not existing_agents:
+        if force and not existing_agents:
             ui.notify("No deployed Agent Engines found.", type="info")
-            select_element.set_options([])
-        else:
-            options = {}
-            for agent in existing_agents:
-                create_time_str = agent.create_time.strftime('%Y-%m-%d %H:%M') if agent.create_time else "N/A"
-                update_time_str = agent.update_time.strftime('%Y-%m-%d %H:%M') if agent.update_time else "N/A"
-                display_text = (f"{agent.display_name} ({agent.resource_name.split('/')[-1]}) | "
-                                f"Created: {create_time_str} | Updated: {update_time_str}")
-                options[agent.resource_name] = display_text
-            select_element.set_options(options)
+        elif force:
             ui.notify(f"Found {len(existing_agents)} Agent Engines.", type="positive")
-
-        select_element.set_visibility(True) # Show the select element after fetching
     except Exception as e:
-        ui.notify(f"Failed to list Agent Engines: {e}", type="negative", multi_line=True, close_button=True)
-        select_element.set_visibility(False) # Keep hidden on error
+        if force: ui.notify(f"Failed to list Agent Engines: {e}", type="negative", multi_line=True, close_button=True)
     finally:
         fetch_button.enable()
 
 async def fetch_agentspace_apps(
-    project_id: str, locations: List[str], select_element: ui.select, fetch_button: ui.button, page_state: dict, state_key: str, next_button: Optional[ui.button] = None
+    project_id: str, locations: List[str], select_element: ui.select, fetch_button: ui.button, page_state: dict, state_key: str, next_button: Optional[ui.button] = None,
+    force: bool = True, # False: use the shared inventory cache and stay quiet (prefetch/tab switch)
 ) -> None:
     """Fetches Agentspace Apps (Discovery Engine Engines) for selection. next_button is optional."""
     if not project_id or not locations:
-        ui.notify("Please provide Project ID and Agentspace Locations.", type="warning")
+        if force: ui.notify("Please provide Project ID and Agentspace Locations.", type="warning")
         return
 
     if next_button: next_button.disable() # Disable next if provided
@@ -534,18 +613,17 @@ async def fetch_agentspace_apps(
     select_element.clear()
     select_element.set_value(None)
     page_state[state_key] = [] # Clear previous list (e.g., 'register_agentspaces' or 'deregister_agentspaces')
+    page_state[f"{state_key}_loaded_key"] = None
     locations_display = ", ".join(locations)
-    ui.notify(f"Fetching Agentspace Apps in {locations_display}...", type="info", spinner=True)
+    if force: ui.notify(f"Fetching Agentspace Apps in {locations_display}...", type="info", spinner=True)
 
     try:
-        # Run the potentially blocking function in a thread
-        project_agentspaces = await asyncio.to_thread(
-            get_agentspace_apps_from_projectid, project_id, locations=locations # Pass the list directly
-        )
+        project_agentspaces = await load_agentspace_apps(project_id, locations, force=force)
         page_state[state_key] = project_agentspaces # Store fetched apps
+        page_state[f"{state_key}_loaded_key"] = agentspace_inventory_key(project_id, locations)
 
         if not project_agentspaces:
-            ui.notify("No Agentspace Apps found for the specified locations.", type="info")
+            if force: ui.notify("No Agentspace Apps found for the specified locations.", type="info")
             select_element.set_options([])
         else:
             # Use engine_id as the key, store the whole dict as value implicitly? No, need unique key for select
@@ -553,11 +631,11 @@ async def fetch_agentspace_apps(
             options = {f"{app['location']}/{app['engine_id']}": f"ID: {app['engine_id']} (Loc: {app['location']}, Tier: {app['tier']})"
                        for app in project_agentspaces}
             select_element.set_options(options)
-            ui.notify(f"Found {len(project_agentspaces)} Agentspace Apps.", type="positive")
+            if force: ui.notify(f"Found {len(project_agentspaces)} Agentspace Apps.", type="positive")
 
     except Exception as e:
         select_element.set_visibility(False) # Keep hidden on error
-        ui.notify(f"Error fetching Agentspace Apps: {e}", type="negative", multi_line=True, close_button=True)
+        if force: ui.notify(f"Error fetching Agentspace Apps: {e}", type="negative", multi_line=True, close_button=True)
         print(f"Agentspace fetch error details: {traceback.format_exc()}")
     finally:
         select_element.set_visibility(True) # Show select after fetch attempt (even if empty)
@@ -605,7 +683,8 @@ def register_agent_with_agentspace_sync(
 
         # --- Step 1: Get current assistant configuration ---
         print(f"Fetching current configuration for assistant: {default_assistant_name}...")
-        get_response = requests.get(assistant_api_endpoint, headers=common_headers)
+        with track_call("discoveryengine", "get_assistant"):
+            get_response = requests.get(assistant_api_endpoint, headers=common_headers)
         existing_agent_configs = []
         try:
             get_response.raise_for_status()
@@ -634,20 +713,24 @@ def register_agent_with_agentspace_sync(
         # Print the actual payload being sent (which now only contains agentConfigs)
         print(f"Payload (Combined): {json.dumps(patch_payload, indent=2)}")
 
-        response = requests.patch(patch_endpoint_with_mask, headers=common_headers, data=json.dumps(patch_payload))
-        response.raise_for_status()
+        with track_call("discoveryengine", "patch_assistant"):
+            response = requests.patch(patch_endpoint_with_mask, headers=common_headers, data=json.dumps(patch_payload))
+            response.raise_for_status()
 
         print("Successfully registered agent with Agentspace.")
+        REGISTRATIONS.inc(operation="register", outcome="success")
         return True, "Registration successful!"
 
     except requests.exceptions.RequestException as e:
         error_detail = f"Status: {e.response.status_code}, Body: {e.response.text}" if e.response else str(e)
         msg = f"Agentspace registration API call failed: {error_detail}"
         print(msg)
+        REGISTRATIONS.inc(operation="register", outcome="failure")
         return False, msg
     except Exception as e:
         msg = f"An unexpected error occurred during registration: {e}\n{traceback.format_exc()}"
         print(msg)
+        REGISTRATIONS.inc(operation="register", outcome="failure")
         return False, msg
 
 # --- Deregistration Logic (Adapted from interactive_deregister.py) ---
@@ -684,8 +767,9 @@ async def fetch_registered_agents_for_deregister(
             access_token = credentials.token
             if not access_token: raise ValueError("Failed to refresh ADC token.")
             headers = {"Authorization": f"Bearer {access_token}", "x-goog-user-project": project_id}
-            response = requests.get(assistant_api_endpoint, headers=headers)
-            response.raise_for_status()
+            with track_call("discoveryengine", "get_assistant"):
+                response = requests.get(assistant_api_endpoint, headers=headers)
+                response.raise_for_status()
             return response.json().get("agentConfigs", [])
 
         agent_configs = await asyncio.to_thread(get_config_sync)
@@ -763,19 +847,23 @@ def deregister_agents_sync(
 
         print(f"Sending PATCH request to: {patch_endpoint_with_mask}")
         print(f"Payload (Agent Configs): {json.dumps(payload['agentConfigs'], indent=2)}")
-        response = requests.patch(patch_endpoint_with_mask, headers=headers, data=json.dumps(payload))
-        response.raise_for_status()
+        with track_call("discoveryengine", "patch_assistant"):
+            response = requests.patch(patch_endpoint_with_mask, headers=headers, data=json.dumps(payload))
+            response.raise_for_status()
         print("Successfully updated Agentspace assistant configuration.")
+        REGISTRATIONS.inc(operation="deregister", outcome="success")
         return True, f"Successfully deregistered {len(agent_ids_to_remove)} agent(s)."
 
     except requests.exceptions.RequestException as e:
         error_detail = f"Status: {e.response.status_code}, Body: {e.response.text}" if e.response else str(e)
         msg = f"API Error during deregistration: {error_detail}"
         print(msg)
+        REGISTRATIONS.inc(operation="deregister", outcome="failure")
         return False, msg
     except Exception as e:
         msg = f"An unexpected error occurred during deregistration: {e}\n{traceback.format_exc()}"
         print(msg)
+        REGISTRATIONS.inc(operation="deregister", outcome="failure")
         return False, msg
 
 # --- Helper function for Deregister Tab ---
@@ -801,11 +889,16 @@ async def main_page(client: Client):
         # Destroy state
         "destroy_agents": [], # List of fetched AgentEngine objects
         "destroy_selected": {}, # Dict {resource_name: bool}
+        "destroy_table": None, # ui.table listing the fetched agents
+        "destroy_loaded_key": None, # (project, location) shown in the destroy table
         # Register state
         "register_agent_engines": [], # List of fetched AgentEngine objects
+        "register_loaded_key": None, # (project, location) shown in the register table
         "register_agentspaces": [], # List of fetched Agentspace App dicts
+        "register_agentspaces_loaded_key": None, # (project, locations) shown in the register select
         # Deregister state
         "deregister_agentspaces": [], # List of fetched Agentspace App dicts
+        "deregister_agentspaces_loaded_key": None, # (project, locations) shown in the deregister select
         "deregister_registered_agents": [], # List of agentConfig dicts from assistant
         "deregister_selection": {}, # Dict {agent_id: bool}
         "project_number": None, # Store project number for deregister
@@ -844,7 +937,8 @@ async def main_page(client: Client):
             ui.html("Created by Aaron Lind<br>avlind@google.com").classes("text-xs text-gray-500 dark:text-gray-400")
 
     with header:
-        ui.button(on_click=lambda: right_drawer.toggle(), icon='menu').props('flat color=white').classes('ml-auto')
+        ui.button("Jobs", icon="work_history", on_click=lambda: ui.navigate.to("/jobs")).props('flat color=white').classes('ml-auto')
+        ui.button(on_click=lambda: right_drawer.toggle(), icon='menu').props('flat color=white')
 
     # --- Main Content with Tabs ---
     with ui.tabs().classes('w-full') as tabs:
@@ -882,14 +976,16 @@ async def main_page(client: Client):
                         ui.label("Choose the deployed Agent Engine you want to register.")
                         # Button first
                         register_fetch_ae_button = ui.button("Fetch Agent Engines", icon="refresh")
-                        # Select element below, initially hidden
-                        register_ae_select = ui.select(options={}, label="Agent Engine").props("outlined dense").classes("w-full mt-2")
-                        register_ae_select.set_visibility(False)
+                        # Table below; rows are loaded on fetch
+                        register_ae_table = create_agent_engine_table(selection="single")
                         with ui.stepper_navigation():
                             register_next_button_step1 = ui.button("Next", on_click=stepper.next)
-                            register_next_button_step1.bind_enabled_from(register_ae_select, 'value') # Enable based on selection
+                            register_next_button_step1.disable() # Enabled when a row is selected
                         # Connect button click after elements are defined
-                        register_fetch_ae_button.on_click(lambda: fetch_agent_engines_for_register(project_input.value, location_select.value, register_ae_select, register_fetch_ae_button, page_state, register_next_button_step1))
+                        register_fetch_ae_button.on_click(lambda: fetch_agent_engines_for_register(project_input.value, location_select.value, register_ae_table, register_fetch_ae_button, page_state, register_next_button_step1))
+
+                        def selected_register_engine() -> Optional[str]:
+                            return register_ae_table.selected[0]["resource_name"] if register_ae_table.selected else None
 
                     with ui.step("Select Agentspace App"):
                         ui.label("Choose the Agentspace App where the agent should appear.")
@@ -913,7 +1009,7 @@ async def main_page(client: Client):
 
                         # Logic to populate defaults when selections change
                         async def update_register_defaults():
-                            selected_ae_resource = register_ae_select.value
+                            selected_ae_resource = selected_register_engine()
                             selected_ae = next((ae for ae in page_state.get("register_agent_engines", []) if ae.resource_name == selected_ae_resource), None)
                             if selected_ae:
                                 # Try finding matching config in AGENT_CONFIGS
@@ -927,7 +1023,10 @@ async def main_page(client: Client):
                                     register_description_input.value = f"Agent: {selected_ae.display_name}"
                                     register_icon_input.value = "n/a"
                         ui.timer(0.1, update_register_defaults, once=True) # Trigger once initially
-                        register_ae_select.on('update:model-value', update_register_defaults) # Trigger on change
+                        async def on_register_engine_select():
+                            register_next_button_step1.set_enabled(bool(register_ae_table.selected))
+                            await update_register_defaults()
+                        register_ae_table.on_select(on_register_engine_select) # Trigger on change
 
                         register_button = ui.button("Register Agent", icon="app_registration", on_click=lambda: start_registration())
                         register_status_area = ui.column().classes("w-full mt-2 p-2 border rounded bg-gray-50 dark:bg-gray-900 min-h-[50px]")
@@ -978,18 +1077,68 @@ async def main_page(client: Client):
                 fetch_destroy_button = ui.button("Fetch Existing Agent Engines", icon="refresh",
                                                  on_click=lambda: fetch_agents_for_destroy(
                                                      project_input.value, location_select.value,
-                                                     destroy_list_container, destroy_delete_button, fetch_destroy_button,
+                                                     destroy_count_label, destroy_table, destroy_delete_button, fetch_destroy_button,
                                                      page_state))
                 with ui.card().classes("w-full mt-2"):
                     ui.label("Your Agent Engines").classes("text-lg font-semibold")
-                    destroy_list_container = ui.column().classes("w-full")
-                    with destroy_list_container:
-                        ui.label("Click 'Fetch Existing Agents'.").classes("text-gray-500")
+                    destroy_count_label = ui.label("Click 'Fetch Existing Agents'.").classes("text-gray-500")
+                    destroy_table = create_agent_engine_table(selection="multiple")
+                    page_state["destroy_table"] = destroy_table
                 with ui.row().classes("w-full mt-4 justify-end"):
                     destroy_delete_button = ui.button("Delete Selected Agents", color="red", icon="delete_forever",
                                                       on_click=lambda: confirm_and_delete_agents(
                                                           project_input.value, location_select.value, page_state))
-                    destroy_delete_button.disable()
+                    destroy_delete_button.disable() # Enabled when rows are selected
+
+                def on_destroy_select():
+                    page_state["destroy_selected"] = {row["resource_name"]: True for row in destroy_table.selected}
+                    destroy_delete_button.set_enabled(bool(destroy_table.selected))
+                destroy_table.on_select(on_destroy_select)
+
+    # --- Inventory Prefetch (shared across tabs and sessions) ---
+    prefetch_state = {"timer": None}
+
+    def schedule_inventory_prefetch():
+        """Restarts the debounce timer; inventory is prefetched once the GCP settings settle."""
+        if prefetch_state["timer"] is not None: prefetch_state["timer"].cancel()
+        prefetch_state["timer"] = ui.timer(PREFETCH_DEBOUNCE_SECONDS, prefetch_inventory, once=True)
+
+    async def prefetch_inventory():
+        project, location, as_locations = project_input.value, location_select.value, agentspace_locations_select.value
+        if not project: return
+        async def prefetch(load):
+            try:
+                await load
+            except Exception as e:
+                print(f"Inventory prefetch failed: {e}")
+            await show_cached_inventory() # Show each listing as soon as it lands
+        loads = []
+        if location: loads.append(prefetch(load_agent_engines(project, location)))
+        if as_locations and get_agentspace_apps_from_projectid: loads.append(prefetch(load_agentspace_apps(project, as_locations)))
+        await asyncio.gather(*loads)
+
+    async def show_cached_inventory():
+        """Fills every tab still showing other settings from fresh cached inventory; never triggers a listing."""
+        project, location, as_locations = project_input.value, location_select.value, agentspace_locations_select.value
+        engines_key = (project, location)
+        if project and location and INVENTORY_STORE.peek(AGENT_ENGINES, engines_key) is not None:
+            if page_state["destroy_loaded_key"] != engines_key:
+                await fetch_agents_for_destroy(project, location, destroy_count_label, destroy_table, destroy_delete_button, fetch_destroy_button, page_state, force=False)
+            if page_state["register_loaded_key"] != engines_key:
+                await fetch_agent_engines_for_register(project, location, register_ae_table, register_fetch_ae_button, page_state, register_next_button_step1, force=False)
+        if not project or not as_locations:
+            return
+        apps_key = agentspace_inventory_key(project, as_locations)
+        if INVENTORY_STORE.peek(AGENTSPACE_APPS, apps_key) is not None:
+            if page_state["register_agentspaces_loaded_key"] != apps_key:
+                await fetch_agentspace_apps(project, as_locations, register_as_select, register_fetch_as_button, page_state, 'register_agentspaces', register_next_button_step2, force=False)
+            if page_state["deregister_agentspaces_loaded_key"] != apps_key:
+                await fetch_agentspace_apps(project, as_locations, deregister_as_select, deregister_fetch_as_button, page_state, 'deregister_agentspaces', force=False)
+
+    for settings_element in (project_input, location_select, agentspace_locations_select):
+        settings_element.on_value_change(schedule_inventory_prefetch)
+    tabs.on_value_change(show_cached_inventory)
+    schedule_inventory_prefetch() # Settings may already be filled from the environment
 
     # --- Logic for Deploy Tab ---
     def handle_deploy_agent_selection(agent_key: str):
@@ -1057,6 +1206,9 @@ async def main_page(client: Client):
             ui.notify("Internal Error: No agent configuration selected.", type="negative")
             return
 
+        # Until the job finishes (or the form changes): NiceGUI ignores clicks on a disabled
+        # button, so a double click can't open two dialogs or queue the deployment twice.
+        deploy_button.disable()
         with ui.dialog() as confirm_dialog, ui.card():
             ui.label("Confirm Agent Deployment").classes("text-xl font-bold")
             with ui.column().classes("gap-1 mt-2"): # Use column for better spacing
@@ -1076,21 +1228,21 @@ async def main_page(client: Client):
             ui.label("Proceed with deployment?").classes("mt-4")
             with ui.row().classes("mt-4 w-full justify-end"):
                 ui.button("Cancel", on_click=confirm_dialog.close, color="gray")
-                ui.button("Deploy", on_click=lambda: (
-                    confirm_dialog.close(),
-                    asyncio.create_task(run_deployment_async(
-                        project, location, bucket, agent_key, agent_config,
-                        display_name_input.value, description_input.value, # Pass edited values
-                        deploy_button, deploy_status_area
-                    ))
-                ))
-        await confirm_dialog
+                ui.button("Deploy", on_click=lambda: confirm_dialog.submit(True))
+        if not await confirm_dialog:
+            update_deploy_button_state()
+            return
+        start_deployment_job(
+            project, location, bucket, agent_key,
+            display_name_input.value, description_input.value, # Pass edited values
+            deploy_status_area, on_finished=update_deploy_button_state,
+        )
 
     # --- Logic for Register Tab ---
     async def start_registration():
         project = project_input.value
         project_num = await get_project_number(project)
-        selected_ae_resource = register_ae_select.value
+        selected_ae_resource = selected_register_engine()
         selected_as_key = register_as_select.value # e.g., "global/12345"
         display_name = register_display_name_input.value
         description = register_description_input.value
@@ -1191,6 +1343,97 @@ async def main_page(client: Client):
         # Refresh the list of registered agents after deregistration
         await fetch_registered_agents_for_deregister(project, project_num, selected_as_app, deregister_list_container, deregister_fetch_reg_button, deregister_button, page_state)
 
+# --- Jobs Page ---
+def job_to_row(job: Job) -> Dict[str, Any]:
+    """Flattens a Job into a row for the jobs table."""
+    return {
+        "job_id": job.job_id,
+        "short_id": job.job_id[:8],
+        "title": job.title,
+        "state": job.state.value,
+        "phase": job.current_phase or "-",
+        "created": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(job.created_at)),
+        "duration": format_elapsed(job.duration) if job.duration is not None else "-",
+    }
+
+@ui.page("/jobs")
+async def jobs_page(client: Client):
+    """Lists server-side jobs from every user, with live state and logs."""
+    ui.query('body').classes(add='text-base')
+    with ui.header(elevated=True).classes("items-center justify-between"):
+        ui.label("ADK on Agent Engine: Jobs").classes("text-2xl font-bold")
+        ui.button("Lifecycle Manager", icon="arrow_back", on_click=lambda: ui.navigate.to("/")).props('flat color=white').classes('ml-auto')
+
+    if IMPORT_ERROR_MESSAGE:
+        with ui.card().classes("w-full bg-red-100 dark:bg-red-900"):
+            ui.label("Configuration Error").classes("text-xl font-bold text-red-700 dark:text-red-300")
+            ui.label(IMPORT_ERROR_MESSAGE).classes("text-red-600 dark:text-red-400")
+        return
+
+    manager = get_job_manager()
+    columns = [
+        {"name": "short_id", "label": "Job", "field": "short_id", "align": "left"},
+        {"name": "title", "label": "Title", "field": "title", "align": "left", "sortable": True},
+        {"name": "state", "label": "State", "field": "state", "align": "left", "sortable": True},
+        {"name": "phase", "label": "Current Phase", "field": "phase", "align": "left"},
+        {"name": "created", "label": "Created", "field": "created", "align": "left", "sortable": True},
+        {"name": "duration", "label": "Duration", "field": "duration", "align": "left"},
+    ]
+    with ui.column().classes("w-full p-4 gap-4"):
+        ui.label(f"Deployments run on the server with {manager.workers} worker(s) and survive closed tabs.").classes("text-gray-500")
+        jobs_table = ui.table(
+            columns=columns, rows=[job_to_row(job) for job in manager.list_jobs()],
+            row_key="job_id", selection="single", pagination=20,
+        ).classes("w-full")
+        log_title = ui.label("Select a job to see its log.").classes("text-lg font-semibold")
+        job_log = ui.log(max_lines=500).classes("w-full h-96")
+    log_state = {"job_id": None, "pushed": 0}
+
+    def push_new_log_lines(job: Job) -> None:
+        if len(job.logs) < log_state["pushed"]: # Log was truncated; start over.
+            job_log.clear(); log_state["pushed"] = 0
+        for line in job.logs[log_state["pushed"]:]:
+            job_log.push(line)
+        log_state["pushed"] = len(job.logs)
+        if job.is_finished and job.error:
+            job_log.push(f"ERROR: {job.error}")
+
+    def on_select(e) -> None:
+        job_log.clear()
+        log_state.update(job_id=None, pushed=0)
+        if not e.selection:
+            log_title.set_text("Select a job to see its log.")
+            return
+        job = manager.get(e.selection[0]["job_id"])
+        log_state["job_id"] = job.job_id
+        log_title.set_text(f"Log: {job.title} ({job.state.value})")
+        push_new_log_lines(job)
+
+    jobs_table.on_select(on_select)
+
+    def on_job_change(job: Job) -> None:
+        if jobs_table.is_deleted:
+            unsubscribe()
+            return
+        row = job_to_row(job)
+        index = next((i for i, r in enumerate(jobs_table.rows) if r["job_id"] == job.job_id), None)
+        if index is None:
+            jobs_table.rows.insert(0, row)
+        else:
+            jobs_table.rows[index] = row
+        jobs_table.update()
+        if log_state["job_id"] == job.job_id:
+            log_title.set_text(f"Log: {job.title} ({job.state.value})")
+            push_new_log_lines(job)
+
+    unsubscribe = manager.subscribe(on_job_change)
+
+# --- Metrics Endpoint ---
+@app.get("/metrics")
+def metrics_endpoint() -> Response:
+    """Prometheus scrape endpoint for the Web UI control plane."""
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
 # --- Main Execution ---
 if __name__ in {"__main__", "__mp_main__"}:
     load_dotenv(override=True)
@@ -1201,5 +1444,11 @@ if __name__ in {"__main__", "__mp_main__"}:
     if parent_dir not in sys.path: sys.path.insert(0, parent_dir)
     utils_path = os.path.join(script_dir, "deployment_utils")
     if os.path.isdir(utils_path) and utils_path not in sys.path: sys.path.insert(0, utils_path)
+    if not IMPORT_ERROR_MESSAGE:
+        # Startup hooks only fire in the serving process, not in job pool processes re-importing this module.
+        app.on_startup(register_job_runners)
+        app.on_shutdown(lambda: get_job_manager().shutdown())
+        app.on_connect(lambda: CONNECTED_CLIENTS.inc())
+        app.on_disconnect(lambda: CONNECTED_CLIENTS.dec())
 
     ui.run(title="Agent Manager", favicon="🛠️", dark=True, port=8080) # Changed port